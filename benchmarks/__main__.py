@@ -0,0 +1,96 @@
+"""
+Benchmarks of the authentication hot path.
+
+    python -m benchmarks [-k PATTERN] [--output FILE] [--baseline FILE]
+
+Results are written as JSON with ops/sec and p50/p99 latency of each
+benchmark. With ``--baseline``, exits with status 1 if any benchmark got
+slower than the stored results by more than ``--tolerance``.
+Redis backed blacklists are benchmarked only when ``--redis`` is given,
+except bulk revocation, which runs against a local stand-in otherwise.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from benchmarks import (  # pylint: disable=unused-import
+    bench_acl,
+    bench_blacklist,
+    bench_decorators,
+    bench_tokens,
+)
+from benchmarks.runner import BENCHMARKS, compare, dump, run
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "-k",
+        dest="patterns",
+        action="append",
+        metavar="PATTERN",
+        help="glob pattern of benchmarks to run, can be repeated",
+    )
+    parser.add_argument("-n", "--iterations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--output", metavar="FILE", help="write results to FILE")
+    parser.add_argument(
+        "--baseline", metavar="FILE", help="compare results against FILE"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed relative regression against baseline (default: 0.1)",
+    )
+    parser.add_argument("--redis", metavar="URL", help="redis to benchmark against")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+
+    return parser.parse_args(argv)
+
+
+def _report(name, result):
+    if result is None:
+        print(f"{name:<55} skipped")
+    else:
+        print(
+            f"{name:<55} {result.ops_per_sec:>12,.0f} ops/s"
+            f" p50 {result.p50_us:>9,.1f}us p99 {result.p99_us:>9,.1f}us"
+        )
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    if args.redis:
+        os.environ["REDIS_URL"] = args.redis
+
+    results = asyncio.get_event_loop().run_until_complete(
+        run(args.patterns, args.iterations, args.warmup, _report)
+    )
+
+    if args.output:
+        dump(results, args.output)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+
+        for r in regressions:
+            print(
+                f"REGRESSION {r.name} {r.metric}: "
+                f"{r.baseline:,.1f} -> {r.current:,.1f} ({r.change:+.1%})"
+            )
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+from contextlib import asynccontextmanager
+
+from benchmarks.runner import register
+from sanic_jwt_extended.acl import Policy, RoleRegistry
+
+ROLE_COUNTS = (10, 100)
+STRATEGIES = ("scan", "set", "bitmask")
+
+
+@asynccontextmanager
+async def policy(roles, strategy):
+    names = [f"ROLE_{i}" for i in range(roles)]
+    # every role inherits the next one, token holds a few roles from the tail
+    registry = RoleRegistry(
+        {name: names[i + 1 : i + 2] for i, name in enumerate(names)},
+        {name: [f"perm_{i}"] for i, name in enumerate(names)},
+    )
+    allow = names[: roles // 2]
+    token_roles = names[-3:]
+
+    if strategy == "scan":
+        # what checking each of token's roles against the decorator's list costs
+        yield lambda: any(role in allow for role in token_roles)
+    elif strategy == "set":
+        compiled = Policy(allow)
+        yield lambda: compiled.permits(token_roles[0], None)
+    else:
+        compiled = Policy(allow)
+        mask = registry.encode(token_roles)
+        yield lambda: compiled.permits(mask, registry)
+
+
+for roles in ROLE_COUNTS:
+    for strategy in STRATEGIES:
+        register(
+            f"acl.policy[{strategy}-{roles}]", policy, roles=roles, strategy=strategy
+        )
@@ -0,0 +1,140 @@
+import datetime
+import itertools
+import os
+import time
+import uuid
+import warnings
+from contextlib import AsyncExitStack, asynccontextmanager
+from types import SimpleNamespace
+
+from benchmarks.local_redis import local_redis
+from benchmarks.runner import Skip, register
+from benchmarks.utils import initialize
+from sanic_jwt_extended import JWT
+from sanic_jwt_extended.blacklist import (
+    BloomFilterBlacklist,
+    CachedRedisBlacklist,
+    InMemoryBlacklist,
+    RedisBlacklist,
+    SharedMemoryBlacklist,
+)
+from sanic_jwt_extended.tokens import Token
+
+POOL_SIZE = 1024
+OPERATIONS = ("register", "lookup_revoked", "lookup_valid")
+
+
+def _in_memory():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return InMemoryBlacklist()
+
+
+def _bloom_filter():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return BloomFilterBlacklist(capacity=POOL_SIZE * 4)
+
+
+def _redis_url():
+    url = os.environ.get("REDIS_URL")
+    if not url:
+        raise Skip("REDIS_URL is not set")
+    return url
+
+
+BACKENDS = {
+    "in_memory": _in_memory,
+    "bloom_filter": _bloom_filter,
+    "shared_memory": lambda: SharedMemoryBlacklist(capacity=POOL_SIZE * 4),
+    "redis": lambda: RedisBlacklist(_redis_url()),
+    "cached_redis": lambda: CachedRedisBlacklist(_redis_url()),
+}
+
+
+@asynccontextmanager
+async def blacklist_operation(backend, operation):
+    blacklist = BACKENDS[backend]()
+    is_redis = isinstance(blacklist, RedisBlacklist)
+
+    initialize()
+    await blacklist.open()
+    revoked, valid = (
+        [Token(JWT.create_access_token(f"user{i}")) for i in range(POOL_SIZE)]
+        for _ in range(2)
+    )
+
+    for token in revoked:
+        await blacklist.register(token)
+
+    tokens = itertools.cycle(valid if operation == "lookup_valid" else revoked)
+
+    if operation == "register":
+
+        async def run():
+            await blacklist.register(next(tokens))
+
+    else:
+
+        async def run():
+            await blacklist.is_blacklisted(next(tokens))
+
+    try:
+        yield run
+    finally:
+        if is_redis:
+            await blacklist.connection.delete(*(t.jti.hex for t in revoked))
+        await blacklist.close()
+
+
+@asynccontextmanager
+async def bulk_revoke(method, batch):
+    """
+    Revokes ``batch`` tokens against ``--redis``, or else a local stand-in
+    """
+    async with AsyncExitStack() as stack:
+        address = os.environ.get("REDIS_URL") or await stack.enter_async_context(
+            local_redis()
+        )
+        blacklist = RedisBlacklist(address)
+        await blacklist.open()
+        stack.push_async_callback(blacklist.close)
+
+        expires_at = time.time() + 60
+        tokens = [
+            SimpleNamespace(
+                jti=uuid.uuid4(), exp=datetime.datetime.utcfromtimestamp(expires_at)
+            )
+            for _ in range(POOL_SIZE)
+        ]
+        batches = itertools.cycle(
+            [tokens[i : i + batch] for i in range(0, POOL_SIZE, batch)]
+        )
+
+        if method == "register":
+
+            async def run():
+                for token in next(batches):
+                    await blacklist.register(token)
+
+        else:
+
+            async def run():
+                await blacklist.register_many(
+                    (token.jti, expires_at) for token in next(batches)
+                )
+
+        yield run
+
+
+for backend in BACKENDS:
+    for operation in OPERATIONS:
+        register(
+            f"blacklist.{backend}.{operation}",
+            blacklist_operation,
+            backend=backend,
+            operation=operation,
+        )
+
+for method in ("register", "register_many"):
+    register(f"blacklist.bulk[{method}-128]", bulk_revoke, method=method, batch=128)
@@ -0,0 +1,174 @@
+from contextlib import asynccontextmanager
+
+from sanic.response import text
+
+from benchmarks.runner import register
+from benchmarks.utils import initialize
+from sanic_jwt_extended import JWT
+from sanic_jwt_extended.decorators import (
+    jwt_middleware,
+    jwt_optional,
+    jwt_required,
+    refresh_jwt_required,
+)
+from sanic_jwt_extended.tokens import Token
+
+DECORATORS = {
+    "jwt_required": jwt_required,
+    "jwt_optional": jwt_optional,
+    "refresh_jwt_required": refresh_jwt_required,
+}
+LOCATIONS = ("header", "cookies", "query")
+
+
+def _request_kwargs(location, raw_jwt, is_access):
+    config = JWT.config
+
+    if location == "header":
+        key = config.jwt_header_key if is_access else config.refresh_jwt_header_key
+        prefix = (
+            config.jwt_header_prefix if is_access else config.refresh_jwt_header_prefix
+        )
+        return "get", {"headers": {key: f"{prefix} {raw_jwt}"}}
+
+    if location == "cookies":
+        cookie = config.jwt_cookie if is_access else config.refresh_jwt_cookie
+        csrf_header = (
+            config.jwt_csrf_header if is_access else config.refresh_jwt_csrf_header
+        )
+        return (
+            "post",
+            {
+                "cookies": {cookie: raw_jwt},
+                "headers": {csrf_header: Token(raw_jwt).csrf},
+            },
+        )
+
+    return "get", {"params": {config.jwt_query_param_name: raw_jwt}}
+
+
+@asynccontextmanager
+async def decorated_endpoint(decorator, location):
+    app = initialize(name=f"{decorator}_{location}", token_location=(location,))
+    is_access = decorator != "refresh_jwt_required"
+
+    async def endpoint(request, token):
+        return text(token.identity)
+
+    app.add_route(DECORATORS[decorator](endpoint), "/", methods=["GET", "POST"])
+
+    raw_jwt = (
+        JWT.create_access_token("user")
+        if is_access
+        else JWT.create_refresh_token("user")
+    )
+    method, kwargs = _request_kwargs(location, raw_jwt, is_access)
+    # every access to ``app.asgi_client`` creates a new client
+    request = getattr(app.asgi_client, method)
+
+    async def operation():
+        _, response = await request("/", **kwargs)
+        assert response.status == 200, response.text
+
+    yield operation
+
+
+@asynccontextmanager
+async def undecorated_endpoint():
+    app = initialize(name="undecorated")
+
+    @app.route("/")
+    async def endpoint(request):
+        return text("user")
+
+    client = app.asgi_client
+
+    async def operation():
+        await client.get("/")
+
+    yield operation
+
+
+@asynccontextmanager
+async def stacked_endpoint(middleware, layers=3):
+    app = initialize(name=f"stacked_{middleware}")
+    if middleware:
+        app.register_middleware(jwt_middleware, "request")
+
+    async def endpoint(request, token):
+        return text(token.identity)
+
+    for _ in range(layers):
+        endpoint = jwt_required(endpoint)
+
+    async def public(request):
+        return text("public")
+
+    app.add_route(endpoint, "/")
+    app.add_route(public, "/public")
+
+    kwargs = {"headers": {"Authorization": f"Bearer {JWT.create_access_token('user')}"}}
+    client = app.asgi_client
+
+    async def operation():
+        _, response = await client.get("/", **kwargs)
+        assert response.status == 200, response.text
+
+        # public routes should cost the same with or without middleware
+        await client.get("/public", **kwargs)
+
+    yield operation
+
+
+@asynccontextmanager
+async def tenant_endpoint(tenants):
+    app = initialize(name=f"tenants_{tenants}")
+    managers = [JWT() for _ in range(tenants)]
+
+    for i, manager in enumerate(managers):
+        with manager.initialize(app, host=f"tenant{i}.example.com") as m:
+            m.config.secret_key = f"secret{i}"
+
+    async def endpoint(request, token):
+        return text(token.identity)
+
+    app.add_route(jwt_required(endpoint), "/")
+
+    # picking the last registered tenant should cost the same as the first
+    raw_jwt = managers[-1].create_access_token("user")
+    kwargs = {
+        "headers": {
+            "Authorization": f"Bearer {raw_jwt}",
+            "Host": f"tenant{tenants - 1}.example.com",
+        }
+    }
+    client = app.asgi_client
+
+    async def operation():
+        _, response = await client.get("/", **kwargs)
+        assert response.status == 200, response.text
+
+    yield operation
+
+
+# framework overhead to subtract from decorated endpoints
+register("decorators.undecorated", undecorated_endpoint)
+
+for middleware in (False, True):
+    register(
+        f"decorators.stacked[{'middleware' if middleware else 'plain'}]",
+        stacked_endpoint,
+        middleware=middleware,
+    )
+
+for decorator in DECORATORS:
+    for location in LOCATIONS:
+        register(
+            f"decorators.{decorator}[{location}]",
+            decorated_endpoint,
+            decorator=decorator,
+            location=location,
+        )
+
+for tenants in (1, 1000):
+    register(f"decorators.tenants[{tenants}]", tenant_endpoint, tenants=tenants)
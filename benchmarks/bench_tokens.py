@@ -0,0 +1,128 @@
+from contextlib import asynccontextmanager
+
+from jwt import InvalidTokenError
+
+from benchmarks.runner import register
+from benchmarks.utils import initialize, private_claims
+from sanic_jwt_extended import JWT, jws
+from sanic_jwt_extended.codec import _AVAILABLE
+from sanic_jwt_extended.exceptions import JWTDecodeError
+from sanic_jwt_extended.tokens import Token
+
+ALGORITHMS = ("HS256", "RS256", "ES256", "EdDSA")
+CLAIM_COUNTS = (0, 10, 100)
+BATCH_SIZE = 100
+CODECS = [name for name, available in _AVAILABLE.items() if available]
+CODEC_CLAIM_COUNTS = (100, 1000)
+
+
+@asynccontextmanager
+async def create_access_token(algorithm, claims, codec="auto"):
+    initialize(algorithm, json_codec=codec)
+    claims = private_claims(claims)
+
+    yield lambda: JWT.create_access_token("user", private_claims=claims)
+
+
+@asynccontextmanager
+async def create_refresh_token(algorithm, claims):
+    initialize(algorithm)
+    claims = private_claims(claims)
+
+    yield lambda: JWT.create_refresh_token("user", private_claims=claims)
+
+
+@asynccontextmanager
+async def decode(algorithm, claims, codec="auto"):
+    initialize(algorithm, json_codec=codec)
+    raw_jwt = JWT.create_access_token("user", private_claims=private_claims(claims))
+
+    def operation():
+        return Token(raw_jwt).private_claims
+
+    yield operation
+
+
+@asynccontextmanager
+async def reject(kind):
+    initialize("RS256", max_token_length=8192)
+    header, payload, signature = JWT.create_access_token("user").split(".")
+    raw_jwt = {
+        "oversized": "a" * 65536,
+        "garbage": "not a token, " * 20,
+        "hs256": jws.encode({}, "secret", "HS256", {"class": "access"}, JWT.codec),
+        # only this one reaches signature verification
+        "forged": f"{header}.{payload}.{signature[::-1]}",
+    }[kind]
+
+    def operation():
+        try:
+            Token(raw_jwt)
+        except (InvalidTokenError, JWTDecodeError):
+            pass
+        else:  # pragma: no cover
+            raise AssertionError("token should be rejected")
+
+    yield operation
+
+
+@asynccontextmanager
+async def reference(claims, cached):
+    initialize(use_reference_tokens=True, reference_cache_size=1024 if cached else 0)
+    handle = await JWT.create_access_token_async(
+        "user", private_claims=private_claims(claims)
+    )
+
+    async def operation():
+        return (await Token.verify(handle)).private_claims
+
+    yield operation
+
+
+@asynccontextmanager
+async def create_tokens_batch(algorithm, refresh):
+    initialize(algorithm)
+    specs = [{"identity": f"user{i}", "fresh": True} for i in range(BATCH_SIZE)]
+
+    yield lambda: JWT.create_tokens_batch(specs, refresh=refresh)
+
+
+for algorithm in ALGORITHMS:
+    for claims in CLAIM_COUNTS:
+        params = {"algorithm": algorithm, "claims": claims}
+        suffix = f"[{algorithm}-{claims}]"
+
+        register(f"tokens.create_access_token{suffix}", create_access_token, **params)
+        register(f"tokens.create_refresh_token{suffix}", create_refresh_token, **params)
+        register(f"tokens.decode{suffix}", decode, **params)
+
+    # one operation mints BATCH_SIZE tokens (or pairs)
+    for refresh in (False, True):
+        register(
+            f"tokens.create_tokens_batch[{algorithm}-{'pairs' if refresh else 'access'}]",
+            create_tokens_batch,
+            algorithm=algorithm,
+            refresh=refresh,
+        )
+
+for claims in CLAIM_COUNTS:
+    for cached in (False, True):
+        register(
+            f"tokens.reference.resolve[{claims}-{'cached' if cached else 'store'}]",
+            reference,
+            claims=claims,
+            cached=cached,
+        )
+
+for kind in ("oversized", "garbage", "hs256", "forged"):
+    register(f"tokens.reject[RS256-{kind}]", reject, kind=kind)
+
+for codec in CODECS:
+    for claims in CODEC_CLAIM_COUNTS:
+        params = {"algorithm": "HS256", "claims": claims, "codec": codec}
+        suffix = f"[{codec}-{claims}]"
+
+        register(
+            f"tokens.codec.create_access_token{suffix}", create_access_token, **params
+        )
+        register(f"tokens.codec.decode{suffix}", decode, **params)
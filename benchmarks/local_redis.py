@@ -0,0 +1,98 @@
+"""
+In-process stand-in of redis, speaking RESP on a local socket. Benchmarks of
+redis backends use it when ``--redis`` is not given, so round trips and
+pipelining are measured without a redis server. Only commands used by
+``RedisBlacklist`` writes and lookups are supported.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+_OK = b"+OK\r\n"
+_NIL = b"$-1\r\n"
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return _NIL
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class LocalRedis:
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, float]] = {}
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+
+        return entry[0]
+
+    def execute(self, command: bytes, *args: bytes) -> bytes:
+        command = command.upper()
+
+        if command == b"SET":
+            key, value, *options = args
+            expires_at = float("inf")
+
+            for i, option in enumerate(options):
+                if option.upper() == b"EX":
+                    expires_at = time.monotonic() + int(options[i + 1])
+                elif option.upper() == b"NX" and self._get(key) is not None:
+                    return _NIL
+
+            self.data[key] = (value, expires_at)
+            return _OK
+
+        if command == b"GET":
+            return _bulk(self._get(args[0]))
+
+        if command == b"MGET":
+            return b"*%d\r\n" % len(args) + b"".join(_bulk(self._get(k)) for k in args)
+
+        if command == b"DEL":
+            return b":%d\r\n" % sum(self.data.pop(k, None) is not None for k in args)
+
+        if command == b"PING":
+            return b"+PONG\r\n"
+
+        if command == b"PUBLISH":
+            return b":0\r\n"
+
+        return b"-ERR unknown command '%s'\r\n" % command
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                args = []
+                for _ in range(int(line[1:])):
+                    size = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(size + 2))[:-2])
+
+                writer.write(self.execute(*args))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+@asynccontextmanager
+async def local_redis():
+    """
+    Serves a ``LocalRedis`` on a free port, yields its address
+    """
+    server = await asyncio.start_server(LocalRedis().handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    try:
+        yield f"redis://127.0.0.1:{port}"
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,146 @@
+import asyncio
+import fnmatch
+import functools
+import json
+import platform
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional
+
+Setup = Callable[..., AsyncContextManager[Callable[[], Any]]]
+
+BENCHMARKS: Dict[str, Callable[[], AsyncContextManager[Callable[[], Any]]]] = {}
+
+
+class Skip(Exception):
+    pass
+
+
+@dataclass
+class Result:
+    name: str
+    iterations: int
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+
+def register(name: str, setup: Setup, **params) -> None:
+    """
+    Registers ``setup`` as benchmark. ``setup`` is an async context manager
+    factory called with ``params``, which yields the operation to measure.
+    The operation can be a plain function or a coroutine function.
+    """
+    if name in BENCHMARKS:
+        raise ValueError(f"Benchmark '{name}' is already registered")
+
+    BENCHMARKS[name] = functools.partial(setup, **params)
+
+
+def _percentile(samples: List[int], percentile: float) -> float:
+    index = min(len(samples) - 1, round(percentile / 100 * (len(samples) - 1)))
+    return samples[index] / 1000
+
+
+async def measure(name: str, operation, iterations: int, warmup: int) -> Result:
+    is_coroutine = asyncio.iscoroutinefunction(operation)
+    perf_counter_ns = time.perf_counter_ns
+    samples = []
+
+    for _ in range(warmup):
+        result = operation()
+        if is_coroutine:
+            await result
+
+    for _ in range(iterations):
+        started = perf_counter_ns()
+        result = operation()
+        if is_coroutine:
+            await result
+        samples.append(perf_counter_ns() - started)
+
+    samples.sort()
+
+    return Result(
+        name=name,
+        iterations=iterations,
+        ops_per_sec=iterations / (sum(samples) / 1e9),
+        p50_us=_percentile(samples, 50),
+        p99_us=_percentile(samples, 99),
+    )
+
+
+async def run(
+    patterns: Optional[List[str]] = None,
+    iterations: int = 1000,
+    warmup: int = 100,
+    report: Callable[[str, Optional[Result]], None] = lambda name, result: None,
+) -> List[Result]:
+    results = []
+
+    for name, setup in BENCHMARKS.items():
+        if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+
+        try:
+            async with setup() as operation:
+                result = await measure(name, operation, iterations, warmup)
+        except Skip:
+            report(name, None)
+            continue
+
+        report(name, result)
+        results.append(result)
+
+    return results
+
+
+def dump(results: List[Result], path: str) -> None:
+    document = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {r.name: asdict(r) for r in results},
+    }
+
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def compare(
+    results: List[Result], baseline_path: str, tolerance: float
+) -> List[Regression]:
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+
+    for result in results:
+        if result.name not in baseline:
+            continue
+
+        base = baseline[result.name]
+
+        if result.ops_per_sec < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                Regression(
+                    result.name, "ops_per_sec", base["ops_per_sec"], result.ops_per_sec
+                )
+            )
+        if result.p99_us > base["p99_us"] * (1 + tolerance):
+            regressions.append(
+                Regression(result.name, "p99_us", base["p99_us"], result.p99_us)
+            )
+
+    return regressions
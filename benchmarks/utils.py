@@ -0,0 +1,54 @@
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from sanic import Sanic
+
+from sanic_jwt_extended import JWT
+
+_KEY_PAIRS = {}
+_CURVES = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}
+
+
+def _generate_private_key(algorithm):
+    if algorithm in _CURVES:
+        return ec.generate_private_key(_CURVES[algorithm](), default_backend())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+
+    return rsa.generate_private_key(65537, 2048, default_backend())
+
+
+def key_pair(algorithm="RS256"):
+    if algorithm not in _KEY_PAIRS:
+        key = _generate_private_key(algorithm)
+        private_key = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        public_key = key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        _KEY_PAIRS[algorithm] = private_key.decode(), public_key.decode()
+
+    return _KEY_PAIRS[algorithm]
+
+
+def initialize(algorithm="HS256", name="benchmark", **config):
+    app = Sanic(name)
+
+    with JWT.initialize(app) as manager:
+        manager.config.algorithm = algorithm
+        if algorithm.startswith("HS"):
+            manager.config.secret_key = "secret"
+        else:
+            manager.config.private_key, manager.config.public_key = key_pair(algorithm)
+
+        for key, value in config.items():
+            setattr(manager.config, key, value)
+
+    return app
+
+
+def private_claims(count):
+    return {f"claim{i}": f"value{i}" for i in range(count)}
@@ -1,4 +1,5 @@
 from .decorators import (  # pylint: disable=unused-import
+    jwt_middleware,
     jwt_optional,
     jwt_required,
     refresh_jwt_required,
@@ -0,0 +1,190 @@
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+from sanic_jwt_extended.exceptions import ConfigurationConflictError, JWTDecodeError
+
+RoleSpec = Union[int, str, Iterable[str]]
+
+# widest integer every JSON codec can encode
+_MAX_INT_BITS = 64
+
+
+class RoleRegistry:
+    """
+    Assigns a bit to every role and permission, in order of declaration.
+    A role grants its own bit, bits of roles it inherits (transitively)
+    and bits of permissions of all of them. Tokens carry granted bits as
+    a single integer, so changing order of declaration invalidates tokens.
+    Registries of more than 64 names put it in claim as a hex string.
+    """
+
+    def __init__(
+        self,
+        roles: Dict[str, Sequence[str]],
+        permissions: Optional[Dict[str, Sequence[str]]] = None,
+    ):
+        permissions = permissions or {}
+
+        for role, inherited in roles.items():
+            unknown = [r for r in inherited if r not in roles]
+            if unknown:
+                raise ConfigurationConflictError(
+                    f"Role '{role}' inherits unknown roles {unknown}"
+                )
+
+        unknown = [r for r in permissions if r not in roles]
+        if unknown:
+            raise ConfigurationConflictError(f"Permissions of unknown roles {unknown}")
+
+        names = dict.fromkeys(roles)
+        for granted in permissions.values():
+            for permission in granted:
+                if permission in roles:
+                    raise ConfigurationConflictError(
+                        f"'{permission}' can not be both role and permission"
+                    )
+                names.setdefault(permission)
+
+        self.bits: Dict[str, int] = {name: 1 << i for i, name in enumerate(names)}
+        self.grants: Dict[str, int] = {}
+        self.wide = len(self.bits) > _MAX_INT_BITS
+        self._hex = re.compile(f"[0-9a-f]{{1,{(len(self.bits) + 3) // 4}}}")
+
+        for role in roles:
+            mask = 0
+            stack = [role]
+            seen: Set[str] = set()
+
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+
+                mask |= self.bits[current]
+                for permission in permissions.get(current, ()):
+                    mask |= self.bits[permission]
+                stack.extend(roles[current])
+
+            self.grants[role] = mask
+
+    def encode(self, role: RoleSpec) -> int:
+        """
+        Returns bits granted by a role, iterable of roles or already encoded mask
+        """
+        if isinstance(role, int):
+            return role
+        if isinstance(role, str):
+            role = (role,)
+
+        mask = 0
+        for name in role:
+            try:
+                mask |= self.grants[name]
+            except KeyError:
+                raise ConfigurationConflictError(f"Unknown role '{name}'")
+
+        return mask
+
+    def dump(self, mask: int) -> Union[int, str]:
+        """
+        Returns role claim of ``mask``
+        """
+        return format(mask, "x") if self.wide else mask
+
+    def load(self, claim: Any) -> int:
+        """
+        Returns mask in role claim, which is missing for tokens without role
+        """
+        if claim is None:
+            return 0
+        if isinstance(claim, int):
+            return claim
+        if self.wide and isinstance(claim, str) and self._hex.fullmatch(claim):
+            return int(claim, 16)
+
+        raise JWTDecodeError("Role claim should be a bitmask of roles")
+
+    def mask_of(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            try:
+                mask |= self.bits[name]
+            except KeyError:
+                raise ConfigurationConflictError(f"Unknown role or permission '{name}'")
+
+        return mask
+
+    def names(self, mask: int) -> FrozenSet[str]:
+        return frozenset(name for name, bit in self.bits.items() if mask & bit)
+
+
+def _allow_all(role: Any) -> bool:
+    return True
+
+
+class Policy:
+    """
+    ``allow``/``deny`` rule of a decorator. Names are resolved once for each
+    role registry (or to a set, for plain string roles), then each check is a
+    single bitwise test or set lookup.
+    """
+
+    __slots__ = ("allow", "deny", "_checks")
+
+    def __init__(
+        self,
+        allow: Optional[Iterable[str]] = None,
+        deny: Optional[Iterable[str]] = None,
+    ):
+        self.allow = tuple(allow or ())
+        self.deny = tuple(deny or ())
+        # registry is only known after JWT is initialized, which usually
+        # happens after views are decorated. managers of tenants have own ones
+        self._checks: Dict[Optional[RoleRegistry], Callable[[Any], bool]] = {}
+
+    def bind(self, registry: Optional[RoleRegistry]) -> Callable[[Any], bool]:
+        check: Callable[[Any], bool] = _allow_all
+
+        if registry is not None:
+            allow_mask, deny_mask = (
+                registry.mask_of(self.allow),
+                registry.mask_of(self.deny),
+            )
+
+            if self.allow:
+                check = lambda mask: mask & allow_mask != 0
+            elif self.deny:
+                check = lambda mask: mask & deny_mask == 0
+        else:
+            allow, deny = frozenset(self.allow), frozenset(self.deny)
+
+            if self.allow:
+                check = lambda role: role in allow
+            elif self.deny:
+                check = lambda role: role not in deny
+
+        self._checks[registry] = check
+
+        return check
+
+    def permits(self, role: Any, registry: Optional[RoleRegistry]) -> bool:
+        """
+        Checks role claim of token. ``registry`` is ``acl`` of manager, which
+        is ``None`` when roles are plain strings
+        """
+        check = self._checks.get(registry)
+        if check is None:
+            check = self.bind(registry)
+
+        return check(role)
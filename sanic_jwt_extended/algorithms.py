@@ -0,0 +1,151 @@
+from typing import Any, Dict, Tuple
+
+from jwt.algorithms import Algorithm, get_default_algorithms
+from jwt.exceptions import InvalidKeyError
+
+from sanic_jwt_extended.exceptions import ConfigurationConflictError
+
+try:
+    from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+except ImportError:  # pragma: no cover
+    # only HS* algorithms are available without cryptography
+    ec = ed25519 = rsa = None  # type: ignore
+
+
+class Ed25519Algorithm(Algorithm):
+    """
+    EdDSA over Ed25519 (RFC 8037), which PyJWT 1.x does not provide
+    """
+
+    def prepare_key(self, key):
+        if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+            return key
+
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+        if not isinstance(key, bytes):
+            raise TypeError("Expecting a PEM-formatted or OpenSSH key.")
+
+        backend = default_backend()
+        loaded: Any
+
+        if key.startswith(b"ssh-ed25519"):
+            loaded = serialization.load_ssh_public_key(key, backend)
+        else:
+            try:
+                loaded = serialization.load_pem_private_key(key, None, backend)
+            except ValueError:
+                loaded = serialization.load_pem_public_key(key, backend)
+
+        if not isinstance(
+            loaded, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)
+        ):
+            raise InvalidKeyError("Expecting an Ed25519 key.")
+
+        return loaded
+
+    def sign(self, msg, key):
+        return key.sign(msg)
+
+    def verify(self, msg, key, sig):
+        if isinstance(key, ed25519.Ed25519PrivateKey):
+            key = key.public_key()
+
+        try:
+            key.verify(sig, msg)
+            return True
+        except InvalidSignature:
+            return False
+
+
+ALGORITHMS: Dict[str, Algorithm] = get_default_algorithms()
+
+# algorithm -> (private key type, public key type, curve)
+_KEY_TYPES: Dict[str, Tuple[Any, Any, Any]] = {}
+
+if ed25519 is not None:
+    ALGORITHMS["EdDSA"] = Ed25519Algorithm()
+
+    _KEY_TYPES.update(
+        {
+            f"{prefix}{bits}": (rsa.RSAPrivateKey, rsa.RSAPublicKey, None)
+            for prefix in ("RS", "PS")
+            for bits in (256, 384, 512)
+        }
+    )
+    _KEY_TYPES.update(
+        {
+            f"ES{bits}": (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey, curve)
+            for bits, curve in (
+                (256, ec.SECP256R1),
+                (384, ec.SECP384R1),
+                (512, ec.SECP521R1),
+            )
+        }
+    )
+    _KEY_TYPES["EdDSA"] = (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey, None)
+
+
+def get_algorithm(algorithm: str) -> Algorithm:
+    try:
+        return ALGORITHMS[algorithm]
+    except KeyError:
+        raise NotImplementedError("Algorithm not supported")
+
+
+def is_symmetric(algorithm: str) -> bool:
+    return algorithm.startswith("HS")
+
+
+def validate_algorithm(algorithm: str) -> None:
+    supported = algorithm in _KEY_TYPES or (
+        is_symmetric(algorithm) and algorithm in ALGORITHMS
+    )
+
+    # asymmetric algorithms are available only when cryptography is installed
+    if not supported:
+        raise ConfigurationConflictError(f"Algorithm '{algorithm}' is not supported")
+
+
+def load_key(algorithm: str, material: Any, private: bool) -> Any:
+    """
+    Loads asymmetric key for ``algorithm`` and makes sure it is of right type
+    (and curve), so that misconfigured keys fail at initialize, not on first use.
+    """
+    kind = "private" if private else "public"
+    private_type, public_type, curve = _KEY_TYPES[algorithm]
+
+    if isinstance(material, bytes):
+        material = material.decode("utf-8")
+
+    key: Any
+
+    try:
+        key = ALGORITHMS[algorithm].prepare_key(material)
+    except (ValueError, TypeError, InvalidKeyError, UnsupportedAlgorithm) as e:
+        raise ConfigurationConflictError(
+            f"Can not load {kind} key for {algorithm}: {e}"
+        )
+
+    if not isinstance(key, private_type if private else public_type):
+        raise ConfigurationConflictError(f"{algorithm} needs {kind} key of its family")
+
+    if curve is not None and not isinstance(key.curve, curve):
+        raise ConfigurationConflictError(
+            f"{algorithm} needs {curve.name} key, not {key.curve.name}"
+        )
+
+    return key
+
+
+def check_key_pair(private_key: Any, public_key: Any) -> None:
+    def spki(key):
+        return key.public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+
+    if spki(private_key.public_key()) != spki(public_key):
+        raise ConfigurationConflictError("Public key does not match private key")
@@ -1,50 +1,696 @@
+import asyncio
+import calendar
+import datetime
+import heapq
+import mmap
+import time
+import uuid
 import warnings
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
 
-from sanic_jwt_extended.redis import RedisConnection
+from sanic_jwt_extended.bloom import GenerationalBloomFilter
+from sanic_jwt_extended.cache import TTLCache
+from sanic_jwt_extended.exceptions import ConfigurationConflictError
+from sanic_jwt_extended.redis import RedisConnection, expire_in
+from sanic_jwt_extended.shm import SharedHashTable, digest
+
+
+class _Revoked(NamedTuple):
+    # stands in for a token known only by jti, for ``register``
+    jti: uuid.UUID
+    exp: Optional[datetime.datetime]
 
 
 class BlacklistABC(ABC):  # pragma: no cover
+    # whether revocations are only seen by this process, and lost on restart
+    in_process = False
+
     @abstractmethod
     async def register(self, token):
         pass
 
+    async def register_many(self, revoked):
+        """
+        Revokes tokens by ``(jti, expires_at)`` pairs, one ``register`` call
+        each. Override to write them at once
+        """
+        for jti, expires_at in revoked:
+            exp = (
+                datetime.datetime.utcfromtimestamp(expires_at)
+                if expires_at != float("inf")
+                else None
+            )
+            await self.register(_Revoked(jti, exp))
+
     @abstractmethod
     async def is_blacklisted(self, token):
         pass
 
+    async def revoke_family(self, family, expires_at):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support refresh token rotation"
+        )
+
+    async def redeem(self, token):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support refresh token rotation"
+        )
+
+    async def revoke_subject(self, subject, not_before, expires_at):
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support revoking by subject"
+        )
+
+    def supports(self, *methods):
+        """
+        Whether optional ``methods`` of this class are implemented
+        """
+        return all(
+            getattr(type(self), method) is not getattr(BlacklistABC, method)
+            for method in methods
+        )
+
+    def set_namespace(self, namespace):
+        """
+        Called with key namespace of manager, so that managers sharing a
+        storage do not see revocations of each other
+        """
+
+    async def open(self):
+        """
+        Called before server starts, to connect ahead of first request
+        """
+
+    async def close(self):
+        """
+        Called after server stops
+        """
+
+
+def _expires_at(token) -> float:
+    return calendar.timegm(token.exp.utctimetuple()) if token.exp else float("inf")
+
+
+def _subject_of(token) -> Optional[str]:
+    sub = getattr(token, "sub", None)
+    return str(sub) if sub is not None else None
+
+
+def _issued_before(token, watermark: Optional[float]) -> bool:
+    if not watermark:
+        return False
+
+    return calendar.timegm(token.iat.utctimetuple()) < watermark
+
 
 class InMemoryBlacklist(BlacklistABC):
-    def __init__(self):
-        self.blacklist = []
+    in_process = True
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self.blacklist: Dict[str, float] = {}
+        self.families: Dict[str, float] = {}
+        self.redeemed: Dict[str, float] = {}
+        self.subjects: Dict[str, Tuple[float, float]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._family_heap: List[Tuple[float, str]] = []
+        self._redeemed_heap: List[Tuple[float, str]] = []
+        self._subject_heap: List[Tuple[float, str]] = []
         warnings.warn(
             "Using in-memory blacklist is not recommended for production environment"
         )
 
+    @property
+    def size(self) -> int:
+        self._purge(time.time())
+        return len(self.blacklist)
+
+    @staticmethod
+    def _expire(store: Dict[str, float], heap: List[Tuple[float, str]], now: float):
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            if store.get(key) == expires_at:
+                del store[key]
+
+    def _purge(self, now: float) -> None:
+        self._expire(self.blacklist, self._expiry_heap, now)
+        self._expire(self.families, self._family_heap, now)
+        self._expire(self.redeemed, self._redeemed_heap, now)
+
+        while self._subject_heap and self._subject_heap[0][0] <= now:
+            expires_at, subject = heapq.heappop(self._subject_heap)
+            if self.subjects.get(subject, (None, None))[1] == expires_at:
+                del self.subjects[subject]
+
+    def _evict(self) -> None:
+        # drop revoked token closest to its expiry, it is least harmful to forget
+        while self._expiry_heap:
+            expires_at, jti = heapq.heappop(self._expiry_heap)
+            if self.blacklist.get(jti) == expires_at:
+                del self.blacklist[jti]
+                return
+
+    def _add(self, jti: str, expires_at: float) -> None:
+        if (
+            self.max_size is not None
+            and jti not in self.blacklist
+            and len(self.blacklist) >= self.max_size
+        ):
+            self._evict()
+
+        self.blacklist[jti] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, jti))
+
     async def register(self, token):
-        self.blacklist.append(token.jti)
+        self._purge(time.time())
+        self._add(token.jti.hex, _expires_at(token))
+
+    async def register_many(self, revoked):
+        self._purge(time.time())
+
+        for jti, expires_at in revoked:
+            self._add(jti.hex, expires_at)
 
     async def is_blacklisted(self, token):
-        return token.jti in self.blacklist
+        now = time.time()
+        expires_at = self.blacklist.get(token.jti.hex)
+
+        if expires_at is not None and expires_at > now:
+            return True
+
+        family = getattr(token, "family", None)
+        if family is not None:
+            expires_at = self.families.get(family)
+            if expires_at is not None and expires_at > now:
+                return True
+
+        subject = _subject_of(token)
+        if subject is not None and subject in self.subjects:
+            not_before, expires_at = self.subjects[subject]
+            return expires_at > now and _issued_before(token, not_before)
+
+        return False
+
+    async def revoke_family(self, family, expires_at):
+        self._purge(time.time())
+
+        self.families[family] = expires_at
+        heapq.heappush(self._family_heap, (expires_at, family))
+
+    async def redeem(self, token):
+        jti = token.jti.hex
+        now = time.time()
+        redeemed_until = self.redeemed.get(jti)
 
+        if redeemed_until is not None and redeemed_until > now:
+            return False
 
-class RedisBlacklist(BlacklistABC):  # pragma: no cover
-    def __init__(self, connection_info):
-        self.connection_info = connection_info
+        self._purge(now)
+
+        expires_at = _expires_at(token)
+        self.redeemed[jti] = expires_at
+        heapq.heappush(self._redeemed_heap, (expires_at, jti))
+
+        return True
+
+    async def revoke_subject(self, subject, not_before, expires_at):
+        self._purge(time.time())
+
+        previous, _ = self.subjects.get(subject, (not_before, None))
+        self.subjects[subject] = (max(previous, not_before), expires_at)
+        heapq.heappush(self._subject_heap, (expires_at, subject))
+
+
+class SharedMemoryBlacklist(BlacklistABC):
+    """
+    Blacklist in a shared memory hash table of ``capacity`` entries, seen by
+    every worker process forked after it is created (so it should be created
+    by ``JWT.initialize`` before ``app.run(workers=N)``). Lookups don't
+    leave the process, revocations take a lock shared by workers.
+    """
+
+    _FAMILIES = 0
+    _SUBJECTS = 1
+
+    def __init__(self, capacity: int = 65536, max_probes: int = 32):
+        self.table = SharedHashTable(capacity, max_probes)
+        # set once any family or subject is revoked, until then lookups
+        # skip hashing them
+        self.flags = mmap.mmap(-1, 2)
+
+    @property
+    def size(self) -> int:
+        return self.table.count(time.time())
 
     async def register(self, token):
-        if not RedisConnection.redis:
-            await RedisConnection.initialize(self.connection_info)
+        # jti is a random uuid already
+        self.table.put(token.jti.bytes, _expires_at(token), 0.0, time.time())
+
+    async def register_many(self, revoked):
+        self.table.put_many(
+            ((jti.bytes, expires_at, 0.0) for jti, expires_at in revoked), time.time()
+        )
+
+    async def is_blacklisted(self, token):
+        now = time.time()
+        table = self.table
+
+        if table.get(token.jti.bytes, now) is not None:
+            return True
+
+        family = getattr(token, "family", None)
+        if family is not None and self.flags[self._FAMILIES]:
+            if table.get(digest(b"fam:" + family.encode("utf-8")), now) is not None:
+                return True
+
+        if self.flags[self._SUBJECTS]:
+            subject = _subject_of(token)
+            if subject is not None:
+                entry = table.get(digest(b"sub:" + subject.encode("utf-8")), now)
+                return entry is not None and _issued_before(token, entry[1])
+
+        return False
+
+    async def revoke_family(self, family, expires_at):
+        key = digest(b"fam:" + family.encode("utf-8"))
+        self.table.put(key, expires_at, 0.0, time.time())
+        self.flags[self._FAMILIES] = 1
+
+    async def redeem(self, token):
+        key = digest(b"redeemed:" + token.jti.bytes)
+        return self.table.add(key, _expires_at(token), time.time())
+
+    async def revoke_subject(self, subject, not_before, expires_at):
+        key = digest(b"sub:" + subject.encode("utf-8"))
+        self.table.put(key, expires_at, not_before, time.time())
+        self.flags[self._SUBJECTS] = 1
 
-        kwargs = {}
 
-        if token.exp:
-            kwargs["expire"] = token.exp
+class RedisBlacklist(BlacklistABC):
+    """
+    Blacklist stored in redis. Concurrent lookups within ``lookup_window``
+    seconds are fetched by one MGET. Subject watermarks are cached in each
+    process for ``watermark_ttl`` seconds.
+    """
 
-        await RedisConnection.set(token.jti.hex, token.raw_jwt, **kwargs)
+    jti_key_prefix = ""
+    family_key_prefix = "sanic_jwt_extended:family:"
+    redeemed_key_prefix = "sanic_jwt_extended:redeemed:"
+    subject_key_prefix = "sanic_jwt_extended:subject:"
+
+    def __init__(
+        self,
+        connection_info,
+        lookup_window: float = 0.0,
+        watermark_ttl: float = 1.0,
+        watermark_cache_size: int = 65536,
+        chunk_size: int = 1000,
+    ):
+        self.connection = RedisConnection(connection_info)
+        self.lookup_window = lookup_window
+        self.chunk_size = chunk_size
+        self.watermarks = TTLCache(watermark_cache_size, watermark_ttl)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def set_namespace(self, namespace):
+        cls = type(self)
+        self.jti_key_prefix = namespace + cls.jti_key_prefix
+        self.family_key_prefix = namespace + cls.family_key_prefix
+        self.redeemed_key_prefix = namespace + cls.redeemed_key_prefix
+        self.subject_key_prefix = namespace + cls.subject_key_prefix
+
+    async def open(self):
+        await self.connection.initialize()
+
+    async def close(self):
+        await self.connection.release()
+
+    async def register(self, token):
+        await self.register_many(((token.jti, _expires_at(token)),))
+
+    async def register_many(self, revoked):
+        now = time.time()
+
+        # value is only tested for presence
+        await self.connection.set_many(
+            (
+                (self.jti_key_prefix + jti.hex, 1, expire_in(expires_at, now))
+                for jti, expires_at in revoked
+                if expires_at > now
+            ),
+            self.chunk_size,
+        )
 
     async def is_blacklisted(self, token):
-        if not RedisConnection.redis:
-            await RedisConnection.initialize(self.connection_info)
+        # every key is fetched by the same MGET
+        lookups = [self._lookup(self.jti_key_prefix + token.jti.hex)]
+
+        family = getattr(token, "family", None)
+        if family is not None:
+            lookups.append(self._lookup(self.family_key_prefix + family))
+
+        subject = _subject_of(token)
+        watermark = None
+        if subject is not None:
+            watermark = self.watermarks.get(subject)
+            if watermark is None:
+                lookups.append(self._watermark_lookup(subject))
+
+        values = await asyncio.gather(*lookups)
+
+        if subject is not None and watermark is None:
+            watermark = values.pop()
+
+        return any(value is not None for value in values) or _issued_before(
+            token, watermark
+        )
+
+    async def _watermark_lookup(self, subject):
+        # 0 is cached for subjects without watermark
+        watermark = await self._lookup(self.subject_key_prefix + subject) or 0
+        self.watermarks.set(subject, watermark)
+
+        return watermark
+
+    async def _watermark(self, subject):
+        watermark = self.watermarks.get(subject)
+
+        if watermark is None:
+            watermark = await self._watermark_lookup(subject)
+
+        return watermark
+
+    def _lookup(self, key):
+        future = self._pending.get(key)
+
+        if future is None:
+            loop = asyncio.get_event_loop()
+            future = self._pending[key] = loop.create_future()
+
+            if self._flush_task is None:
+                self._flush_task = loop.create_task(self._flush())
+
+        # shield so that a cancelled request does not cancel lookup of others
+        return asyncio.shield(future)
+
+    async def revoke_family(self, family, expires_at):
+        await self.connection.set(
+            self.family_key_prefix + family,
+            1,
+            expire=expire_in(expires_at, time.time()),
+        )
+
+    async def revoke_subject(self, subject, not_before, expires_at):
+        await self.connection.set(
+            self.subject_key_prefix + subject,
+            not_before,
+            expire=expire_in(expires_at, time.time()),
+        )
+        self.watermarks.set(subject, not_before)
+
+    async def redeem(self, token):
+        expires_at = _expires_at(token)
+
+        return await self.connection.set_if_not_exists(
+            self.redeemed_key_prefix + token.jti.hex,
+            1,
+            expires_at if expires_at != float("inf") else None,
+        )
+
+    async def _flush(self):
+        await asyncio.sleep(self.lookup_window)
+
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+
+        try:
+            values = await self.connection.mget(*pending)
+        except Exception as e:  # pylint: disable=broad-except
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, value in zip(pending.values(), values):
+            if not future.done():
+                future.set_result(value)
+
+
+class CachedRedisBlacklist(RedisBlacklist):
+    """
+    RedisBlacklist with a per-process cache of lookup results. Revocations are
+    published to ``channel`` so that other processes drop their cached results.
+    A result can be stale for at most ``cache_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        connection_info,
+        lookup_window: float = 0.0,
+        cache_ttl: float = 1.0,
+        cache_size: int = 65536,
+        channel: str = "sanic_jwt_extended:revoked",
+        chunk_size: int = 1000,
+    ):
+        super().__init__(
+            connection_info, lookup_window, cache_ttl, cache_size, chunk_size
+        )
+        self.cache_ttl = cache_ttl
+        self.channel_name = channel
+        self.channel = channel
+        self.cache = TTLCache(cache_size)
+        self._listener: Optional[asyncio.Task] = None
+
+    def set_namespace(self, namespace):
+        super().set_namespace(namespace)
+        self.channel = namespace + self.channel_name
+
+    def _ensure_listener(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_event_loop().create_task(self._listen())
+
+    async def _listen(self):
+        channel = await self.connection.subscribe(self.channel)
+
+        async for key in channel.iter(encoding="utf-8"):
+            if key.startswith(self.family_key_prefix):
+                self.cache.set(key, True)
+            elif key.startswith(self.subject_key_prefix):
+                self.watermarks.evict(key[len(self.subject_key_prefix) :])
+            else:
+                self.cache.evict(key)
+
+    async def open(self):
+        await super().open()
+        self._ensure_listener()
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+        await self.connection.unsubscribe(self.channel)
+        await super().close()
+
+    async def register_many(self, revoked):
+        revoked = list(revoked)
+        await super().register_many(revoked)
+
+        for jti, expires_at in revoked:
+            self.cache.set(jti.hex, True, expires_at)
+
+        await self.connection.publish_many(
+            self.channel, (jti.hex for jti, _ in revoked), self.chunk_size
+        )
+
+    async def revoke_family(self, family, expires_at):
+        await super().revoke_family(family, expires_at)
+
+        key = self.family_key_prefix + family
+        self.cache.set(key, True, expires_at)
+        await self.connection.publish(self.channel, key)
+
+    async def revoke_subject(self, subject, not_before, expires_at):
+        await super().revoke_subject(subject, not_before, expires_at)
+        await self.connection.publish(self.channel, self.subject_key_prefix + subject)
+
+    async def is_blacklisted(self, token):
+        self._ensure_listener()
+
+        family = getattr(token, "family", None)
+        if family is not None and self.cache.get(self.family_key_prefix + family):
+            return True
+
+        jti = token.jti.hex
+        revoked = self.cache.get(jti)
+
+        if revoked is None:
+            revoked = await super().is_blacklisted(token)
+            self.cache.set(
+                jti,
+                revoked,
+                _expires_at(token) if revoked else time.time() + self.cache_ttl,
+            )
+        elif not revoked:
+            # watermark may have been raised after result of jti was cached
+            subject = _subject_of(token)
+            if subject is not None:
+                return _issued_before(token, await self._watermark(subject))
+
+        return revoked
+
+
+class BloomFilterBlacklist(BlacklistABC):
+    """
+    Probabilistic prefilter in front of another blacklist. Lookups of tokens
+    which were definitely never revoked are answered without asking backend.
+
+    With ``sync_interval``, revocations are also written to redis bitmaps and
+    each process merges them at most ``sync_interval`` seconds apart. It is
+    required unless backend is in-process, as filter of a fresh process would
+    miss tokens revoked before it started or in other processes.
+    """
+
+    def __init__(
+        self,
+        backend_class: Type[BlacklistABC] = InMemoryBlacklist,
+        backend_init_kwargs: Optional[Dict[str, Any]] = None,
+        capacity: int = 10000,
+        error_rate: float = 0.001,
+        max_bytes: Optional[int] = None,
+        generation_period: float = 86400.0,
+        generations: int = 31,
+        sync_interval: Optional[float] = None,
+        key_prefix: str = "sanic_jwt_extended:bloom",
+    ):
+        if sync_interval is None and not backend_class.in_process:
+            raise ConfigurationConflictError(
+                f"{backend_class.__name__} is shared between processes. "
+                "set sync_interval so that filter sees every revoked token."
+            )
+
+        self.backend = backend_class(**(backend_init_kwargs or {}))
+        self.filter = GenerationalBloomFilter(
+            capacity, error_rate, generation_period, generations, max_bytes
+        )
+        self.connection: Optional[RedisConnection] = getattr(
+            self.backend, "connection", None
+        )
+        if sync_interval is not None and self.connection is None:
+            raise ConfigurationConflictError(
+                f"{backend_class.__name__} is not a redis blacklist, "
+                "so revocations can not be synced."
+            )
+
+        self.sync_interval = sync_interval
+        self.key_prefix_name = key_prefix
+        self.key_prefix = key_prefix
+        self._synced_at = float("-inf")
+        self._sync_task: Optional[asyncio.Future] = None
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.filter.fill_ratio
+
+    def set_namespace(self, namespace):
+        self.backend.set_namespace(namespace)
+        self.key_prefix = namespace + self.key_prefix_name
+
+    def _key(self, generation: int) -> str:
+        return f"{self.key_prefix}:{generation}"
+
+    async def _sync(self):
+        try:
+            generations = self.filter.live_generations()
+            bitmaps = await self.connection.mget_raw(*map(self._key, generations))
+
+            for generation, bitmap in zip(generations, bitmaps):
+                if bitmap:
+                    self.filter.merge(generation, bitmap)
+
+            self._synced_at = time.monotonic()
+        finally:
+            self._sync_task = None
+
+    async def _ensure_synced(self) -> bool:
+        if time.monotonic() - self._synced_at < self.sync_interval:
+            return True
+
+        if self._sync_task is None:
+            self._sync_task = asyncio.ensure_future(self._sync())
+
+        try:
+            await asyncio.shield(self._sync_task)
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+        return True
+
+    async def _add(self, item: bytes, expires_at: float) -> None:
+        await self._add_many(((item, expires_at),))
+
+    async def _add_many(self, items: Iterable[Tuple[bytes, float]]) -> None:
+        # bits are synced by one write for each generation
+        generations: Dict[int, List[int]] = {}
+
+        for item, expires_at in items:
+            positions = self.filter.positions(item)
+            generation = self.filter.generation_of(expires_at)
+            self.filter.add(positions, generation)
+            generations.setdefault(generation, []).extend(positions)
+
+        if self.sync_interval is not None:
+            for generation, positions in generations.items():
+                await self.connection.setbits(
+                    self._key(generation), positions, self.filter.expires_at(generation)
+                )
+
+    async def open(self):
+        await self.backend.open()
+
+    def supports(self, *methods):
+        return super().supports(*methods) and self.backend.supports(*methods)
+
+    async def close(self):
+        await self.backend.close()
+
+    async def register(self, token):
+        await self.backend.register(token)
+        await self._add(token.jti.bytes, _expires_at(token))
+
+    async def register_many(self, revoked):
+        revoked = list(revoked)
+        await self.backend.register_many(revoked)
+        await self._add_many((jti.bytes, expires_at) for jti, expires_at in revoked)
+
+    async def revoke_family(self, family, expires_at):
+        await self.backend.revoke_family(family, expires_at)
+        await self._add(family.encode("utf-8"), expires_at)
+
+    async def redeem(self, token):
+        return await self.backend.redeem(token)
+
+    async def revoke_subject(self, subject, not_before, expires_at):
+        await self.backend.revoke_subject(subject, not_before, expires_at)
+        await self._add(b"sub:" + subject.encode("utf-8"), expires_at)
+
+    async def is_blacklisted(self, token):
+        if self.sync_interval is not None and not await self._ensure_synced():
+            return await self.backend.is_blacklisted(token)
+
+        items = [token.jti.bytes]
+
+        family = getattr(token, "family", None)
+        if family is not None:
+            items.append(family.encode("utf-8"))
+
+        subject = _subject_of(token)
+        if subject is not None:
+            items.append(b"sub:" + subject.encode("utf-8"))
+
+        if not any(self.filter.might_contain(self.filter.positions(i)) for i in items):
+            return False
 
-        return bool(RedisConnection.get(token.jti.hex))
+        return await self.backend.is_blacklisted(token)
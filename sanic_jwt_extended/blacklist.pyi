@@ -3,25 +3,211 @@
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
 import abc
+import asyncio
+import datetime
+import mmap
+import uuid
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
 
+from sanic_jwt_extended.bloom import GenerationalBloomFilter
+from sanic_jwt_extended.cache import TTLCache
+from sanic_jwt_extended.redis import ConnectionInfo, RedisConnection
+from sanic_jwt_extended.shm import SharedHashTable
 from sanic_jwt_extended.tokens import Token
 
+class _Revoked(NamedTuple):
+    jti: uuid.UUID
+    exp: Optional[datetime.datetime]
+
 class BlacklistABC(ABC, metaclass=abc.ABCMeta):
+    in_process: bool = ...
     @abstractmethod
     async def register(self, token: Token) -> None: ...
+    async def register_many(
+        self, revoked: Iterable[Tuple[uuid.UUID, float]]
+    ) -> None: ...
     @abstractmethod
     async def is_blacklisted(self, token: Token) -> bool: ...
+    async def revoke_family(self, family: str, expires_at: float) -> None: ...
+    async def redeem(self, token: Token) -> bool: ...
+    async def revoke_subject(
+        self, subject: str, not_before: float, expires_at: float
+    ) -> None: ...
+    def supports(self, *methods: str) -> bool: ...
+    def set_namespace(self, namespace: str) -> None: ...
+    async def open(self) -> None: ...
+    async def close(self) -> None: ...
+
+def _expires_at(token: Token) -> float: ...
+def _subject_of(token: Token) -> Optional[str]: ...
+def _issued_before(token: Token, watermark: Optional[float]) -> bool: ...
 
 class InMemoryBlacklist(BlacklistABC):
-    blacklist: Any = ...
-    def __init__(self) -> None: ...
+    max_size: Optional[int] = ...
+    blacklist: Dict[str, float] = ...
+    families: Dict[str, float] = ...
+    redeemed: Dict[str, float] = ...
+    subjects: Dict[str, Tuple[float, float]] = ...
+    _expiry_heap: List[Tuple[float, str]] = ...
+    _family_heap: List[Tuple[float, str]] = ...
+    _redeemed_heap: List[Tuple[float, str]] = ...
+    _subject_heap: List[Tuple[float, str]] = ...
+    def __init__(self, max_size: Optional[int] = ...) -> None: ...
+    @property
+    def size(self) -> int: ...
+    @staticmethod
+    def _expire(
+        store: Dict[str, float], heap: List[Tuple[float, str]], now: float
+    ) -> None: ...
+    def _purge(self, now: float) -> None: ...
+    def _evict(self) -> None: ...
+    def _add(self, jti: str, expires_at: float) -> None: ...
+    async def register(self, token: Token) -> None: ...
+    async def register_many(
+        self, revoked: Iterable[Tuple[uuid.UUID, float]]
+    ) -> None: ...
+    async def is_blacklisted(self, token: Token) -> bool: ...
+    async def revoke_family(self, family: str, expires_at: float) -> None: ...
+    async def redeem(self, token: Token) -> bool: ...
+    async def revoke_subject(
+        self, subject: str, not_before: float, expires_at: float
+    ) -> None: ...
+
+class SharedMemoryBlacklist(BlacklistABC):
+    _FAMILIES: int = ...
+    _SUBJECTS: int = ...
+    table: SharedHashTable = ...
+    flags: mmap.mmap = ...
+    def __init__(self, capacity: int = ..., max_probes: int = ...) -> None: ...
+    @property
+    def size(self) -> int: ...
     async def register(self, token: Token) -> None: ...
+    async def register_many(
+        self, revoked: Iterable[Tuple[uuid.UUID, float]]
+    ) -> None: ...
     async def is_blacklisted(self, token: Token) -> bool: ...
+    async def revoke_family(self, family: str, expires_at: float) -> None: ...
+    async def redeem(self, token: Token) -> bool: ...
+    async def revoke_subject(
+        self, subject: str, not_before: float, expires_at: float
+    ) -> None: ...
 
 class RedisBlacklist(BlacklistABC):
-    def __init__(self):
-        self.connection_info = ...
+    jti_key_prefix: str = ...
+    family_key_prefix: str = ...
+    redeemed_key_prefix: str = ...
+    subject_key_prefix: str = ...
+    connection: RedisConnection = ...
+    lookup_window: float = ...
+    chunk_size: int = ...
+    watermarks: TTLCache = ...
+    _pending: Dict[str, asyncio.Future] = ...
+    _flush_task: Optional[asyncio.Task] = ...
+    def __init__(
+        self,
+        connection_info: ConnectionInfo,
+        lookup_window: float = ...,
+        watermark_ttl: float = ...,
+        watermark_cache_size: int = ...,
+        chunk_size: int = ...,
+    ) -> None: ...
+    def set_namespace(self, namespace: str) -> None: ...
+    async def open(self) -> None: ...
+    async def close(self) -> None: ...
+    async def register(self, token: Token) -> None: ...
+    async def register_many(
+        self, revoked: Iterable[Tuple[uuid.UUID, float]]
+    ) -> None: ...
+    async def is_blacklisted(self, token: Token) -> bool: ...
+    async def _watermark_lookup(self, subject: str) -> float: ...
+    async def _watermark(self, subject: str) -> float: ...
+    def _lookup(self, key: str) -> Awaitable[Any]: ...
+    async def revoke_family(self, family: str, expires_at: float) -> None: ...
+    async def redeem(self, token: Token) -> bool: ...
+    async def revoke_subject(
+        self, subject: str, not_before: float, expires_at: float
+    ) -> None: ...
+    async def _flush(self) -> None: ...
+
+class CachedRedisBlacklist(RedisBlacklist):
+    cache_ttl: float = ...
+    channel_name: str = ...
+    channel: str = ...
+    cache: TTLCache = ...
+    _listener: Optional[asyncio.Task] = ...
+    def __init__(
+        self,
+        connection_info: ConnectionInfo,
+        lookup_window: float = ...,
+        cache_ttl: float = ...,
+        cache_size: int = ...,
+        channel: str = ...,
+        chunk_size: int = ...,
+    ) -> None: ...
+    def set_namespace(self, namespace: str) -> None: ...
+    def _ensure_listener(self) -> None: ...
+    async def _listen(self) -> None: ...
+    async def open(self) -> None: ...
+    async def close(self) -> None: ...
+    async def register_many(
+        self, revoked: Iterable[Tuple[uuid.UUID, float]]
+    ) -> None: ...
+    async def revoke_family(self, family: str, expires_at: float) -> None: ...
+    async def revoke_subject(
+        self, subject: str, not_before: float, expires_at: float
+    ) -> None: ...
+    async def is_blacklisted(self, token: Token) -> bool: ...
+
+class BloomFilterBlacklist(BlacklistABC):
+    backend: BlacklistABC = ...
+    filter: GenerationalBloomFilter = ...
+    connection: Optional[RedisConnection] = ...
+    sync_interval: Optional[float] = ...
+    key_prefix_name: str = ...
+    key_prefix: str = ...
+    _synced_at: float = ...
+    _sync_task: Optional[asyncio.Future] = ...
+    def __init__(
+        self,
+        backend_class: Type[BlacklistABC] = ...,
+        backend_init_kwargs: Optional[Dict[str, Any]] = ...,
+        capacity: int = ...,
+        error_rate: float = ...,
+        max_bytes: Optional[int] = ...,
+        generation_period: float = ...,
+        generations: int = ...,
+        sync_interval: Optional[float] = ...,
+        key_prefix: str = ...,
+    ) -> None: ...
+    @property
+    def fill_ratio(self) -> float: ...
+    def set_namespace(self, namespace: str) -> None: ...
+    def supports(self, *methods: str) -> bool: ...
+    def _key(self, generation: int) -> str: ...
+    async def _sync(self) -> None: ...
+    async def _ensure_synced(self) -> bool: ...
+    async def _add(self, item: bytes, expires_at: float) -> None: ...
+    async def _add_many(self, items: Iterable[Tuple[bytes, float]]) -> None: ...
+    async def open(self) -> None: ...
+    async def close(self) -> None: ...
     async def register(self, token: Token) -> None: ...
+    async def register_many(
+        self, revoked: Iterable[Tuple[uuid.UUID, float]]
+    ) -> None: ...
+    async def revoke_family(self, family: str, expires_at: float) -> None: ...
+    async def redeem(self, token: Token) -> bool: ...
+    async def revoke_subject(
+        self, subject: str, not_before: float, expires_at: float
+    ) -> None: ...
     async def is_blacklisted(self, token: Token) -> bool: ...
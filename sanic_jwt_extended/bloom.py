@@ -0,0 +1,166 @@
+import hashlib
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+_LN2 = math.log(2)
+
+
+def bloom_positions(item: bytes, size: int, hash_count: int) -> List[int]:
+    digest = hashlib.blake2b(item, digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:], "big") | 1
+
+    return [(h1 + i * h2) % size for i in range(hash_count)]
+
+
+class BloomFilter:
+    """
+    Bloom filter over a bit array laid out like redis bitmaps,
+    so that it can be synchronised with ``SETBIT``/``GET``.
+    """
+
+    def __init__(self, size: int, hash_count: int):
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bytearray((size + 7) // 8)
+        self.set_bits = 0
+
+    @classmethod
+    def for_capacity(
+        cls, capacity: int, error_rate: float, max_bytes: Optional[int] = None
+    ) -> "BloomFilter":
+        size = math.ceil(-capacity * math.log(error_rate) / (_LN2 * _LN2))
+        if max_bytes is not None:
+            size = min(size, max_bytes * 8)
+
+        hash_count = max(1, round(size / capacity * _LN2))
+
+        return cls(size, hash_count)
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.set_bits / self.size
+
+    def positions(self, item: bytes) -> List[int]:
+        return bloom_positions(item, self.size, self.hash_count)
+
+    def add(self, positions: Iterable[int]) -> None:
+        bits = self.bits
+
+        for position in positions:
+            mask = 0x80 >> (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                self.set_bits += 1
+
+    def has(self, positions: Iterable[int]) -> bool:
+        bits = self.bits
+
+        for position in positions:
+            if not bits[position >> 3] & (0x80 >> (position & 7)):
+                return False
+
+        return True
+
+    def merge(self, data: bytes) -> None:
+        data = data[: len(self.bits)]
+        merged = int.from_bytes(self.bits, "big") | int.from_bytes(
+            data.ljust(len(self.bits), b"\0"), "big"
+        )
+
+        self.bits = bytearray(merged.to_bytes(len(self.bits), "big"))
+        self.set_bits = bin(merged).count("1")
+
+
+class GenerationalBloomFilter:
+    """
+    Set of bloom filters, one for each ``period`` seconds long generation of
+    expiry time. A generation is dropped as soon as every item in it has expired.
+    Items expiring after ``generations`` periods (or never) are kept in a
+    permanent generation.
+    """
+
+    PERMANENT = -1
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        period: float,
+        generations: int,
+        max_bytes: Optional[int] = None,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.period = period
+        self.generations = generations
+        self.max_bytes = max_bytes
+        self.filters: Dict[int, BloomFilter] = {}
+        self._drop_at = 0.0
+
+        template = self._new_filter()
+        self.size, self.hash_count = template.size, template.hash_count
+
+    def _new_filter(self) -> BloomFilter:
+        return BloomFilter.for_capacity(self.capacity, self.error_rate, self.max_bytes)
+
+    @property
+    def fill_ratio(self) -> float:
+        return max((f.fill_ratio for f in self.filters.values()), default=0.0)
+
+    def live_generations(self) -> List[int]:
+        current = int(time.time() // self.period)
+        return [*range(current, current + self.generations), self.PERMANENT]
+
+    def generation_of(self, expires_at: float) -> int:
+        if math.isinf(expires_at):
+            return self.PERMANENT
+
+        generation = int(expires_at // self.period)
+        if generation >= int(time.time() // self.period) + self.generations:
+            return self.PERMANENT
+
+        return generation
+
+    def expires_at(self, generation: int) -> Optional[float]:
+        if generation == self.PERMANENT:
+            return None
+        return (generation + 1) * self.period
+
+    def _drop_expired(self) -> None:
+        now = time.time()
+        if now < self._drop_at:
+            return
+
+        current = int(now // self.period)
+        self._drop_at = (current + 1) * self.period
+
+        for generation in [g for g in self.filters if g != self.PERMANENT]:
+            if generation < current:
+                del self.filters[generation]
+
+    def positions(self, item: bytes) -> List[int]:
+        return bloom_positions(item, self.size, self.hash_count)
+
+    def add(self, positions: List[int], generation: int) -> None:
+        self._drop_expired()
+
+        if generation != self.PERMANENT and generation < time.time() // self.period:
+            return
+
+        if generation not in self.filters:
+            self.filters[generation] = self._new_filter()
+
+        self.filters[generation].add(positions)
+
+    def might_contain(self, positions: List[int]) -> bool:
+        self._drop_expired()
+
+        return any(f.has(positions) for f in self.filters.values())
+
+    def merge(self, generation: int, data: bytes) -> None:
+        if generation not in self.filters:
+            self.filters[generation] = self._new_filter()
+
+        self.filters[generation].merge(data)
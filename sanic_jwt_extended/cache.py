@@ -0,0 +1,77 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after ``ttl`` seconds
+    or at given absolute timestamp, whichever comes first.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _key(self, key: Any) -> Hashable:
+        return key
+
+    def get(self, key: Any) -> Any:
+        key = self._key(key)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def set(self, key: Any, value: Any, exp: Optional[float] = None) -> None:
+        expires_at = float("inf")
+
+        if self.ttl is not None:
+            expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+
+        key = self._key(key)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def evict(self, key: Any) -> None:
+        self._entries.pop(self._key(key), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class TokenCache(TTLCache):
+    """
+    Cache of already verified tokens, keyed by a digest of the raw JWT.
+    Entries never outlive the ``exp`` claim of the token they were built from.
+    """
+
+    def _key(self, key: str) -> bytes:
+        return hashlib.sha256(key.encode("utf-8")).digest()
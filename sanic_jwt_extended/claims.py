@@ -0,0 +1,93 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+REGISTERED_CLAIMS = ("iss", "sub", "aud", "exp", "nbf", "iat", "jti")
+
+_PUBLIC = 0
+_PRIVATE = 1
+_RESERVED = 2
+
+
+class ClaimLayout:
+    """
+    Mapping between claim names in payload and public/private claims,
+    compiled once from ``public_claim_namespace`` and ``private_claim_prefix``.
+    Nested public claims are stored flat with ``/`` separated paths.
+    Classification of payload keys is cached, up to ``max_cached_keys`` keys.
+    """
+
+    def __init__(
+        self,
+        public_claim_namespace: str = "",
+        private_claim_prefix: str = "",
+        reserved_claims: Iterable[str] = (),
+        max_cached_keys: int = 4096,
+    ):
+        self.namespace = public_claim_namespace
+        self.private_prefix = f"{private_claim_prefix}_" if private_claim_prefix else ""
+        self.reserved = frozenset((*REGISTERED_CLAIMS, *reserved_claims))
+        self.max_cached_keys = max_cached_keys
+
+        self._payload_keys: Dict[str, Tuple[int, Any]] = {}
+
+    def _flatten(self, claims: Dict[str, Any], prefix: str, out: Dict[str, Any]):
+        for name, value in claims.items():
+            if isinstance(value, dict):
+                self._flatten(value, f"{prefix}{name}/", out)
+            else:
+                out[prefix + name] = value
+
+    def encode(
+        self,
+        payload: Dict[str, Any],
+        public_claims: Optional[Dict[str, Any]] = None,
+        private_claims: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        if public_claims:
+            self._flatten(public_claims, self.namespace, payload)
+
+        if private_claims:
+            prefix = self.private_prefix
+            payload.update(
+                {prefix + k: v for k, v in private_claims.items()}
+                if prefix
+                else private_claims
+            )
+
+        return payload
+
+    def _classify(self, key: str) -> Tuple[int, Any]:
+        if key in self.reserved:
+            kind: Tuple[int, Any] = (_RESERVED, None)
+        elif self.namespace and key.startswith(self.namespace):
+            kind = (_PUBLIC, tuple(key[len(self.namespace) :].split("/")))
+        elif key.startswith(self.private_prefix):
+            kind = (_PRIVATE, key[len(self.private_prefix) :])
+        else:
+            kind = (_RESERVED, None)
+
+        if len(self._payload_keys) < self.max_cached_keys:
+            self._payload_keys[key] = kind
+
+        return kind
+
+    def split(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Returns ``(public_claims, private_claims)`` of payload
+        """
+        public_claims: Dict[str, Any] = {}
+        private_claims: Dict[str, Any] = {}
+        payload_keys = self._payload_keys
+
+        for key, value in payload.items():
+            kind, name = payload_keys.get(key) or self._classify(key)
+
+            if kind == _PRIVATE:
+                private_claims[name] = value
+            elif kind == _PUBLIC:
+                *parents, leaf = name
+                node = public_claims
+                for parent in parents:
+                    node = node.setdefault(parent, {})
+                node[leaf] = value
+
+        return public_claims, private_claims
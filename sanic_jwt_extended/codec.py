@@ -0,0 +1,104 @@
+import json
+from abc import ABC, abstractmethod
+from json import JSONEncoder
+from typing import Any, Dict, Type, Union
+
+from sanic_jwt_extended.exceptions import ConfigurationConflictError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None  # type: ignore
+
+
+class JSONCodecABC(ABC):  # pragma: no cover
+    name: str
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        pass
+
+
+class StdlibCodec(JSONCodecABC):
+    name = "json"
+
+    def __init__(self, json_encoder: Type[JSONEncoder] = JSONEncoder):
+        self.json_encoder = json_encoder
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), cls=self.json_encoder).encode(
+            "utf-8"
+        )
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class UJSONCodec(JSONCodecABC):
+    name = "ujson"
+
+    def dumps(self, obj):
+        return ujson.dumps(
+            obj, ensure_ascii=False, escape_forward_slashes=False
+        ).encode("utf-8")
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+class ORJSONCodec(JSONCodecABC):
+    name = "orjson"
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+CODECS: Dict[str, Type[JSONCodecABC]] = {
+    "json": StdlibCodec,
+    "ujson": UJSONCodec,
+    "orjson": ORJSONCodec,
+}
+
+_AVAILABLE = {"json": True, "ujson": ujson is not None, "orjson": orjson is not None}
+
+
+def resolve_codec(
+    codec: Union[str, JSONCodecABC], json_encoder: Type[JSONEncoder] = JSONEncoder
+) -> JSONCodecABC:
+    if isinstance(codec, JSONCodecABC):
+        return codec
+
+    custom_encoder = json_encoder is not JSONEncoder
+
+    if codec == "auto":
+        if custom_encoder:
+            # only stdlib json can honour custom encoder
+            return StdlibCodec(json_encoder)
+
+        codec = next(name for name in ("orjson", "ujson", "json") if _AVAILABLE[name])
+
+    if codec not in CODECS:
+        raise ConfigurationConflictError(f"Unknown json codec '{codec}'")
+    if not _AVAILABLE[codec]:
+        raise ConfigurationConflictError(f"json codec '{codec}' is not installed")
+    if custom_encoder and codec != "json":
+        raise ConfigurationConflictError(
+            "json_encoder can only be used with 'json' codec"
+        )
+
+    if codec == "json":
+        return StdlibCodec(json_encoder)
+
+    return CODECS[codec]()
@@ -1,9 +1,13 @@
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import timedelta
 from json import JSONEncoder
-from typing import Any, Dict, Optional, Tuple, Type, Union
+from typing import Any, Dict, Optional, Sequence, Tuple, Type, Union
 
 from sanic_jwt_extended.blacklist import BlacklistABC
+from sanic_jwt_extended.codec import JSONCodecABC
+from sanic_jwt_extended.metrics import MetricsSinkABC
+from sanic_jwt_extended.reference import ReferenceStoreABC
 
 
 @dataclass
@@ -15,6 +19,7 @@ class Config:
 
     public_key: Optional[str] = None
     private_key: Optional[str] = None
+    key_id: Optional[str] = None
 
     # Default values for reserved claims
     default_iss: Optional[str] = None
@@ -22,10 +27,13 @@ class Config:
 
     # General configs
     json_encoder: Any = JSONEncoder
+    json_codec: Union[str, JSONCodecABC] = "auto"
     token_location: Tuple[str] = ("header",)
     access_token_expires: Union[timedelta, bool] = timedelta(minutes=15)
     refresh_token_expires: Union[timedelta, bool] = timedelta(days=30)
     algorithm: str = "HS256"
+    max_token_length: Optional[int] = None
+    header_cache_size: int = 64
 
     public_claim_namespace: str = ""  # should be URL
     private_claim_prefix: str = ""
@@ -52,11 +60,36 @@ class Config:
     # ACL config
     use_acl: bool = False
     acl_claim: str = "role"
+    acl_roles: Optional[Dict[str, Sequence[str]]] = None
+    acl_permissions: Optional[Dict[str, Sequence[str]]] = None
 
     # Blacklist config
     use_blacklist: bool = False
     blacklist_class: Optional[Type[BlacklistABC]] = None
     blacklist_init_kwargs: Optional[Dict[str, Any]] = None
+    key_namespace: Optional[str] = None
+
+    # Refresh token rotation config
+    refresh_token_rotation: bool = False
+
+    # Reference token config
+    use_reference_tokens: bool = False
+    reference_store_class: Optional[Type[ReferenceStoreABC]] = None
+    reference_store_init_kwargs: Optional[Dict[str, Any]] = None
+    reference_cache_size: int = 1024
+    reference_cache_ttl: Optional[timedelta] = timedelta(seconds=1)
+
+    # Verified token cache config
+    use_token_cache: bool = False
+    token_cache_size: int = 1024
+    token_cache_ttl: Optional[timedelta] = None
+
+    # Crypto offloading config
+    offload_crypto: bool = False
+    crypto_executor: Optional[Executor] = None
+
+    # Instrumentation config
+    metrics_sink: Optional[MetricsSinkABC] = None
 
     def __setattr__(self, key, value):
         if self.read_only:
@@ -2,23 +2,31 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
+from concurrent.futures import Executor
 from datetime import timedelta
-from typing import Any, Dict, Optional, Tuple, Type, Union
+from typing import Any, Dict, Optional, Sequence, Tuple, Type, Union
 
 from sanic_jwt_extended.blacklist import BlacklistABC
+from sanic_jwt_extended.codec import JSONCodecABC
+from sanic_jwt_extended.metrics import MetricsSinkABC
+from sanic_jwt_extended.reference import ReferenceStoreABC
 
 class Config:
     read_only: bool = ...
     secret_key: Optional[str] = ...
     public_key: Optional[str] = ...
     private_key: Optional[str] = ...
+    key_id: Optional[str] = ...
     default_iss: Optional[str] = ...
     default_aud: Optional[str] = ...
     json_encoder: Any = ...
+    json_codec: Union[str, JSONCodecABC] = ...
     token_location: Tuple[str] = ...
     access_token_expires: Union[timedelta, bool] = ...
     refresh_token_expires: Union[timedelta, bool] = ...
     algorithm: str = ...
+    max_token_length: Optional[int] = ...
+    header_cache_size: int = ...
     public_claim_namespace: str = ...
     private_claim_prefix: str = ...
     jwt_header_key: str = ...
@@ -34,9 +42,24 @@ class Config:
     jwt_query_param_name: str = ...
     use_acl: bool = ...
     acl_claim: str = ...
+    acl_roles: Optional[Dict[str, Sequence[str]]] = ...
+    acl_permissions: Optional[Dict[str, Sequence[str]]] = ...
     use_blacklist: bool = ...
     blacklist_class: Optional[Type[BlacklistABC]] = ...
     blacklist_init_kwargs: Optional[Dict[str, Any]] = ...
+    key_namespace: Optional[str] = ...
+    refresh_token_rotation: bool = ...
+    use_reference_tokens: bool = ...
+    reference_store_class: Optional[Type[ReferenceStoreABC]] = ...
+    reference_store_init_kwargs: Optional[Dict[str, Any]] = ...
+    reference_cache_size: int = ...
+    reference_cache_ttl: Optional[timedelta] = ...
+    use_token_cache: bool = ...
+    token_cache_size: int = ...
+    token_cache_ttl: Optional[timedelta] = ...
+    offload_crypto: bool = ...
+    crypto_executor: Optional[Executor] = ...
+    metrics_sink: Optional[MetricsSinkABC] = ...
     def __setattr__(self, key: Any, value: Any) -> None: ...
     def __init__(
         self,
@@ -44,19 +67,38 @@ class Config:
         secret_key: Optional[str] = ...,
         public_key: Optional[str] = ...,
         private_key: Optional[str] = ...,
+        key_id: Optional[str] = ...,
         default_iss: Optional[str] = ...,
         default_aud: Optional[str] = ...,
         json_encoder: Any = ...,
+        json_codec: Union[str, JSONCodecABC] = ...,
         token_location: Tuple[str] = ...,
         access_token_expires: Union[timedelta, bool] = ...,
         refresh_token_expires: Union[timedelta, bool] = ...,
         algorithm: Optional[str] = ...,
+        max_token_length: Optional[int] = ...,
+        header_cache_size: Optional[int] = ...,
         public_claim_namespace: Optional[str] = ...,
         private_claim_prefix: Optional[str] = ...,
         jwt_header_key: Optional[str] = ...,
         jwt_header_prefix: Optional[str] = ...,
         use_acl: Optional[str] = ...,
         acl_claim: Optional[str] = ...,
+        acl_roles: Optional[Dict[str, Sequence[str]]] = ...,
+        acl_permissions: Optional[Dict[str, Sequence[str]]] = ...,
         use_blacklist: Optional[str] = ...,
         blacklist_class: Optional[Type[BlacklistABC]] = ...,
+        key_namespace: Optional[str] = ...,
+        refresh_token_rotation: bool = ...,
+        use_reference_tokens: bool = ...,
+        reference_store_class: Optional[Type[ReferenceStoreABC]] = ...,
+        reference_store_init_kwargs: Optional[Dict[str, Any]] = ...,
+        reference_cache_size: int = ...,
+        reference_cache_ttl: Optional[timedelta] = ...,
+        use_token_cache: bool = ...,
+        token_cache_size: int = ...,
+        token_cache_ttl: Optional[timedelta] = ...,
+        offload_crypto: bool = ...,
+        crypto_executor: Optional[Executor] = ...,
+        metrics_sink: Optional[MetricsSinkABC] = ...,
     ) -> None: ...
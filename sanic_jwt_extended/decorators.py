@@ -1,8 +1,9 @@
 from functools import wraps
-from typing import Callable, List, Optional, Tuple
+from typing import Optional
 
 from sanic.request import Request
 
+from sanic_jwt_extended.acl import Policy
 from sanic_jwt_extended.exceptions import (
     AccessDeniedError,
     ConfigurationConflictError,
@@ -14,6 +15,7 @@ from sanic_jwt_extended.exceptions import (
     WrongTokenError,
 )
 from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.metrics import Stopwatch, outcome_of
 from sanic_jwt_extended.tokens import Token
 
 try:
@@ -36,9 +38,6 @@ except ImportError:  # pragma: no cover
         return not r
 
 
-jwt_get_function = Callable[[Request, bool], Tuple[str, Optional[str]]]
-
-
 def _get_request(args) -> Request:
     if isinstance(args[0], Request):
         request = args[0]
@@ -47,131 +46,268 @@ def _get_request(args) -> Request:
     return request
 
 
-def _get_raw_jwt_from_request(request, is_access=True):
-    functions: List[jwt_get_function] = []
+def _get_raw_jwt_from_request(request, is_access=True, manager=JWT):
+    if is_access:
+        return manager.access_token_extractor(request)
+
+    return manager.refresh_token_extractor(request)
 
-    for eligible_location in JWT.config.token_location:
-        if eligible_location == "header":
-            functions.append(_get_raw_jwt_from_headers)
-        if eligible_location == "query":
-            functions.append(_get_raw_jwt_from_query_params)
-        if eligible_location == "cookies":
-            functions.append(_get_raw_jwt_from_cookies)
 
-    raw_jwt = None
-    csrf_value = None
-    errors = []
+def _csrf_check(csrf_from_request, csrf_from_jwt):
+    if not csrf_from_jwt or not isinstance(csrf_from_jwt, str):
+        raise CSRFError('Can not find valid CSRF data from token')
+    if not compare_digest(csrf_from_request, csrf_from_jwt):
+        raise CSRFError('CSRF double submit tokens do not match')
+
 
-    for f in functions:
+_DENIED_MESSAGES = {
+    "access": "You are not allowed to access here",
+    "refresh": "You are not allowed to refresh in here",
+}
+
+
+async def _rotate(token_obj):
+    manager = token_obj.manager
+
+    if not await manager.blacklist.redeem(token_obj):
+        # someone used this token before. it may be stolen, so end whole session
+        if token_obj.family is not None:
+            await manager.revoke_family(token_obj.family)
+        raise RevokedTokenError("Refresh token has been already used")
+
+    token_obj.successor = await manager.create_refresh_token_async(
+        token_obj.identity,
+        token_obj.role,
+        public_claims=token_obj.public_claims,
+        private_claims=token_obj.private_claims,
+        iss=token_obj.iss,
+        aud=token_obj.aud,
+        family=token_obj.family,
+    )
+
+
+# name of attribute of ``request.ctx`` holding results of authentication
+_MEMO_ATTR = "jwt_auth"
+# name of attribute of ``request.ctx`` holding manager serving the request
+_MANAGER_ATTR = "jwt_manager"
+# name of attribute of decorated handlers, mapping token type to whether
+# blacklist is checked
+_REQUIREMENTS_ATTR = "__jwt_requirements__"
+
+
+def _memo_of(request):
+    ctx = getattr(request, "ctx", None)  # sanic < 19.9 has no request.ctx
+    if ctx is None:
+        return None
+
+    try:
+        return getattr(ctx, _MEMO_ATTR)
+    except AttributeError:
+        memo = {}
+        setattr(ctx, _MEMO_ATTR, memo)
+        return memo
+
+
+def _manager_of(request, blueprint=None):
+    ctx = getattr(request, "ctx", None)
+    if ctx is None:
+        return JWT.select(request, blueprint)
+
+    try:
+        return getattr(ctx, _MANAGER_ATTR)
+    except AttributeError:
+        manager = JWT.select(request, blueprint)
+        setattr(ctx, _MANAGER_ATTR, manager)
+        return manager
+
+
+async def _once(request, key, fn, *args):
+    """
+    Runs a step of authentication at most once per request, so stacked
+    decorators and ``jwt_middleware`` share its result (or its failure)
+    """
+    memo = _memo_of(request)
+    if memo is None:
+        return await fn(*args)
+
+    try:
+        result = memo[key]
+    except KeyError:
         try:
-            raw_jwt, csrf_value = f(request, is_access)
-            break
-        except NoAuthorizationError as e:
-            errors.append(str(e))
+            result = await fn(*args)
+        except Exception as e:
+            result = e
+        memo[key] = result
+
+    if isinstance(result, Exception):
+        raise result
 
-    if not raw_jwt:
-        raise NoAuthorizationError(', '.join(errors))
+    return result
 
-    return raw_jwt, csrf_value
 
+def _count(request, sink, token_type, outcome):
+    # one outcome per request and token type, however many decorators are stacked
+    memo = _memo_of(request)
+    if memo is not None:
+        if (token_type, "outcome") in memo:
+            return
+        memo[token_type, "outcome"] = outcome
 
-def _get_raw_jwt_from_headers(request, is_access):
-    header_key = (
-        JWT.config.jwt_header_key if is_access else JWT.config.refresh_jwt_header_key
+    sink.count(outcome)
+
+
+async def _verify(request, token_type, manager, watch):
+    raw_jwt, csrf_value = _get_raw_jwt_from_request(
+        request, token_type == "access", manager
     )
-    header_prefix = JWT.config.jwt_header_prefix
 
-    token_header = request.headers.get(header_key)
+    if watch is not None:
+        watch.lap("extract")
 
-    if not token_header:
-        raise NoAuthorizationError(f'Missing header "{header_key}"')
+    token_obj = await Token.verify(raw_jwt, manager)
 
-    parts: List[str] = token_header.split()
+    if csrf_value:
+        _csrf_check(csrf_value, token_obj.csrf)
 
-    if parts[0] != header_prefix or len(parts) != 2:
-        raise InvalidHeaderError(
-            f"Bad {header_key} header. Expected value '{header_prefix} <JWT>'"
-        )
+    if token_obj.type != token_type:
+        raise WrongTokenError(f"Only {token_type} tokens are allowed")
+
+    return token_obj
+
+
+async def _check_blacklist(token_obj, watch):
+    if watch is not None:
+        watch.restart()
+
+    revoked = await token_obj.manager.blacklist.is_blacklisted(token_obj)
+
+    if watch is not None:
+        watch.lap("blacklist")
 
-    encoded_token: str = parts[1]
+    if revoked:
+        raise RevokedTokenError("Token has been revoked")
 
-    return encoded_token, None
 
+async def _authenticate(
+    request, token_type, *, policy=None, fresh_required=False, check_blacklist=True,
+):
+    manager = _manager_of(request)
+    sink = manager.metrics_sink
+    watch = Stopwatch(sink) if sink is not None else None
 
-def _get_raw_jwt_from_query_params(request, _):
-    encoded_token = request.args.get(JWT.config.jwt_query_param_name)
-    if not encoded_token:
-        raise NoAuthorizationError(
-            f'Missing query parameter "{JWT.config.jwt_query_param_name}"'
+    try:
+        token_obj = await _once(
+            request, (token_type, "token"), _verify, request, token_type, manager, watch
         )
 
-    return encoded_token, None
+        if fresh_required and not token_obj.fresh:
+            raise FreshTokenRequiredError("Only fresh access tokens are allowed")
 
+        if policy is not None and not policy.permits(token_obj.role, manager.acl):
+            raise AccessDeniedError(_DENIED_MESSAGES[token_type])
 
-def _get_raw_jwt_from_cookies(request, is_access):
-    cookie_key = JWT.config.jwt_cookie if is_access else JWT.config.refresh_jwt_cookie
-    csrf_header_key = (
-        JWT.config.jwt_csrf_header if is_access else JWT.config.refresh_jwt_csrf_header
-    )
+        if check_blacklist and manager.config.use_blacklist:
+            await _once(
+                request, (token_type, "blacklist"), _check_blacklist, token_obj, watch
+            )
 
-    encoded_token = request.cookies.get(cookie_key)
-    csrf_value = None
+        if token_type == "refresh" and manager.config.refresh_token_rotation:
+            await _once(request, (token_type, "rotate"), _rotate, token_obj)
+    except Exception as e:
+        if sink is not None:
+            _count(request, sink, token_type, outcome_of(e))
+        raise
 
-    if not encoded_token:
-        raise NoAuthorizationError(f'Missing cookie "{cookie_key}"')
+    if sink is not None:
+        _count(request, sink, token_type, "success")
 
-    if JWT.config.csrf_protect and request.method in JWT.config.csrf_request_methods:
-        csrf_value = request.headers.get(csrf_header_key)
+    return token_obj
 
-        if not csrf_value:
-            raise CSRFError("Missing CSRF token")
 
-    return encoded_token, csrf_value
+def _require(fn, wrapper, token_type, check_blacklist):
+    # wraps() already copied requirements of decorators below, copy before adding
+    requirements = dict(getattr(fn, _REQUIREMENTS_ATTR, {}))
+    requirements[token_type] = requirements.get(token_type, False) or check_blacklist
+    setattr(wrapper, _REQUIREMENTS_ATTR, requirements)
 
+    return wrapper
 
-def _csrf_check(csrf_from_request, csrf_from_jwt):
-    if not csrf_from_jwt or not isinstance(csrf_from_jwt, str):
-        raise CSRFError('Can not find valid CSRF data from token')
-    if not compare_digest(csrf_from_request, csrf_from_jwt):
-        raise CSRFError('CSRF double submit tokens do not match')
 
+async def jwt_middleware(request):
+    """
+    Request middleware authenticating tokens that the matched handler needs,
+    once. Decorators reuse the result (or raise the failure) from
+    ``request.ctx``, and handlers without our decorators are skipped.
+    """
+    try:
+        handler = request.app.router.get(request)[0]
+    except Exception:
+        # unknown route or method, sanic will respond after middlewares
+        return
 
-def jwt_required(
-    function=None, *, allow=None, deny=None, fresh_required=False,
-):
-    def real(fn):
-        @wraps(fn)
-        async def wrapper(*args, **kwargs):
-            request = _get_request(args)
-            raw_jwt, csrf_value = _get_raw_jwt_from_request(request)
+    requirements = getattr(handler, _REQUIREMENTS_ATTR, None)
+    if not requirements or _memo_of(request) is None:
+        return
 
-            token_obj = Token(raw_jwt)
+    manager = _manager_of(request, getattr(handler, "__blueprintname__", None))
+    sink = manager.metrics_sink
 
-            if csrf_value:
-                _csrf_check(csrf_value, token_obj.csrf)
+    for token_type, check_blacklist in requirements.items():
+        watch = Stopwatch(sink) if sink is not None else None
+        check_blacklist = check_blacklist and manager.config.use_blacklist
 
-            if token_obj.type != "access":
-                raise WrongTokenError("Only access tokens are allowed")
+        try:
+            token_obj = await _once(
+                request,
+                (token_type, "token"),
+                _verify,
+                request,
+                token_type,
+                manager,
+                watch,
+            )
+            if check_blacklist:
+                await _once(
+                    request,
+                    (token_type, "blacklist"),
+                    _check_blacklist,
+                    token_obj,
+                    watch,
+                )
+        except Exception:
+            # remembered in request.ctx, raised by decorator of the handler
+            pass
 
-            if fresh_required and not token_obj.fresh:
-                raise FreshTokenRequiredError("Only fresh access tokens are allowed")
 
-            if allow and token_obj.role not in allow:
-                raise AccessDeniedError("You are not allowed to access here")
+def _compile_policy(allow, deny):
+    if not (allow or deny):
+        return None
 
-            if deny and token_obj.role in deny:
-                raise AccessDeniedError("You are not allowed to access here")
+    policy = Policy(allow, deny)
+    if JWT.acl is not None:
+        # fail on unknown roles now rather than on first request
+        policy.bind(JWT.acl)
 
-            if JWT.config.use_blacklist and await JWT.blacklist.is_blacklisted(
-                token_obj
-            ):
-                raise RevokedTokenError("Token has been revoked")
+    return policy
 
-            kwargs["token"] = token_obj
+
+def jwt_required(
+    function=None, *, allow=None, deny=None, fresh_required=False,
+):
+    def real(fn):
+        policy = _compile_policy(allow, deny)
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            request = _get_request(args)
+
+            kwargs["token"] = await _authenticate(
+                request, "access", policy=policy, fresh_required=fresh_required,
+            )
 
             return await fn(*args, **kwargs)
 
-        return wrapper
+        return _require(fn, wrapper, "access", True)
 
     if function:
         return real(function)
@@ -190,15 +326,7 @@ def jwt_optional(function):
         token_obj: Optional[Token] = None
 
         try:
-            raw_jwt, csrf_value = _get_raw_jwt_from_request(request)
-
-            token_obj = Token(raw_jwt)
-
-            if csrf_value:
-                _csrf_check(csrf_value, token_obj.csrf)
-
-            if token_obj.type != "access":
-                raise WrongTokenError("Only access tokens are allowed")
+            token_obj = await _authenticate(request, "access", check_blacklist=False)
         except (NoAuthorizationError, InvalidHeaderError):
             pass
 
@@ -206,40 +334,22 @@ def jwt_optional(function):
 
         return await function(*args, **kwargs)
 
-    return wrapper
+    return _require(function, wrapper, "access", False)
 
 
 def refresh_jwt_required(function=None, *, allow=None, deny=None):
     def real(fn):
+        policy = _compile_policy(allow, deny)
+
         @wraps(fn)
         async def wrapper(*args, **kwargs):
             request = _get_request(args)
-            raw_jwt, csrf_value = _get_raw_jwt_from_request(request, is_access=False)
-
-            token_obj = Token(raw_jwt)
-
-            if csrf_value:
-                _csrf_check(csrf_value, token_obj.csrf)
-
-            if token_obj.type != "refresh":
-                raise WrongTokenError("Only refresh tokens are allowed")
-
-            if allow and token_obj.role not in allow:
-                raise AccessDeniedError("You are not allowed to refresh in here")
-
-            if deny and token_obj.role in deny:
-                raise AccessDeniedError("You are not allowed to refresh in here")
-
-            if JWT.config.use_blacklist and await JWT.blacklist.is_blacklisted(
-                token_obj
-            ):
-                raise RevokedTokenError("Token has been revoked")
 
-            kwargs["token"] = token_obj
+            kwargs["token"] = await _authenticate(request, "refresh", policy=policy)
 
             return await fn(*args, **kwargs)
 
-        return wrapper
+        return _require(fn, wrapper, "refresh", True)
 
     if function:
         return real(function)
@@ -1,18 +1,52 @@
-from typing import Any, Callable, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from sanic.request import Request
 
+from sanic_jwt_extended.acl import Policy
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.metrics import MetricsSinkABC, Stopwatch
+from sanic_jwt_extended.tokens import Token
+
+_DENIED_MESSAGES: Dict[str, str]
+_MEMO_ATTR: str
+_MANAGER_ATTR: str
+_REQUIREMENTS_ATTR: str
+
 def _get_request(args: Tuple[Any]) -> Request: ...
 def _get_raw_jwt_from_request(
-    request: Request, is_access: bool = ...
-) -> Tuple[str, Optional[str]]: ...
-def _get_raw_jwt_from_headers(
-    request: Request, is_access: bool
-) -> Tuple[str, None]: ...
-def _get_raw_jwt_from_query_params(request: Request, _: Any) -> Tuple[str, None]: ...
-def _get_raw_jwt_from_cookies(
-    request: Request, is_access: bool
+    request: Request, is_access: bool = ..., manager: JWT = ...
 ) -> Tuple[str, Optional[str]]: ...
+async def _rotate(token_obj: Token) -> None: ...
+def _memo_of(request: Request) -> Optional[Dict[Tuple[str, str], Any]]: ...
+def _manager_of(request: Request, blueprint: Optional[str] = ...) -> JWT: ...
+async def _once(
+    request: Request,
+    key: Tuple[str, str],
+    fn: Callable[..., Awaitable[Any]],
+    *args: Any
+) -> Any: ...
+def _count(
+    request: Request, sink: MetricsSinkABC, token_type: str, outcome: str
+) -> None: ...
+async def _verify(
+    request: Request, token_type: str, manager: JWT, watch: Optional[Stopwatch]
+) -> Token: ...
+async def _check_blacklist(token_obj: Token, watch: Optional[Stopwatch]) -> None: ...
+async def _authenticate(
+    request: Request,
+    token_type: str,
+    *,
+    policy: Optional[Policy] = ...,
+    fresh_required: bool = ...,
+    check_blacklist: bool = ...
+) -> Token: ...
+def _require(
+    fn: Callable, wrapper: Callable, token_type: str, check_blacklist: bool
+) -> Callable: ...
+async def jwt_middleware(request: Request) -> None: ...
+def _compile_policy(
+    allow: Optional[List[str]], deny: Optional[List[str]]
+) -> Optional[Policy]: ...
 def jwt_required(
     function: Callable = ...,
     *,
@@ -73,5 +73,14 @@ class ConfigurationConflictError(JWTExtendedException):
     ...
 
 
+class BlacklistFullError(JWTExtendedException):
+    """
+    Error raised when a blacklist has no room for a revoked token. It never
+    forgets a token that could still be used
+    """
+
+    ...
+
+
 class CSRFError(JWTExtendedException):
     ...
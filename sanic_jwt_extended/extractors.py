@@ -0,0 +1,119 @@
+from typing import Callable, FrozenSet, List, Optional, Tuple
+
+from sanic.request import Request
+
+from sanic_jwt_extended.exceptions import (
+    CSRFError,
+    InvalidHeaderError,
+    NoAuthorizationError,
+)
+
+Extractor = Callable[[Request], Tuple[str, Optional[str]]]
+
+
+def _header_extractor(header_key: str, header_prefix: str) -> Extractor:
+    def extract(request):
+        token_header = request.headers.get(header_key)
+
+        if not token_header:
+            raise NoAuthorizationError(f'Missing header "{header_key}"')
+
+        parts = token_header.split()
+
+        if len(parts) != 2 or parts[0] != header_prefix:
+            raise InvalidHeaderError(
+                f"Bad {header_key} header. Expected value '{header_prefix} <JWT>'"
+            )
+
+        return parts[1], None
+
+    return extract
+
+
+def _query_extractor(param_name: str) -> Extractor:
+    def extract(request):
+        encoded_token = request.args.get(param_name)
+
+        if not encoded_token:
+            raise NoAuthorizationError(f'Missing query parameter "{param_name}"')
+
+        return encoded_token, None
+
+    return extract
+
+
+def _cookie_extractor(
+    cookie_key: str, csrf_header_key: str, csrf_methods: Optional[FrozenSet[str]]
+) -> Extractor:
+    def extract(request):
+        encoded_token = request.cookies.get(cookie_key)
+
+        if not encoded_token:
+            raise NoAuthorizationError(f'Missing cookie "{cookie_key}"')
+
+        if csrf_methods is None or request.method not in csrf_methods:
+            return encoded_token, None
+
+        csrf_value = request.headers.get(csrf_header_key)
+
+        if not csrf_value:
+            raise CSRFError("Missing CSRF token")
+
+        return encoded_token, csrf_value
+
+    return extract
+
+
+def _chain(extractors: List[Extractor]) -> Extractor:
+    if len(extractors) == 1:
+        return extractors[0]
+
+    def extract(request):
+        errors = []
+
+        for extractor in extractors:
+            try:
+                return extractor(request)
+            except NoAuthorizationError as e:
+                errors.append(e)
+
+        raise NoAuthorizationError(", ".join(str(e) for e in errors))
+
+    return extract
+
+
+def compile_extractor(config, is_access: bool = True) -> Extractor:
+    """
+    Resolves ``config.token_location`` into a single callable returning
+    ``(raw_jwt, csrf_value)`` from request
+    """
+    extractors: List[Extractor] = []
+
+    for eligible_location in config.token_location:
+        if eligible_location == "header":
+            extractors.append(
+                _header_extractor(
+                    config.jwt_header_key
+                    if is_access
+                    else config.refresh_jwt_header_key,
+                    config.jwt_header_prefix
+                    if is_access
+                    else config.refresh_jwt_header_prefix,
+                )
+            )
+        if eligible_location == "query":
+            extractors.append(_query_extractor(config.jwt_query_param_name))
+        if eligible_location == "cookies":
+            extractors.append(
+                _cookie_extractor(
+                    config.jwt_cookie if is_access else config.refresh_jwt_cookie,
+                    config.jwt_csrf_header
+                    if is_access
+                    else config.refresh_jwt_csrf_header,
+                    frozenset(config.csrf_request_methods)
+                    if config.csrf_protect
+                    else None,
+                )
+            )
+
+    return _chain(extractors)
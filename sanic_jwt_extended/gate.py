@@ -0,0 +1,70 @@
+import re
+from typing import Any, Dict, Optional
+
+from jwt.exceptions import DecodeError, InvalidAlgorithmError
+
+from sanic_jwt_extended import jws
+from sanic_jwt_extended.cache import TTLCache
+from sanic_jwt_extended.codec import JSONCodecABC
+from sanic_jwt_extended.exceptions import JWTDecodeError
+
+TOKEN_CLASSES = ("access", "refresh")
+
+# three non-empty base64url segments, without padding
+_COMPACT_JWS = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+
+
+class TokenGate:
+    """
+    Structural checks of raw tokens, run before any base64 decoding, JSON
+    parsing or signature verification. Malformed tokens cost a regex match,
+    after a length check if ``max_length`` is given. Accepted headers are
+    cached by their encoded segment, up to ``header_cache_size`` of them.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        codec: JSONCodecABC,
+        max_length: Optional[int] = None,
+        header_cache_size: int = 64,
+    ):
+        self.algorithm = algorithm
+        self.codec = codec
+        self.max_length = max_length
+        self.headers = TTLCache(header_cache_size)
+
+    def _parse_header(self, segment: str) -> Dict[str, Any]:
+        try:
+            header = jws.decode_header(segment, self.codec)
+        except DecodeError:
+            raise JWTDecodeError("Invalid header")
+
+        if header.get("class") not in TOKEN_CLASSES:
+            raise JWTDecodeError(
+                "Can not resolve token type by JOSE header. missing 'class'"
+            )
+
+        if header.get("alg") != self.algorithm:
+            raise InvalidAlgorithmError("The specified alg value is not allowed")
+
+        return header
+
+    def check(self, raw_jwt: str) -> Dict[str, Any]:
+        """
+        Returns header of ``raw_jwt`` if it is a well-formed token of manager
+        """
+        if self.max_length is not None and len(raw_jwt) > self.max_length:
+            raise JWTDecodeError(f"Token is longer than {self.max_length} characters")
+
+        if _COMPACT_JWS.fullmatch(raw_jwt) is None:
+            raise JWTDecodeError("Token should be three base64url segments")
+
+        segment = raw_jwt[: raw_jwt.index(".")]
+        header = self.headers.get(segment)
+
+        if header is None:
+            header = self._parse_header(segment)
+            self.headers.set(segment, header)
+
+        return header
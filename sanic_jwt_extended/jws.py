@@ -0,0 +1,149 @@
+import binascii
+import calendar
+import datetime
+import time
+from typing import Any, Dict, Optional
+
+from jwt.exceptions import (
+    DecodeError,
+    ExpiredSignatureError,
+    ImmatureSignatureError,
+    InvalidAlgorithmError,
+    InvalidIssuedAtError,
+    InvalidSignatureError,
+)
+from jwt.utils import base64url_decode, base64url_encode
+
+from sanic_jwt_extended.algorithms import get_algorithm
+from sanic_jwt_extended.codec import JSONCodecABC
+
+_TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+def numeric_dates(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns copy of ``payload`` whose datetime time claims are unix timestamps
+    """
+    payload = dict(payload)
+
+    for claim in _TIME_CLAIMS:
+        if isinstance(payload.get(claim), datetime.datetime):
+            payload[claim] = calendar.timegm(payload[claim].utctimetuple())
+
+    return payload
+
+
+def encode(
+    payload: Dict[str, Any],
+    key: Any,
+    algorithm: str,
+    header: Dict[str, Any],
+    codec: JSONCodecABC,
+) -> str:
+    """
+    Serializes and signs ``payload`` like ``jwt.encode``, but with given codec
+    """
+    payload = numeric_dates(payload)
+    alg_obj = get_algorithm(algorithm)
+
+    signing_input = b".".join(
+        (
+            base64url_encode(codec.dumps({"typ": "JWT", "alg": algorithm, **header})),
+            base64url_encode(codec.dumps(payload)),
+        )
+    )
+    signature = alg_obj.sign(signing_input, alg_obj.prepare_key(key))
+
+    return (signing_input + b"." + base64url_encode(signature)).decode("utf-8")
+
+
+def decode_header(raw_jwt: str, codec: JSONCodecABC) -> Dict[str, Any]:
+    try:
+        header = codec.loads(base64url_decode(raw_jwt.split(".", 1)[0]))
+    except (TypeError, ValueError, binascii.Error):
+        raise DecodeError("Invalid header string")
+
+    if not isinstance(header, dict):
+        raise DecodeError("Invalid header string: must be a json object")
+
+    # kid looks up a key by hash, before signature is verified
+    if not isinstance(header.get("kid"), (str, type(None))):
+        raise DecodeError("Key ID header parameter must be a string")
+
+    return header
+
+
+def decode(
+    raw_jwt: str,
+    key: Any,
+    algorithm: str,
+    codec: JSONCodecABC,
+    header: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Verifies signature and time claims of ``raw_jwt`` and returns its payload.
+    Issuer and audience are not verified.
+    """
+    jwt_bytes = raw_jwt.encode("utf-8")
+
+    try:
+        signing_input, crypto_segment = jwt_bytes.rsplit(b".", 1)
+        payload_segment = signing_input.split(b".", 1)[1]
+    except (ValueError, IndexError):
+        raise DecodeError("Not enough segments")
+
+    if header is None:
+        header = decode_header(raw_jwt, codec)
+
+    if header.get("alg") != algorithm:
+        raise InvalidAlgorithmError("The specified alg value is not allowed")
+
+    try:
+        signature = base64url_decode(crypto_segment)
+    except (TypeError, binascii.Error):
+        raise DecodeError("Invalid crypto padding")
+
+    alg_obj = get_algorithm(algorithm)
+
+    if not alg_obj.verify(signing_input, alg_obj.prepare_key(key), signature):
+        raise InvalidSignatureError("Signature verification failed")
+
+    try:
+        payload = codec.loads(base64url_decode(payload_segment))
+    except (TypeError, ValueError, binascii.Error):
+        raise DecodeError("Invalid payload string")
+
+    if not isinstance(payload, dict):
+        raise DecodeError("Invalid payload string: must be a json object")
+
+    validate_time_claims(payload)
+
+    return payload
+
+
+def validate_time_claims(payload: Dict[str, Any]) -> None:
+    now = int(time.time())
+
+    if "iat" in payload:
+        try:
+            int(payload["iat"])
+        except (TypeError, ValueError):
+            raise InvalidIssuedAtError("Issued At claim (iat) must be an integer.")
+
+    if "nbf" in payload:
+        try:
+            nbf = int(payload["nbf"])
+        except (TypeError, ValueError):
+            raise DecodeError("Not Before claim (nbf) must be an integer.")
+
+        if nbf > now:
+            raise ImmatureSignatureError("The token is not yet valid (nbf)")
+
+    if "exp" in payload:
+        try:
+            exp = int(payload["exp"])
+        except (TypeError, ValueError):
+            raise DecodeError("Expiration Time claim (exp) must be an integer.")
+
+        if exp < now:
+            raise ExpiredSignatureError("Signature has expired")
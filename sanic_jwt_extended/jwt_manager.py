@@ -1,13 +1,21 @@
+import asyncio
 import datetime
+import os
+import time
 import uuid
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import contextmanager
+from types import MethodType
 
-import jwt
-from flatten_dict import flatten
 from jwt import ExpiredSignatureError, InvalidTokenError
 
-from sanic_jwt_extended.blacklist import InMemoryBlacklist
+from sanic_jwt_extended import algorithms, jws, reference
+from sanic_jwt_extended.acl import RoleRegistry
+from sanic_jwt_extended.blacklist import InMemoryBlacklist, _expires_at
+from sanic_jwt_extended.cache import TokenCache, TTLCache
+from sanic_jwt_extended.claims import ClaimLayout
+from sanic_jwt_extended.codec import resolve_codec
 from sanic_jwt_extended.config import Config
 from sanic_jwt_extended.exceptions import (
     AccessDeniedError,
@@ -19,29 +27,179 @@ from sanic_jwt_extended.exceptions import (
     RevokedTokenError,
     WrongTokenError,
 )
+from sanic_jwt_extended.extractors import compile_extractor
+from sanic_jwt_extended.gate import TokenGate
 from sanic_jwt_extended.handler import Handler
+from sanic_jwt_extended.keys import KeyRing
+from sanic_jwt_extended.reference import InMemoryReferenceStore
+
+# attribute of app holding managers of tenants
+_TENANTS_ATTR = "_jwt_tenants"
+
+_ERROR_HANDLERS = (
+    (NoAuthorizationError, "no_authorization"),
+    (ExpiredSignatureError, "expired_signature"),
+    (InvalidHeaderError, "invalid_header"),
+    (InvalidTokenError, "invalid_token"),
+    (JWTDecodeError, "jwt_decode_error"),
+    (WrongTokenError, "wrong_token"),
+    (RevokedTokenError, "revoked_token"),
+    (FreshTokenRequiredError, "fresh_token_required"),
+    (AccessDeniedError, "access_denied"),
+)
+
+
+class _manager_method:
+    """
+    Binds method to manager instance when called on one, or to ``JWT`` class,
+    the default manager, otherwise. So ``cls`` of these methods is a manager
+    and state set through it is per instance.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        return MethodType(self.func, owner if instance is None else instance)
+
+
+class _Tenants:
+    __slots__ = ("default", "hosts", "blueprints")
+
+    def __init__(self):
+        self.default = None
+        self.hosts = {}
+        self.blueprints = {}
+
+
+def _blueprint_of(request):
+    # sanic sets endpoint as "<app>.<blueprint>.<handler>" right before handler
+    endpoint = request.endpoint
+    if not endpoint:
+        return None
+
+    blueprint, dot, _ = endpoint[len(request.app.name) + 1 :].partition(".")
+    return blueprint if dot else None
 
 
 class JWT:
     config = None
     handler = None
     blacklist = None
-
-    @classmethod
+    token_cache = None
+    reference_store = None
+    reference_cache = None
+    key_namespace = ""
+    key_ring = None
+    codec = None
+    claim_layout = None
+    token_gate = None
+    acl = None
+    crypto_executor = None
+    metrics_sink = None
+    access_token_extractor = None
+    refresh_token_extractor = None
+
+    @_manager_method
     @contextmanager
-    def initialize(cls, app):
+    def initialize(cls, app, *, host=None, blueprint=None):
+        """
+        Configures manager for ``app``. Managers other than ``JWT`` serve
+        requests of ``host`` or of ``blueprint`` (name or object)
+        """
+        if cls is JWT and (host is not None or blueprint is not None):
+            raise ConfigurationConflictError(
+                "JWT is the default manager. create a manager with JWT() for tenants"
+            )
+
         cls.config = Config()
         cls.handler = Handler()
 
-        yield JWT
+        yield cls
 
         cls.config.read_only = True
         cls.handler.read_only = True
         cls._validate_config()
+        cls.codec = resolve_codec(cls.config.json_codec, cls.config.json_encoder)
+        cls._setup_claim_layout()
+        cls._setup_token_gate()
+        cls._setup_acl()
+        cls._setup_crypto_executor()
+        cls._setup_key_ring()
+        cls._setup_key_namespace(host, blueprint)
         cls._setup_blacklist()
-        cls._set_error_handlers(app)
+        cls._setup_token_cache()
+        cls._setup_reference_store()
+        cls._setup_extractors()
+        cls.metrics_sink = cls.config.metrics_sink
+        cls._attach(app, host, blueprint)
+        cls._register_listeners(app)
+
+    @_manager_method
+    def _setup_claim_layout(cls):
+        reserved_claims = ["fresh", "csrf", "fam"]
+
+        if cls.config.use_acl:
+            reserved_claims.append(cls.config.acl_claim)
+
+        cls.claim_layout = ClaimLayout(
+            cls.config.public_claim_namespace,
+            cls.config.private_claim_prefix,
+            reserved_claims,
+        )
+
+    @_manager_method
+    def _setup_token_gate(cls):
+        cls.token_gate = TokenGate(
+            cls.config.algorithm,
+            cls.codec,
+            cls.config.max_token_length,
+            cls.config.header_cache_size,
+        )
+
+    @_manager_method
+    def _setup_acl(cls):
+        if cls.config.use_acl and cls.config.acl_roles is not None:
+            cls.acl = RoleRegistry(cls.config.acl_roles, cls.config.acl_permissions)
+        else:
+            cls.acl = None
+
+    @_manager_method
+    def _setup_crypto_executor(cls):
+        # HMAC is cheaper than a round trip to the executor
+        if cls.config.offload_crypto and not algorithms.is_symmetric(
+            cls.config.algorithm
+        ):
+            cls.crypto_executor = cls.config.crypto_executor or ThreadPoolExecutor()
+        else:
+            cls.crypto_executor = None
+
+    @_manager_method
+    def _setup_key_ring(cls):
+        # loaded key objects can not be pickled to worker processes
+        preload = not isinstance(cls.crypto_executor, ProcessPoolExecutor)
+
+        cls.key_ring = KeyRing(cls.config.algorithm, preload)
+        cls.key_ring.add(
+            cls.config.key_id,
+            secret=cls.config.secret_key,
+            private_key=cls.config.private_key,
+            public_key=cls.config.public_key,
+            activate=True,
+        )
+
+    @_manager_method
+    def _setup_key_namespace(cls, host, blueprint):
+        namespace = cls.config.key_namespace
+
+        if namespace is None:
+            # tenants sharing a redis should not revoke tokens of each other
+            namespace = host or getattr(blueprint, "name", blueprint)
 
-    @classmethod
+        cls.key_namespace = f"{namespace}:" if namespace else ""
+
+    @_manager_method
     def _setup_blacklist(cls):
         if cls.config.use_blacklist is True:
             blacklist_cls = (
@@ -55,19 +213,91 @@ class JWT:
             else:
                 cls.blacklist = blacklist_cls()
 
-    @classmethod
-    def _validate_config(cls):
-        if cls.config.algorithm.startswith("HS") and not cls.config.secret_key:
+            cls.blacklist.set_namespace(cls.key_namespace)
+
+            if cls.config.refresh_token_rotation:
+                cls._ensure_blacklist_supports(
+                    "refresh token rotation", "revoke_family", "redeem"
+                )
+        else:
+            cls.blacklist = None
+
+    @_manager_method
+    def _ensure_blacklist_supports(cls, feature, *methods):
+        if not cls.blacklist.supports(*methods):
             raise ConfigurationConflictError(
-                "HS* algorithm needs secret key to encode token"
+                f"{type(cls.blacklist).__name__} does not support {feature}. "
+                f"blacklist class should implement {', '.join(methods)}"
             )
-        elif cls.config.algorithm.startswith("RS"):
+
+    @_manager_method
+    def _setup_token_cache(cls):
+        if cls.config.use_token_cache is True:
+            ttl = (
+                cls.config.token_cache_ttl.total_seconds()
+                if cls.config.token_cache_ttl
+                else None
+            )
+            cls.token_cache = TokenCache(cls.config.token_cache_size, ttl)
+        else:
+            cls.token_cache = None
+
+    @_manager_method
+    def _setup_reference_store(cls):
+        if cls.config.use_reference_tokens is True:
+            store_cls = cls.config.reference_store_class or InMemoryReferenceStore
+            cls.reference_store = store_cls(
+                **(cls.config.reference_store_init_kwargs or {})
+            )
+            cls.reference_store.set_namespace(cls.key_namespace)
+
+            ttl = (
+                cls.config.reference_cache_ttl.total_seconds()
+                if cls.config.reference_cache_ttl
+                else None
+            )
+            cls.reference_cache = TTLCache(cls.config.reference_cache_size, ttl)
+        else:
+            cls.reference_store = None
+            cls.reference_cache = None
+
+    @_manager_method
+    def _setup_extractors(cls):
+        cls.access_token_extractor = compile_extractor(cls.config, is_access=True)
+        cls.refresh_token_extractor = compile_extractor(cls.config, is_access=False)
+
+    @_manager_method
+    def _validate_config(cls):
+        algorithm = cls.config.algorithm
+        algorithms.validate_algorithm(algorithm)
+
+        if algorithms.is_symmetric(algorithm):
+            if not cls.config.secret_key:
+                raise ConfigurationConflictError(
+                    "HS* algorithm needs secret key to encode token"
+                )
+        else:
             if not cls.config.private_key:
                 raise ConfigurationConflictError(
-                    "RS* algorithm needs private key to encode token"
+                    f"{algorithm} algorithm needs private key to encode token"
                 )
             if not cls.config.public_key:
-                raise ConfigurationConflictError("RS* algorithm needs public key")
+                raise ConfigurationConflictError(
+                    f"{algorithm} algorithm needs public key"
+                )
+
+        if (
+            cls.config.acl_roles is not None or cls.config.acl_permissions is not None
+        ) and not cls.config.use_acl:
+            raise ConfigurationConflictError("You should enable ACL to use roles.")
+
+        if cls.config.acl_permissions is not None and cls.config.acl_roles is None:
+            raise ConfigurationConflictError("Permissions need roles to grant them.")
+
+        if cls.config.refresh_token_rotation and not cls.config.use_blacklist:
+            raise ConfigurationConflictError(
+                "Refresh token rotation needs blacklist to track redeemed tokens"
+            )
 
         if cls.config.use_blacklist:
             if not cls.config.blacklist_class:
@@ -76,30 +306,116 @@ class JWT:
                     "Falling back to default in-memory blacklist"
                 )
 
-    @classmethod
-    def _set_error_handlers(cls, app):
-        app.error_handler.add(NoAuthorizationError, cls.handler.no_authorization)
-        app.error_handler.add(ExpiredSignatureError, cls.handler.expired_signature)
-        app.error_handler.add(InvalidHeaderError, cls.handler.invalid_header)
-        app.error_handler.add(InvalidTokenError, cls.handler.invalid_token)
-        app.error_handler.add(JWTDecodeError, cls.handler.jwt_decode_error)
-        app.error_handler.add(WrongTokenError, cls.handler.wrong_token)
-        app.error_handler.add(RevokedTokenError, cls.handler.revoked_token)
-        app.error_handler.add(FreshTokenRequiredError, cls.handler.fresh_token_required)
-        app.error_handler.add(AccessDeniedError, cls.handler.access_denied)
-
-    @classmethod
-    def _encode_jwt(cls, token_type, payload, expires_delta):
-        algorithm = cls.config.algorithm
-        secret = (
-            cls.config.secret_key
-            if algorithm.startswith("HS")
-            else cls.config.private_key
+        if cls.config.use_reference_tokens and not cls.config.reference_store_class:
+            warnings.warn(
+                "Reference tokens enabled but store class was not specified. "
+                "Falling back to default in-memory store"
+            )
+
+    @_manager_method
+    def _attach(cls, app, host, blueprint):
+        tenants = getattr(app, _TENANTS_ATTR, None)
+
+        if tenants is None:
+            tenants = _Tenants()
+            setattr(app, _TENANTS_ATTR, tenants)
+            JWT._set_error_handlers(app)
+
+        if cls is JWT:
+            tenants.default = cls
+        if host is not None:
+            tenants.hosts[host] = cls
+        if blueprint is not None:
+            tenants.blueprints[getattr(blueprint, "name", blueprint)] = cls
+
+    @_manager_method
+    def _register_listeners(cls, app):
+        # connect before first request instead of on it, and disconnect cleanly
+        backends = [b for b in (cls.blacklist, cls.reference_store) if b is not None]
+        # executor given in config belongs to user, who shuts it down
+        owns_executor = (
+            cls.crypto_executor is not None and cls.config.crypto_executor is None
         )
+        if not backends and not owns_executor:
+            return
+
+        async def open_backends(app, loop):
+            for backend in backends:
+                await backend.open()
+
+        async def close_backends(app, loop):
+            for backend in backends:
+                await backend.close()
+
+            if owns_executor:
+                cls.crypto_executor.shutdown(wait=False)
+                # threads start on first use, so server can start again for free
+                cls.crypto_executor = ThreadPoolExecutor()
+
+        app.register_listener(open_backends, "before_server_start")
+        app.register_listener(close_backends, "after_server_stop")
+
+    @staticmethod
+    def select(request, blueprint=None):
+        """
+        Returns manager serving ``request``, matched by blueprint, then by
+        host. ``JWT`` if no tenant matches, and ``NoAuthorizationError`` if
+        ``JWT`` was not initialized for the app either
+        """
+        tenants = getattr(request.app, _TENANTS_ATTR, None)
+        if tenants is None:
+            if JWT.config is None:
+                raise NoAuthorizationError("No JWT manager serves this request")
+            return JWT
+
+        if tenants.blueprints:
+            manager = tenants.blueprints.get(blueprint or _blueprint_of(request))
+            if manager is not None:
+                return manager
+
+        if tenants.hosts:
+            host = request.host
+            manager = tenants.hosts.get(host) or tenants.hosts.get(
+                host.rpartition(":")[0]
+            )
+            if manager is not None:
+                return manager
+
+        if tenants.default is None:
+            raise NoAuthorizationError("No JWT manager serves this request")
+
+        return tenants.default
+
+    @staticmethod
+    def _set_error_handlers(app):
+        def dispatch(name):
+            def handle(request, exception):
+                try:
+                    manager = JWT.select(request) if request is not None else JWT
+                    handler = manager.handler or Handler
+                except NoAuthorizationError:
+                    # no manager serves request, answer with the stock handlers
+                    handler = Handler
+                return getattr(handler, name)(request, exception)
+
+            return handle
 
+        for exception, name in _ERROR_HANDLERS:
+            app.error_handler.add(exception, dispatch(name))
+
+    @_manager_method
+    def _header(cls, token_type, kid):
+        header = {"class": token_type}
+
+        if kid is not None:
+            header["kid"] = kid
+
+        return header
+
+    @_manager_method
+    def _complete_payload(cls, payload, expires_delta, iat, with_csrf):
         iss = payload.pop("iss") if payload.get("iss") else cls.config.default_iss
         aud = payload.pop("aud") if payload.get("aud") else cls.config.default_aud
-        iat = datetime.datetime.utcnow()
         nbf = payload.pop("nbf") if payload.get("nbf") else iat
         jti = uuid.uuid4().hex
 
@@ -108,64 +424,163 @@ class JWT:
         if isinstance(expires_delta, datetime.timedelta):
             reserved_claims["exp"] = iat + expires_delta
 
-        if "cookies" in cls.config.token_location and cls.config.csrf_protect:
+        if with_csrf:
             reserved_claims["csrf"] = uuid.uuid4().hex
 
         payload.update(reserved_claims)
-        payload = {k: v for k, v in payload.items() if v is not None}
 
-        header = {"class": token_type}
+        return {k: v for k, v in payload.items() if v is not None}
 
-        token = jwt.encode(
-            payload, secret, algorithm, header, cls.config.json_encoder
-        ).decode("utf-8")
+    @_manager_method
+    async def _offload(cls, fn, *args):
+        if cls.crypto_executor is None:
+            return fn(*args)
 
-        return token
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(cls.crypto_executor, fn, *args)
 
-    @classmethod
-    def create_access_token(
+    @_manager_method
+    def _signing_args(cls, token_type, payload, expires_delta):
+        kid, secret = cls.key_ring.signing_key
+
+        payload = cls._complete_payload(
+            payload,
+            expires_delta,
+            datetime.datetime.utcnow(),
+            "cookies" in cls.config.token_location and cls.config.csrf_protect,
+        )
+
+        return (
+            payload,
+            secret,
+            cls.config.algorithm,
+            cls._header(token_type, kid),
+            cls.codec,
+        )
+
+    @_manager_method
+    def _ensure_verifiable(cls, raw_jwt):
+        max_length = cls.config.max_token_length
+
+        if max_length is not None and len(raw_jwt) > max_length:
+            raise ConfigurationConflictError(
+                f"Token is {len(raw_jwt)} characters long, so it would be rejected "
+                f"by max_token_length({max_length}). raise it or mint fewer claims."
+            )
+
+        return raw_jwt
+
+    @_manager_method
+    def _encode_jwt(cls, token_type, payload, expires_delta):
+        return cls._ensure_verifiable(
+            jws.encode(*cls._signing_args(token_type, payload, expires_delta))
+        )
+
+    @_manager_method
+    async def _encode_jwt_async(cls, token_type, payload, expires_delta):
+        raw_jwt = await cls._offload(
+            jws.encode, *cls._signing_args(token_type, payload, expires_delta)
+        )
+
+        return cls._ensure_verifiable(raw_jwt)
+
+    @_manager_method
+    def _ensure_self_contained(cls):
+        if cls.reference_store is not None:
+            raise ConfigurationConflictError(
+                "Reference tokens have to be stored. "
+                "use create_access_token_async to create access token."
+            )
+
+    @_manager_method
+    async def _store_reference(cls, token_type, payload, expires_delta):
+        payload = cls._complete_payload(
+            payload,
+            expires_delta,
+            datetime.datetime.utcnow(),
+            "cookies" in cls.config.token_location and cls.config.csrf_protect,
+        )
+        payload = jws.numeric_dates(payload)
+        handle = reference.new_handle()
+
+        await cls.reference_store.put(
+            reference.digest(handle),
+            (cls._header(token_type, None), payload),
+            payload.get("exp", float("inf")),
+        )
+
+        return handle
+
+    @_manager_method
+    def _build_payload(
         cls,
+        token_type,
         identity,
         role=None,
         fresh=None,
         *,
-        expires_delta=None,
         public_claims=None,
         private_claims=None,
         iss=None,
         aud=None,
         nbf=None,
+        family=None,
     ):
         payload = {"iss": iss, "sub": identity, "aud": aud, "nbf": nbf}
 
         if role:
             if not cls.config.use_acl:
                 raise ConfigurationConflictError("You should enable ACL to use.")
-            payload[cls.config.acl_claim] = role
+            payload[cls.config.acl_claim] = (
+                cls.acl.dump(cls.acl.encode(role)) if cls.acl is not None else role
+            )
 
-        if fresh is not None and isinstance(fresh, bool):
+        if token_type == "access" and fresh is not None and isinstance(fresh, bool):
             payload["fresh"] = fresh
 
-        if public_claims:
-            if not cls.config.public_claim_namespace:
+        if token_type == "refresh":
+            if cls.config.refresh_token_rotation:
+                payload["fam"] = family or uuid.uuid4().hex
+            elif family:
                 raise ConfigurationConflictError(
-                    "You should specify namespace to use public claims. "
-                    "\n find more at: https://auth0.com/docs/tokens/concepts/claims-namespacing"
+                    "You should enable refresh token rotation to use family."
                 )
 
-            public_claims = flatten(public_claims, reducer="path")
-            for k, v in public_claims.items():
-                payload[cls.config.public_claim_namespace + k] = v
-
-        if private_claims:
-            private_claim_prefix = (
-                f"{cls.config.private_claim_prefix}_"
-                if cls.config.private_claim_prefix
-                else ""
+        if public_claims and not cls.config.public_claim_namespace:
+            raise ConfigurationConflictError(
+                "You should specify namespace to use public claims. "
+                "\n find more at: https://auth0.com/docs/tokens/concepts/claims-namespacing"
             )
 
-            for k, v in private_claims.items():
-                payload[private_claim_prefix + k] = v
+        return cls.claim_layout.encode(payload, public_claims, private_claims)
+
+    @_manager_method
+    def create_access_token(
+        cls,
+        identity,
+        role=None,
+        fresh=None,
+        *,
+        expires_delta=None,
+        public_claims=None,
+        private_claims=None,
+        iss=None,
+        aud=None,
+        nbf=None,
+    ):
+        cls._ensure_self_contained()
+
+        payload = cls._build_payload(
+            "access",
+            identity,
+            role,
+            fresh,
+            public_claims=public_claims,
+            private_claims=private_claims,
+            iss=iss,
+            aud=aud,
+            nbf=nbf,
+        )
 
         if expires_delta is None:
             expires_delta = cls.config.access_token_expires
@@ -174,7 +589,7 @@ class JWT:
 
         return access_token
 
-    @classmethod
+    @_manager_method
     def create_refresh_token(
         cls,
         identity,
@@ -186,38 +601,230 @@ class JWT:
         iss=None,
         aud=None,
         nbf=None,
+        family=None,
     ):
-        payload = {"iss": iss, "sub": identity, "aud": aud, "nbf": nbf}
+        payload = cls._build_payload(
+            "refresh",
+            identity,
+            role,
+            public_claims=public_claims,
+            private_claims=private_claims,
+            iss=iss,
+            aud=aud,
+            nbf=nbf,
+            family=family,
+        )
 
-        if role:
-            if not cls.config.use_acl:
-                raise ConfigurationConflictError("You should enable ACL to use.")
-            payload[cls.config.acl_claim] = role
+        if expires_delta is None:
+            expires_delta = cls.config.refresh_token_expires
 
-        if public_claims:
-            if not cls.config.public_claim_namespace:
-                raise ConfigurationConflictError(
-                    "You should specify namespace to use public claims. "
-                    "\n find more at: https://auth0.com/docs/tokens/concepts/claims-namespacing"
-                )
+        refresh_token = cls._encode_jwt("refresh", payload, expires_delta)
 
-            public_claims = flatten(public_claims, reducer="path")
-            for k, v in public_claims.items():
-                payload[cls.config.public_claim_namespace + k] = v
+        return refresh_token
 
-        if private_claims:
-            private_claim_prefix = (
-                f"{cls.config.private_claim_prefix}_"
-                if cls.config.private_claim_prefix
-                else ""
-            )
+    @_manager_method
+    async def create_access_token_async(
+        cls,
+        identity,
+        role=None,
+        fresh=None,
+        *,
+        expires_delta=None,
+        public_claims=None,
+        private_claims=None,
+        iss=None,
+        aud=None,
+        nbf=None,
+    ):
+        payload = cls._build_payload(
+            "access",
+            identity,
+            role,
+            fresh,
+            public_claims=public_claims,
+            private_claims=private_claims,
+            iss=iss,
+            aud=aud,
+            nbf=nbf,
+        )
 
-            for k, v in private_claims.items():
-                payload[f"{private_claim_prefix}.{k}"] = v
+        if expires_delta is None:
+            expires_delta = cls.config.access_token_expires
+
+        if cls.reference_store is not None:
+            return await cls._store_reference("access", payload, expires_delta)
+
+        access_token = await cls._encode_jwt_async("access", payload, expires_delta)
+
+        return access_token
+
+    @_manager_method
+    async def create_refresh_token_async(
+        cls,
+        identity,
+        role=None,
+        *,
+        expires_delta=None,
+        public_claims=None,
+        private_claims=None,
+        iss=None,
+        aud=None,
+        nbf=None,
+        family=None,
+    ):
+        payload = cls._build_payload(
+            "refresh",
+            identity,
+            role,
+            public_claims=public_claims,
+            private_claims=private_claims,
+            iss=iss,
+            aud=aud,
+            nbf=nbf,
+            family=family,
+        )
 
         if expires_delta is None:
             expires_delta = cls.config.refresh_token_expires
 
-        refresh_token = cls._encode_jwt("refresh", payload, expires_delta)
+        refresh_token = await cls._encode_jwt_async("refresh", payload, expires_delta)
 
         return refresh_token
+
+    @_manager_method
+    async def revoke_family(cls, family):
+        if not cls.config.use_blacklist:
+            raise ConfigurationConflictError(
+                "To revoke token family, you should enable blacklist"
+            )
+        cls._ensure_blacklist_supports("revoking token family", "revoke_family")
+
+        expires_at = cls._outlived_at(time.time(), cls.config.refresh_token_expires)
+
+        await cls.blacklist.revoke_family(family, expires_at)
+
+    @_manager_method
+    async def revoke_subject(cls, identity):
+        if not cls.config.use_blacklist:
+            raise ConfigurationConflictError(
+                "To revoke tokens of subject, you should enable blacklist"
+            )
+        cls._ensure_blacklist_supports("revoking by subject", "revoke_subject")
+
+        now = time.time()
+        # iat has one second resolution, so every token of this second is revoked
+        not_before = int(now) + 1
+        expires_at = cls._outlived_at(
+            now, cls.config.access_token_expires, cls.config.refresh_token_expires
+        )
+
+        await cls.blacklist.revoke_subject(str(identity), not_before, expires_at)
+
+    @_manager_method
+    async def revoke_many(cls, tokens_or_jtis):
+        """
+        Revokes ``Token`` objects, and tokens known only by ``jti`` (``UUID`` or
+        its string), at once. Tokens known by ``jti`` stay revoked until any
+        token issued now would have expired
+        """
+        handles, revoked = [], []
+        fallback_expires_at = None
+
+        for item in tokens_or_jtis:
+            if isinstance(item, (str, uuid.UUID)):
+                if fallback_expires_at is None:
+                    fallback_expires_at = cls._outlived_at(
+                        time.time(),
+                        cls.config.access_token_expires,
+                        cls.config.refresh_token_expires,
+                    )
+                jti = item if isinstance(item, uuid.UUID) else uuid.UUID(item)
+                revoked.append((jti, fallback_expires_at))
+            elif cls.reference_store is not None and reference.is_handle(item.raw_jwt):
+                handles.append(item)
+            else:
+                revoked.append((item.jti, _expires_at(item)))
+                if cls.token_cache is not None:
+                    cls.token_cache.evict(item.raw_jwt)
+
+        if revoked and not cls.config.use_blacklist:
+            raise ConfigurationConflictError(
+                "To revoke token, you should enable blacklist"
+            )
+
+        for token in handles:
+            await token.revoke()
+
+        if revoked:
+            await cls.blacklist.register_many(revoked)
+
+    @staticmethod
+    def _outlived_at(now, *expires_deltas):
+        """
+        Returns timestamp when tokens issued until ``now`` are all expired
+        """
+        if not all(isinstance(d, datetime.timedelta) for d in expires_deltas):
+            return float("inf")
+
+        return now + max(d.total_seconds() for d in expires_deltas)
+
+    @_manager_method
+    def create_tokens_batch(cls, specs, *, refresh=False, max_workers=None):
+        cls._ensure_self_contained()
+
+        kid, secret = cls.key_ring.signing_key
+        algorithm = cls.config.algorithm
+        codec = cls.codec
+        with_csrf = "cookies" in cls.config.token_location and cls.config.csrf_protect
+        iat = datetime.datetime.utcnow()
+
+        token_types = ("access", "refresh") if refresh else ("access",)
+        headers = {t: cls._header(t, kid) for t in token_types}
+        jobs = []
+
+        for spec in specs:
+            spec = dict(spec)
+            expires_delta = spec.pop("expires_delta", None)
+            refresh_expires_delta = spec.pop("refresh_expires_delta", None)
+
+            for token_type in token_types:
+                if token_type == "access":
+                    payload = cls._build_payload("access", **spec)
+                    delta = (
+                        cls.config.access_token_expires
+                        if expires_delta is None
+                        else expires_delta
+                    )
+                else:
+                    spec.pop("fresh", None)
+                    payload = cls._build_payload("refresh", **spec)
+                    delta = (
+                        cls.config.refresh_token_expires
+                        if refresh_expires_delta is None
+                        else refresh_expires_delta
+                    )
+
+                payload = cls._complete_payload(payload, delta, iat, with_csrf)
+                jobs.append((payload, headers[token_type]))
+
+        def sign(job):
+            payload, header = job
+            return jws.encode(payload, secret, algorithm, header, codec)
+
+        if (
+            algorithms.is_symmetric(algorithm)
+            or len(jobs) < 2
+            or (os.cpu_count() or 1) < 2
+        ):
+            tokens = [sign(job) for job in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers) as executor:
+                tokens = list(executor.map(sign, jobs))
+
+        for token in tokens:
+            cls._ensure_verifiable(token)
+
+        if refresh:
+            return list(zip(tokens[::2], tokens[1::2]))
+
+        return tokens
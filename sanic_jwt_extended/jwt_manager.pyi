@@ -1,25 +1,142 @@
 import datetime
-from typing import Any, ContextManager, Dict, Optional
+import uuid
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
-from sanic import Sanic
+from sanic import Blueprint, Sanic
+from sanic.request import Request
 
+from sanic_jwt_extended.acl import RoleRegistry, RoleSpec
 from sanic_jwt_extended.blacklist import BlacklistABC
+from sanic_jwt_extended.cache import TokenCache, TTLCache
+from sanic_jwt_extended.claims import ClaimLayout
+from sanic_jwt_extended.codec import JSONCodecABC
 from sanic_jwt_extended.config import Config
+from sanic_jwt_extended.extractors import Extractor
+from sanic_jwt_extended.gate import TokenGate
 from sanic_jwt_extended.handler import Handler
+from sanic_jwt_extended.keys import KeyRing
+from sanic_jwt_extended.metrics import MetricsSinkABC
+from sanic_jwt_extended.reference import ReferenceStoreABC
 from sanic_jwt_extended.tokens import Token
 
+_TENANTS_ATTR: str
+_ERROR_HANDLERS: Tuple[Tuple[Type[Exception], str], ...]
+
+class _Tenants:
+    hosts: Dict[str, JWT]
+    blueprints: Dict[str, JWT]
+
+def _blueprint_of(request: Request) -> Optional[str]: ...
+
 class JWT:
     config: Config = ...
     handler: Handler = ...
     blacklist: Optional[BlacklistABC] = ...
+    token_cache: Optional[TokenCache] = ...
+    reference_store: Optional[ReferenceStoreABC] = ...
+    reference_cache: Optional[TTLCache] = ...
+    key_namespace: str = ...
+    key_ring: KeyRing = ...
+    codec: JSONCodecABC = ...
+    claim_layout: ClaimLayout = ...
+    token_gate: TokenGate = ...
+    acl: Optional[RoleRegistry] = ...
+    crypto_executor: Optional[Executor] = ...
+    metrics_sink: Optional[MetricsSinkABC] = ...
+    access_token_extractor: Extractor = ...
+    refresh_token_extractor: Extractor = ...
+    @classmethod
+    def initialize(
+        cls,
+        app: Sanic,
+        *,
+        host: Optional[str] = ...,
+        blueprint: Union[str, Blueprint, None] = ...,
+    ) -> ContextManager[JWT]: ...
+    @classmethod
+    def _setup_claim_layout(cls): ...
+    @classmethod
+    def _setup_token_gate(cls): ...
+    @classmethod
+    def _setup_acl(cls): ...
+    @classmethod
+    def _setup_crypto_executor(cls): ...
     @classmethod
-    def initialize(cls, app: Sanic) -> ContextManager[JWT]: ...
+    def _setup_key_ring(cls): ...
+    @classmethod
+    def _setup_key_namespace(
+        cls, host: Optional[str], blueprint: Union[str, Blueprint, None]
+    ) -> None: ...
     @classmethod
     def _setup_blacklist(cls): ...
     @classmethod
+    def _ensure_blacklist_supports(cls, feature: str, *methods: str) -> None: ...
+    @classmethod
+    def _setup_token_cache(cls): ...
+    @classmethod
+    def _setup_reference_store(cls): ...
+    @classmethod
+    def _setup_extractors(cls): ...
+    @classmethod
     def _validate_config(cls): ...
     @classmethod
-    def _set_error_handlers(cls, app: Sanic) -> None: ...
+    def _attach(
+        cls, app: Sanic, host: Optional[str], blueprint: Union[str, Blueprint, None]
+    ) -> None: ...
+    @classmethod
+    def _register_listeners(cls, app: Sanic) -> None: ...
+    @staticmethod
+    def select(request: Request, blueprint: Optional[str] = ...) -> JWT: ...
+    @staticmethod
+    def _set_error_handlers(app: Sanic) -> None: ...
+    @classmethod
+    def _header(cls, token_type: str, kid: Optional[str]) -> Dict[str, str]: ...
+    @classmethod
+    def _complete_payload(
+        cls,
+        payload: Dict[str, Any],
+        expires_delta: Union[datetime.timedelta, bool],
+        iat: datetime.datetime,
+        with_csrf: bool,
+    ) -> Dict[str, Any]: ...
+    @classmethod
+    def _build_payload(
+        cls,
+        token_type: str,
+        identity: str,
+        role: RoleSpec = ...,
+        fresh: bool = ...,
+        *,
+        public_claims: Dict[str, Any] = ...,
+        private_claims: Dict[str, Any] = ...,
+        iss: str = ...,
+        aud: str = ...,
+        nbf: datetime.datetime = ...,
+        family: Optional[str] = ...,
+    ) -> Dict[str, Any]: ...
+    @classmethod
+    async def _offload(cls, fn: Callable[..., Any], *args: Any) -> Any: ...
+    @classmethod
+    def _signing_args(
+        cls,
+        token_type: str,
+        payload: Dict[str, Any],
+        expires_delta: datetime.timedelta,
+    ) -> Tuple[Any, ...]: ...
+    @classmethod
+    def _ensure_verifiable(cls, raw_jwt: str) -> str: ...
     @classmethod
     def _encode_jwt(
         cls,
@@ -28,10 +145,26 @@ class JWT:
         expires_delta: datetime.timedelta,
     ) -> str: ...
     @classmethod
+    async def _encode_jwt_async(
+        cls,
+        token_type: str,
+        payload: Dict[str, Any],
+        expires_delta: datetime.timedelta,
+    ) -> str: ...
+    @classmethod
+    def _ensure_self_contained(cls) -> None: ...
+    @classmethod
+    async def _store_reference(
+        cls,
+        token_type: str,
+        payload: Dict[str, Any],
+        expires_delta: Union[datetime.timedelta, bool],
+    ) -> str: ...
+    @classmethod
     def create_access_token(
         cls,
         identity: str,
-        role: str = ...,
+        role: RoleSpec = ...,
         fresh: bool = ...,
         *,
         expires_delta: datetime.timedelta = ...,
@@ -45,7 +178,7 @@ class JWT:
     def create_refresh_token(
         cls,
         identity: str,
-        role: str = ...,
+        role: RoleSpec = ...,
         *,
         expires_delta: datetime.timedelta = ...,
         public_claims: Dict[str, Any] = ...,
@@ -53,4 +186,53 @@ class JWT:
         iss: str = ...,
         aud: str = ...,
         nbf: datetime.datetime = ...,
+        family: Optional[str] = ...,
     ) -> str: ...
+    @classmethod
+    async def create_access_token_async(
+        cls,
+        identity: str,
+        role: RoleSpec = ...,
+        fresh: bool = ...,
+        *,
+        expires_delta: datetime.timedelta = ...,
+        public_claims: Dict[str, Any] = ...,
+        private_claims: Dict[str, Any] = ...,
+        iss: str = ...,
+        aud: str = ...,
+        nbf: datetime.datetime = ...,
+    ) -> str: ...
+    @classmethod
+    async def create_refresh_token_async(
+        cls,
+        identity: str,
+        role: RoleSpec = ...,
+        *,
+        expires_delta: datetime.timedelta = ...,
+        public_claims: Dict[str, Any] = ...,
+        private_claims: Dict[str, Any] = ...,
+        iss: str = ...,
+        aud: str = ...,
+        nbf: datetime.datetime = ...,
+        family: Optional[str] = ...,
+    ) -> str: ...
+    @classmethod
+    async def revoke_family(cls, family: str) -> None: ...
+    @classmethod
+    async def revoke_subject(cls, identity: Any) -> None: ...
+    @classmethod
+    async def revoke_many(
+        cls, tokens_or_jtis: Iterable[Union[Token, uuid.UUID, str]]
+    ) -> None: ...
+    @staticmethod
+    def _outlived_at(
+        now: float, *expires_deltas: Union[datetime.timedelta, bool]
+    ) -> float: ...
+    @classmethod
+    def create_tokens_batch(
+        cls,
+        specs: Iterable[Dict[str, Any]],
+        *,
+        refresh: bool = ...,
+        max_workers: Optional[int] = ...,
+    ) -> Union[List[str], List[Tuple[str, str]]]: ...
@@ -0,0 +1,95 @@
+from typing import Any, Dict, Optional, Tuple
+
+from sanic_jwt_extended import algorithms
+from sanic_jwt_extended.exceptions import ConfigurationConflictError, JWTDecodeError
+
+
+class KeyRing:
+    """
+    Holds pre-loaded signing and verifying keys indexed by ``kid``.
+    Keys can be added, activated and retired at runtime to rotate them.
+    Asymmetric keys are validated when added. With ``preload=False`` raw key
+    material is kept as is, so it can be pickled and sent to other processes.
+    """
+
+    def __init__(self, algorithm: str, preload: bool = True):
+        algorithms.validate_algorithm(algorithm)
+
+        self.algorithm = algorithm
+        self.preload = preload
+        self.signing_kid: Optional[str] = None
+        self._signing_keys: Dict[Optional[str], Any] = {}
+        self._verifying_keys: Dict[Optional[str], Any] = {}
+
+    @property
+    def kids(self):
+        return list(self._verifying_keys)
+
+    def add(
+        self,
+        kid: Optional[str],
+        *,
+        secret: Any = None,
+        private_key: Any = None,
+        public_key: Any = None,
+        activate: bool = False,
+    ) -> None:
+        if algorithms.is_symmetric(self.algorithm):
+            private_key = public_key = secret
+
+        if public_key is None:
+            raise ConfigurationConflictError(f"Key '{kid}' has nothing to verify with")
+
+        if algorithms.is_symmetric(self.algorithm):
+            loaded_private = loaded_public = algorithms.get_algorithm(
+                self.algorithm
+            ).prepare_key(secret)
+        else:
+            loaded_public = algorithms.load_key(self.algorithm, public_key, False)
+            loaded_private = None
+
+            if private_key is not None:
+                loaded_private = algorithms.load_key(self.algorithm, private_key, True)
+                algorithms.check_key_pair(loaded_private, loaded_public)
+
+        if self.preload:
+            public_key, private_key = loaded_public, loaded_private
+
+        self._verifying_keys[kid] = public_key
+
+        if private_key is not None:
+            self._signing_keys[kid] = private_key
+
+        if activate:
+            self.activate(kid)
+
+    def activate(self, kid: Optional[str]) -> None:
+        if kid not in self._signing_keys:
+            raise ConfigurationConflictError(f"Key '{kid}' has no signing key")
+
+        self.signing_kid = kid
+
+    def retire(self, kid: Optional[str]) -> None:
+        if kid == self.signing_kid:
+            raise ConfigurationConflictError(
+                f"Key '{kid}' is used for signing. activate another key first"
+            )
+
+        self._signing_keys.pop(kid, None)
+        self._verifying_keys.pop(kid, None)
+
+    @property
+    def signing_key(self) -> Tuple[Optional[str], Any]:
+        try:
+            return self.signing_kid, self._signing_keys[self.signing_kid]
+        except KeyError:
+            raise ConfigurationConflictError("There is no active signing key")
+
+    def verifying_key(self, kid: Optional[str]) -> Any:
+        if kid is None and None not in self._verifying_keys:
+            kid = self.signing_kid
+
+        try:
+            return self._verifying_keys[kid]
+        except KeyError:
+            raise JWTDecodeError(f"Unknown key id '{kid}'")
@@ -0,0 +1,69 @@
+import time
+from abc import ABC, abstractmethod
+
+from jwt import ExpiredSignatureError
+
+from sanic_jwt_extended.exceptions import (
+    AccessDeniedError,
+    FreshTokenRequiredError,
+    NoAuthorizationError,
+    RevokedTokenError,
+    WrongTokenError,
+)
+
+STAGES = ("extract", "verify", "claims", "blacklist")
+OUTCOMES = (
+    "success",
+    "missing",
+    "invalid",
+    "expired",
+    "revoked",
+    "wrong_type",
+    "denied",
+)
+
+
+class MetricsSinkABC(ABC):  # pragma: no cover
+    """
+    Receives duration of each stage of authenticating a request (in seconds)
+    and an outcome for every authentication attempt.
+    """
+
+    @abstractmethod
+    def observe(self, stage: str, seconds: float) -> None:
+        pass
+
+    @abstractmethod
+    def count(self, outcome: str) -> None:
+        pass
+
+
+class Stopwatch:
+    __slots__ = ("sink", "started")
+
+    def __init__(self, sink: MetricsSinkABC):
+        self.sink = sink
+        self.started = time.perf_counter()
+
+    def restart(self) -> None:
+        self.started = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.sink.observe(stage, now - self.started)
+        self.started = now
+
+
+def outcome_of(error: Exception) -> str:
+    if isinstance(error, NoAuthorizationError):
+        return "missing"
+    if isinstance(error, ExpiredSignatureError):
+        return "expired"
+    if isinstance(error, RevokedTokenError):
+        return "revoked"
+    if isinstance(error, WrongTokenError):
+        return "wrong_type"
+    if isinstance(error, (AccessDeniedError, FreshTokenRequiredError)):
+        return "denied"
+
+    return "invalid"
@@ -1,50 +1,208 @@
-from typing import Any, Dict, Optional
+import asyncio
+import itertools
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import aioredis
 import ujson
 
+ConnectionInfo = Union[str, Tuple[str, int], Dict[str, Any]]
+
+
+def expire_in(expires_at: float, now: float) -> int:
+    """
+    Seconds until ``expires_at``, rounded up so that a key never expires
+    before what it guards does. 0 (no expiry) for ``inf``
+    """
+    return max(1, math.ceil(expires_at - now)) if expires_at != float("inf") else 0
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    chunk = list(itertools.islice(iterator, size))
+
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, size))
+
+
+@dataclass
+class PoolStats:
+    size: int
+    free: int
+    minsize: int
+    maxsize: int
+    pools_created: int
+
+    @property
+    def in_use(self) -> int:
+        return self.size - self.free
+
 
 class RedisConnection:  # pragma: no cover
-    redis: Optional[aioredis.Redis] = None
-    connection_info: Dict[str, Any]
+    """
+    Connection pool of a redis backend. Every backend has its own, so that
+    backends of different managers neither share nor close pools of others.
+
+    ``connection_info`` is an address, or a dict of ``address`` and keyword
+    arguments of ``aioredis.create_redis_pool`` (``minsize``, ``maxsize``,
+    ``db``, ``password``, ...). Pool is created once, however many coroutines
+    ask for it at the same time.
+    """
+
+    def __init__(self, connection_info: ConnectionInfo = "redis://localhost"):
+        self.connection_info = connection_info
+        self.redis: Optional[aioredis.Redis] = None
+        self.pools_created = 0
+        self._connecting: Optional[asyncio.Future] = None
+
+    @staticmethod
+    def _pool_args(connection_info: ConnectionInfo) -> Tuple[Any, Dict[str, Any]]:
+        if isinstance(connection_info, dict):
+            kwargs = dict(connection_info)
+            return kwargs.pop("address"), kwargs
+
+        return connection_info, {}
+
+    async def _connect(self) -> aioredis.Redis:
+        try:
+            address, kwargs = self._pool_args(self.connection_info)
+            self.redis = await aioredis.create_redis_pool(address, **kwargs)
+            self.pools_created += 1
+
+            return self.redis
+        finally:
+            self._connecting = None
+
+    async def _get_redis_connection(self) -> aioredis.Redis:
+        if self.redis and not self.redis.closed:
+            return self.redis
+
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+
+        # shield so that a cancelled caller does not cancel connecting of others
+        return await asyncio.shield(self._connecting)
 
-    @classmethod
-    async def _get_redis_connection(cls):
-        if cls.redis and not cls.redis.closed:
-            return cls.redis
+    async def initialize(self) -> None:
+        """
+        Creates pool, with ``minsize`` connections already open
+        """
+        await self._get_redis_connection()
 
-        cls.redis = await aioredis.create_redis_pool(cls.connection_info)
-        return cls.redis
+    async def release(self) -> None:
+        redis, self.redis = self.redis, None
 
-    @classmethod
-    async def initialize(cls, connection_info):
-        cls.connection_info = connection_info
-        await cls._get_redis_connection()
+        if redis and not redis.closed:
+            redis.close()
+            await redis.wait_closed()
 
-    @classmethod
-    async def release(cls):
-        if cls.redis:
-            cls.redis.close()
-            await cls.redis.wait_closed()
+    def stats(self) -> Optional[PoolStats]:
+        """
+        Utilisation of pool, or ``None`` when not connected
+        """
+        if not self.redis or self.redis.closed:
+            return None
 
-        cls.redis = None
+        pool = self.redis.connection
 
-    @classmethod
-    async def set(cls, key: str, value: Any, **kwargs) -> None:
-        redis = await cls._get_redis_connection()
+        return PoolStats(
+            size=pool.size,
+            free=pool.freesize,
+            minsize=pool.minsize,
+            maxsize=pool.maxsize,
+            pools_created=self.pools_created,
+        )
+
+    async def set(self, key: str, value: Any, **kwargs) -> None:
+        redis = await self._get_redis_connection()
 
         dumped_value = ujson.dumps(value)
         await redis.set(key, dumped_value, **kwargs)
 
-    @classmethod
-    async def get(cls, key: str) -> Any:
-        redis = await cls._get_redis_connection()
+    async def set_many(
+        self, items: Iterable[Tuple[str, Any, int]], chunk_size: int = 1000
+    ) -> None:
+        """
+        Sets ``(key, value, expire)`` items, one pipeline of ``chunk_size``
+        commands at a time. ``expire`` of 0 never expires
+        """
+        redis = await self._get_redis_connection()
+
+        for chunk in _chunks(items, chunk_size):
+            pipe = redis.pipeline()
+            for key, value, expire in chunk:
+                pipe.set(key, ujson.dumps(value), expire=expire)
+            await pipe.execute()
+
+    async def set_if_not_exists(
+        self, key: str, value: Any, expire_at: Optional[float] = None
+    ) -> bool:
+        redis = await self._get_redis_connection()
+
+        kwargs: Dict[str, Any] = {"exist": redis.SET_IF_NOT_EXIST}
+        if expire_at is not None:
+            kwargs["expire"] = expire_in(expire_at, time.time())
+
+        return bool(await redis.set(key, ujson.dumps(value), **kwargs))
+
+    async def get(self, key: str) -> Any:
+        redis = await self._get_redis_connection()
         value = await redis.get(key)
         value = ujson.loads(value) if value else None
 
         return value
 
-    @classmethod
-    async def delete(cls, *keys: str):
-        redis = await cls._get_redis_connection()
+    async def mget(self, *keys: str) -> List[Any]:
+        redis = await self._get_redis_connection()
+        values = await redis.mget(*keys)
+
+        return [ujson.loads(value) if value else None for value in values]
+
+    async def mget_raw(self, *keys: str) -> List[Optional[bytes]]:
+        redis = await self._get_redis_connection()
+        return await redis.mget(*keys)
+
+    async def setbits(
+        self, key: str, offsets: Iterable[int], expire_at: Optional[float] = None
+    ) -> None:
+        redis = await self._get_redis_connection()
+        transaction = redis.multi_exec()
+
+        for offset in offsets:
+            transaction.setbit(key, offset, 1)
+        if expire_at is not None:
+            transaction.expireat(key, math.ceil(expire_at))
+
+        await transaction.execute()
+
+    async def delete(self, *keys: str) -> None:
+        redis = await self._get_redis_connection()
         await redis.delete(*keys)
+
+    async def publish(self, channel: str, message: str) -> None:
+        redis = await self._get_redis_connection()
+        await redis.publish(channel, message)
+
+    async def publish_many(
+        self, channel: str, messages: Iterable[str], chunk_size: int = 1000
+    ) -> None:
+        redis = await self._get_redis_connection()
+
+        for chunk in _chunks(messages, chunk_size):
+            pipe = redis.pipeline()
+            for message in chunk:
+                pipe.publish(channel, message)
+            await pipe.execute()
+
+    async def subscribe(self, channel: str) -> aioredis.Channel:
+        redis = await self._get_redis_connection()
+        (subscribed,) = await redis.subscribe(channel)
+
+        return subscribed
+
+    async def unsubscribe(self, channel: str) -> None:
+        if self.redis and not self.redis.closed:
+            await self.redis.unsubscribe(channel)
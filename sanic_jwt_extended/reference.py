@@ -0,0 +1,135 @@
+import hashlib
+import heapq
+import re
+import secrets
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from sanic_jwt_extended.exceptions import JWTDecodeError
+from sanic_jwt_extended.redis import ConnectionInfo, RedisConnection, expire_in
+
+# 32 random bytes, urlsafe base64 encoded without padding
+_HANDLE = re.compile(r"[A-Za-z0-9_-]{43}")
+
+
+def new_handle() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def is_handle(raw_token: str) -> bool:
+    # handles are urlsafe base64, so they never contain dots like JWTs do
+    return "." not in raw_token
+
+
+def check_handle(handle: str) -> str:
+    """
+    Rejects anything ``new_handle`` could not have made, before it is hashed
+    or looked up in store
+    """
+    if _HANDLE.fullmatch(handle) is None:
+        raise JWTDecodeError("Invalid reference token")
+
+    return handle
+
+
+def digest(handle: str) -> str:
+    """
+    Key of handle in store. handles are bearer secrets, so only digest is stored
+    """
+    return hashlib.sha256(handle.encode("utf-8")).hexdigest()
+
+
+class ReferenceStoreABC(ABC):  # pragma: no cover
+    """
+    Server-side storage of claims of reference tokens, keyed by digest of handle
+    """
+
+    @abstractmethod
+    async def put(self, key: str, value: Any, expires_at: float) -> None:
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    def set_namespace(self, namespace: str) -> None:
+        """
+        Called with key namespace of manager, so that managers sharing a
+        storage do not resolve handles of each other
+        """
+
+    async def open(self) -> None:
+        """
+        Called before server starts, to connect ahead of first request
+        """
+
+    async def close(self) -> None:
+        """
+        Called after server stops
+        """
+
+
+class InMemoryReferenceStore(ReferenceStoreABC):
+    def __init__(self):
+        self.entries: Dict[str, Tuple[float, Any]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+    def _purge(self, now: float) -> None:
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del self.entries[key]
+
+    async def put(self, key, value, expires_at):
+        self._purge(time.time())
+
+        self.entries[key] = (expires_at, value)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+
+        if entry is None or entry[0] <= time.time():
+            return None
+
+        return entry[1]
+
+    async def delete(self, key):
+        self.entries.pop(key, None)
+
+
+class RedisReferenceStore(ReferenceStoreABC):
+    def __init__(
+        self,
+        connection_info: ConnectionInfo,
+        key_prefix: str = "sanic_jwt_extended:reference:",
+    ):
+        self.connection = RedisConnection(connection_info)
+        self.key_prefix_name = key_prefix
+        self.key_prefix = key_prefix
+
+    def set_namespace(self, namespace):
+        self.key_prefix = namespace + self.key_prefix_name
+
+    async def open(self):
+        await self.connection.initialize()
+
+    async def close(self):
+        await self.connection.release()
+
+    async def put(self, key, value, expires_at):
+        await self.connection.set(
+            self.key_prefix + key, value, expire=expire_in(expires_at, time.time())
+        )
+
+    async def get(self, key):
+        return await self.connection.get(self.key_prefix + key)
+
+    async def delete(self, key):
+        await self.connection.delete(self.key_prefix + key)
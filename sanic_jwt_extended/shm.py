@@ -0,0 +1,149 @@
+import hashlib
+import mmap
+import multiprocessing
+import struct
+from typing import Iterable, Optional, Tuple
+
+from sanic_jwt_extended.exceptions import BlacklistFullError
+
+# expires_at, value, key. 32 bytes, so every float is 8-byte aligned and
+# written by a single store
+_SLOT = struct.Struct("<dd16s")
+_VALUES = struct.Struct("<dd")
+_EMPTY = bytes(16)
+
+
+def digest(item: bytes) -> bytes:
+    """
+    16 byte key of ``item``. Never all zeros, which marks an empty slot
+    """
+    key = hashlib.blake2b(item, digest_size=16).digest()
+    return key if key != _EMPTY else b"\x01" + key[1:]
+
+
+class SharedHashTable:
+    """
+    Fixed-size open addressing (linear probing) hash table of 16 byte keys,
+    in anonymous shared memory. Processes forked after it is created see the
+    same table.
+
+    Reads take no lock and make no syscalls. Writers serialise on a
+    process-shared lock and write expiry before key, so readers see an entry
+    only once it is complete. Slots are never emptied. expired slots are
+    reused instead, so probe chains stay intact. When every slot within
+    ``max_probes`` is live, the write is refused with ``BlacklistFullError``
+    rather than dropping a live entry.
+    """
+
+    def __init__(self, capacity: int, max_probes: int = 32):
+        self.capacity = capacity
+        self.max_probes = min(max_probes, capacity)
+        self.memory = mmap.mmap(-1, capacity * _SLOT.size)
+        self.lock = multiprocessing.Lock()
+
+    def _offsets(self, key: bytes):
+        start = int.from_bytes(key[:8], "little") % self.capacity
+        capacity = self.capacity
+
+        return [(start + i) % capacity * _SLOT.size for i in range(self.max_probes)]
+
+    def get(self, key: bytes, now: float) -> Optional[Tuple[float, float]]:
+        """
+        Returns ``(expires_at, value)`` of ``key`` if it has not expired yet
+        """
+        memory = self.memory
+        unpack_from = _SLOT.unpack_from
+        capacity = self.capacity
+        index = int.from_bytes(key[:8], "little") % capacity
+
+        for _ in range(self.max_probes):
+            expires_at, value, slot_key = unpack_from(memory, index * _SLOT.size)
+
+            if slot_key == key:
+                return (expires_at, value) if expires_at > now else None
+            if slot_key == _EMPTY:
+                return None
+
+            index = (index + 1) % capacity
+
+        return None
+
+    def _full(self, count: int = 1) -> BlacklistFullError:
+        return BlacklistFullError(
+            f"No free slot within {self.max_probes} probes for {count} key(s). "
+            f"capacity({self.capacity}) is too small"
+        )
+
+    def _put(self, key: bytes, expires_at: float, value: float, now: float) -> bool:
+        memory = self.memory
+        unpack_from = _SLOT.unpack_from
+        free: Optional[int] = None
+
+        for offset in self._offsets(key):
+            slot_expires_at, slot_value, slot_key = unpack_from(memory, offset)
+
+            if slot_key == key:
+                if slot_expires_at > now:
+                    expires_at = max(expires_at, slot_expires_at)
+                    value = max(value, slot_value)
+                free = offset
+                break
+            if slot_key == _EMPTY:
+                if free is None:
+                    free = offset
+                break
+            if free is None and slot_expires_at <= now:
+                free = offset
+
+        if free is None:
+            return False
+
+        _VALUES.pack_into(memory, free, expires_at, value)
+        memory[free + 16 : free + 32] = key
+
+        return True
+
+    def put(self, key: bytes, expires_at: float, value: float, now: float) -> None:
+        """
+        Sets entry of ``key``. If it is already set, keeps larger of both
+        ``expires_at`` and ``value``
+        """
+        with self.lock:
+            if not self._put(key, expires_at, value, now):
+                raise self._full()
+
+    def put_many(self, items: Iterable[Tuple[bytes, float, float]], now: float) -> None:
+        """
+        Sets ``(key, expires_at, value)`` items, under one acquisition of lock.
+        Items which fit are set even if others do not
+        """
+        refused = 0
+
+        with self.lock:
+            for key, expires_at, value in items:
+                refused += not self._put(key, expires_at, value, now)
+
+        if refused:
+            raise self._full(refused)
+
+    def add(self, key: bytes, expires_at: float, now: float) -> bool:
+        """
+        Sets entry of ``key`` unless it is already set. Returns whether it was set
+        """
+        with self.lock:
+            if self.get(key, now) is not None:
+                return False
+
+            if not self._put(key, expires_at, 0.0, now):
+                raise self._full()
+            return True
+
+    def count(self, now: float) -> int:
+        """
+        Number of entries which have not expired yet. Scans whole table
+        """
+        return sum(
+            1
+            for expires_at, _, key in _SLOT.iter_unpack(self.memory)
+            if key != _EMPTY and expires_at > now
+        )
@@ -1,145 +1,318 @@
 import datetime
-import json
 import uuid
-from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
 
-import jwt
-from flatten_dict import unflatten
-from jwt.utils import base64url_decode
-
-from sanic_jwt_extended.exceptions import ConfigurationConflictError, JWTDecodeError
+from sanic_jwt_extended import jws, reference
+from sanic_jwt_extended.exceptions import (
+    ConfigurationConflictError,
+    JWTDecodeError,
+    RevokedTokenError,
+)
 from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.metrics import Stopwatch
+
+
+class _lazy:
+    """
+    Computes attribute on first access and memoizes it to slot named ``_<name>``
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.slot = f"_{func.__name__}"
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        try:
+            return getattr(instance, self.slot)
+        except AttributeError:
+            value = self.func(instance)
+            setattr(instance, self.slot, value)
+            return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value)
 
 
-@dataclass
 class Token:
-    raw_jwt: str
-    raw_data: Dict[str, Any] = field(init=False)
-
-    # Metadata
-    type: str = field(init=False)
-    role: Optional[str] = field(init=False, default=None)
-    fresh: Optional[bool] = field(init=False, default=None)
-    identity: str = field(init=False)
-    csrf: str = field(init=False, default=None)
-
-    # Registered claims
-    iss: Optional[str] = field(init=False, default=None)
-    sub: str = field(init=False)
-    aud: Optional[str] = field(init=False, default=None)
-    exp: Optional[datetime.datetime] = field(init=False, default=None)
-    nbf: datetime.datetime = field(init=False)
-    iat: datetime.datetime = field(init=False)
-    jti: uuid.UUID = field(init=False)
-
-    # Additional claims
-    public_claims: Dict[str, Any] = field(init=False, default=None)
-    private_claims: Dict[str, Any] = field(init=False, default=None)
-
-    def __post_init__(self):
-        self.raw_data = self._decode_jwt()
-
-        self.type = self._get_type()
+    __slots__ = (
+        "raw_jwt",
+        "raw_data",
+        "manager",
+        "header",
+        # Metadata
+        "type",
+        "role",
+        "fresh",
+        "identity",
+        "csrf",
+        # Refresh token rotation
+        "family",
+        "successor",
+        # Registered claims
+        "iss",
+        "sub",
+        "aud",
+        "_exp",
+        "_nbf",
+        "_iat",
+        "_jti",
+        "_roles",
+        # Additional claims
+        "_public_claims",
+        "_private_claims",
+    )
+
+    def __init__(self, raw_jwt: str, manager=None):
+        watch = self._bind(raw_jwt, JWT if manager is None else manager)
+
+        # rejects malformed tokens before hashing or verifying them
+        header = self._decode_header()
+
+        if not self._load_cached():
+            self.header = header
+            raw_data = self._decode_jwt()
+
+            if watch is not None:
+                watch.lap("verify")
+
+            self._set_raw_data(raw_data)
+
+        self._load_fields()
+
+        if watch is not None:
+            watch.lap("claims")
+
+    def _bind(self, raw_jwt: str, manager):
+        """
+        Sets raw token and its manager, and returns stopwatch timing stages of
+        loading it if manager reports metrics
+        """
+        self.raw_jwt = raw_jwt
+        self.manager = manager
+
+        if manager.metrics_sink is None:
+            return None
+
+        return Stopwatch(manager.metrics_sink)
+
+    @classmethod
+    async def verify(cls, raw_jwt: str, manager=None) -> "Token":
+        if manager is None:
+            manager = JWT
+
+        if manager.reference_store is not None and reference.is_handle(raw_jwt):
+            return await cls._resolve(raw_jwt, manager)
+
+        if manager.crypto_executor is None:
+            return cls(raw_jwt, manager)
+
+        token = cls.__new__(cls)
+        watch = token._bind(raw_jwt, manager)
+
+        header = token._decode_header()
+
+        if not token._load_cached():
+            token.header = header
+            raw_data = await manager._offload(
+                jws.decode,
+                raw_jwt,
+                manager.key_ring.verifying_key(token.header.get("kid")),
+                manager.config.algorithm,
+                manager.codec,
+                token.header,
+            )
+
+            if watch is not None:
+                watch.lap("verify")
+
+            token._set_raw_data(raw_data)
+
+        token._load_fields()
+
+        if watch is not None:
+            watch.lap("claims")
+
+        return token
+
+    @classmethod
+    async def _resolve(cls, handle: str, manager) -> "Token":
+        token = cls.__new__(cls)
+        watch = token._bind(handle, manager)
+
+        reference.check_handle(handle)
+        stored = manager.reference_cache.get(handle)
+
+        if stored is None:
+            stored = await manager.reference_store.get(reference.digest(handle))
+
+            if stored is None:
+                raise RevokedTokenError("Token has been revoked or expired")
+
+            manager.reference_cache.set(handle, stored, stored[1].get("exp"))
+
+        header, raw_data = stored
+        jws.validate_time_claims(raw_data)
+
+        if watch is not None:
+            watch.lap("verify")
+
+        token.header = header
+        token.raw_data = dict(raw_data)
+        token._load_fields()
+
+        if watch is not None:
+            watch.lap("claims")
+
+        return token
+
+    def _load_cached(self):
+        token_cache = self.manager.token_cache
+        cached = token_cache.get(self.raw_jwt) if token_cache is not None else None
+
+        if cached is None:
+            return False
+
+        self.header, raw_data = cached
+        self.raw_data = dict(raw_data)
+        # make sure signing key was not retired after token got cached
+        self.manager.key_ring.verifying_key(self.header.get("kid"))
+
+        return True
+
+    def _set_raw_data(self, raw_data):
+        self.raw_data = raw_data
+        self._check_claims()
+
+        token_cache = self.manager.token_cache
+
+        if token_cache is not None:
+            token_cache.set(
+                self.raw_jwt,
+                (self.header, dict(self.raw_data)),
+                self.raw_data.get("exp"),
+            )
+
+    def _load_fields(self):
+        manager = self.manager
+
+        self.type = self.header["class"]
         self.role = (
-            self.raw_data.get(JWT.config.acl_claim) if JWT.config.use_acl else None
+            self.raw_data.get(manager.config.acl_claim)
+            if manager.config.use_acl
+            else None
         )
+        if manager.acl is not None:
+            self.role = manager.acl.load(self.role)
         self.fresh = self.raw_data.get("fresh") if self.type == "access" else None
         self.csrf = self.raw_data.get("csrf")
+        self.family = self.raw_data.get("fam")
+        self.successor = None
 
-        try:
-            self.iss = self.raw_data.get("iss")
-            self.sub = self.identity = self.raw_data["sub"]
-            self.aud = self.raw_data.get("aud")
-            exp = self.raw_data.get("exp")
-            nbf = self.raw_data["nbf"]
-            iat = self.raw_data["iat"]
-            jti = self.raw_data["jti"]
-        except KeyError as e:
-            raise JWTDecodeError(
-                f"Can not get registered claims from payload. missing {e}"
-            )
+        self.iss = self.raw_data.get("iss")
+        self.sub = self.identity = self.raw_data["sub"]
+        self.aud = self.raw_data.get("aud")
 
-        try:
-            self.jti = uuid.UUID(jti)
-        except Exception:
-            raise JWTDecodeError(f"Wrong jti")
+    def __eq__(self, other):
+        if not isinstance(other, Token):
+            return NotImplemented
+        return self.raw_jwt == other.raw_jwt
 
+    def __repr__(self):
+        return f"Token(type={self.type!r}, identity={self.identity!r})"
+
+    @_lazy
+    def exp(self):
+        exp = self.raw_data.get("exp")
+        return datetime.datetime.utcfromtimestamp(exp) if exp else None
+
+    @_lazy
+    def nbf(self):
+        return datetime.datetime.utcfromtimestamp(self.raw_data["nbf"])
+
+    @_lazy
+    def iat(self):
+        return datetime.datetime.utcfromtimestamp(self.raw_data["iat"])
+
+    @_lazy
+    def jti(self):
         try:
-            self.exp = datetime.datetime.utcfromtimestamp(exp) if exp else None
-            self.nbf = datetime.datetime.utcfromtimestamp(nbf)
-            self.iat = datetime.datetime.utcfromtimestamp(iat)
-        except Exception:
-            raise JWTDecodeError(f"Wrong timestamp for 'nbf' or/and 'iat'")
-
-        self.public_claims = (
-            self._get_public_claims() if JWT.config.public_claim_namespace else {}
-        )
-        self.private_claims = self._get_private_claims()
-
-    def _get_private_claims(self):
-        private_claims = {
-            k: v
-            for k, v in self.raw_data.items()
-            if k.startswith(JWT.config.private_claim_prefix)
-            and k not in ("iss", "sub", "aud", "exp", "nbf", "iat", "jti")
-        }
-        if JWT.config.private_claim_prefix:
-            private_claims = {
-                k.replace(f"{JWT.config.private_claim_prefix}_", ""): v
-                for k, v in private_claims.items()
-            }
-        if JWT.config.public_claim_namespace:
-            private_claims = {
-                k: v
-                for k, v in private_claims.items()
-                if not k.startswith(JWT.config.public_claim_namespace)
-            }
+            return uuid.UUID(self.raw_data["jti"])
+        except ValueError:
+            raise JWTDecodeError("Wrong jti")
 
-        return private_claims
+    @_lazy
+    def roles(self):
+        """
+        Names of roles (and permissions) granted to token
+        """
+        if self.manager.acl is not None:
+            return self.manager.acl.names(self.role)
 
-    def _get_public_claims(self):
-        public_claims = {
-            k.replace(JWT.config.public_claim_namespace, ""): v
-            for k, v in self.raw_data.items()
-            if k.startswith(JWT.config.public_claim_namespace)
-            and k not in ("iss", "sub", "aud", "exp", "nbf", "iat", "jti")
-        }
+        return frozenset((self.role,)) if self.role is not None else frozenset()
 
-        return unflatten(public_claims, splitter="path")
+    @_lazy
+    def public_claims(self):
+        public_claims, self.private_claims = self.manager.claim_layout.split(
+            self.raw_data
+        )
+        return public_claims
 
-    def _get_type(self):
-        raw_header = self.raw_jwt.split(".")[0]
-        header: Dict[str, str] = json.loads(base64url_decode(raw_header))
+    @_lazy
+    def private_claims(self):
+        self.public_claims, private_claims = self.manager.claim_layout.split(
+            self.raw_data
+        )
+        return private_claims
 
-        if header.get("class") not in ("access", "refresh"):
+    def _check_claims(self):
+        missing = [
+            claim
+            for claim in ("sub", "nbf", "iat", "jti")
+            if claim not in self.raw_data
+        ]
+        if missing:
             raise JWTDecodeError(
-                "Can not resolve token type by JOSE header. missing 'class'"
+                f"Can not get registered claims from payload. missing {missing}"
             )
 
-        return header.get("class")
+        if not isinstance(self.raw_data["jti"], str):
+            raise JWTDecodeError("Wrong jti")
 
-    def _decode_jwt(self):
-        algorithm = JWT.config.algorithm
-        secret = (
-            JWT.config.secret_key
-            if algorithm.startswith("HS")
-            else JWT.config.public_key
-        )
+        exp = self.raw_data.get("exp")
+        for timestamp in (exp, self.raw_data["nbf"], self.raw_data["iat"]):
+            if timestamp is not None and not isinstance(timestamp, (int, float)):
+                raise JWTDecodeError("Wrong timestamp for 'nbf' or/and 'iat'")
 
-        jwt_data = jwt.decode(
+    def _decode_header(self):
+        return self.manager.token_gate.check(self.raw_jwt)
+
+    def _decode_jwt(self):
+        return jws.decode(
             self.raw_jwt,
-            secret,
-            algorithms=[algorithm],
-            options={"verify_iss": False, "verify_aud": False},
+            self.manager.key_ring.verifying_key(self.header.get("kid")),
+            self.manager.config.algorithm,
+            self.manager.codec,
+            self.header,
         )
 
-        return jwt_data
-
     async def revoke(self):
-        if not JWT.config.use_blacklist:
+        manager = self.manager
+
+        if manager.reference_store is not None and reference.is_handle(self.raw_jwt):
+            reference.check_handle(self.raw_jwt)
+            await manager.reference_store.delete(reference.digest(self.raw_jwt))
+            manager.reference_cache.evict(self.raw_jwt)
+            return
+
+        if not manager.config.use_blacklist:
             raise ConfigurationConflictError(
                 "To revoke token, you should enable blacklist"
             )
 
-        await JWT.blacklist.register(self)
+        await manager.blacklist.register(self)
+
+        if manager.token_cache is not None:
+            manager.token_cache.evict(self.raw_jwt)
@@ -4,16 +4,24 @@
 
 import datetime
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Union
+
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.metrics import Stopwatch
 
 class Token:
     raw_jwt: str
+    manager: JWT
     raw_data: Dict[str, Any] = ...
+    header: Dict[str, Any] = ...
     type: str = ...
-    role: Optional[str] = ...
+    role: Union[str, int, None] = ...
+    roles: FrozenSet[str] = ...
     fresh: Optional[bool] = ...
     identity: str = ...
     csrf: str = ...
+    family: Optional[str] = ...
+    successor: Optional[str] = ...
     iss: Optional[str] = ...
     sub: str = ...
     aud: Optional[str] = ...
@@ -23,10 +31,16 @@ class Token:
     jti: uuid.UUID = ...
     public_claims: Dict[str, Any] = ...
     private_claims: Dict[str, Any] = ...
-    def __init__(self, raw_jwt: str) -> None: ...
-    def __post_init__(self) -> None: ...
-    def _get_private_claims(self) -> Dict[str, Any]: ...
-    def _get_public_claims(self) -> Dict[str, Any]: ...
-    def _get_type(self) -> str: ...
+    def __init__(self, raw_jwt: str, manager: Optional[JWT] = ...) -> None: ...
+    def _bind(self, raw_jwt: str, manager: JWT) -> Optional[Stopwatch]: ...
+    @classmethod
+    async def verify(cls, raw_jwt: str, manager: Optional[JWT] = ...) -> Token: ...
+    @classmethod
+    async def _resolve(cls, handle: str, manager: JWT) -> Token: ...
+    def _load_cached(self) -> bool: ...
+    def _set_raw_data(self, raw_data: Dict[str, Any]) -> None: ...
+    def _load_fields(self) -> None: ...
+    def _check_claims(self) -> None: ...
+    def _decode_header(self) -> Dict[str, Any]: ...
     def _decode_jwt(self) -> Dict[str, Any]: ...
     async def revoke(self): ...
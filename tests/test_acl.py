@@ -0,0 +1,139 @@
+import pytest
+
+from sanic_jwt_extended.acl import Policy, RoleRegistry
+from sanic_jwt_extended.exceptions import ConfigurationConflictError, JWTDecodeError
+
+ROLES = {"ADMIN": ["EDITOR"], "EDITOR": ["USER"], "USER": [], "AUDITOR": []}
+PERMISSIONS = {"USER": ["read"], "EDITOR": ["write"], "AUDITOR": ["read", "audit"]}
+
+
+@pytest.fixture
+def registry():
+    return RoleRegistry(ROLES, PERMISSIONS)
+
+
+class TestRoleRegistry:
+    def test_bits(self, registry):
+        assert list(registry.bits) == [
+            "ADMIN",
+            "EDITOR",
+            "USER",
+            "AUDITOR",
+            "read",
+            "write",
+            "audit",
+        ]
+        assert len(set(registry.bits.values())) == len(registry.bits)
+
+    def test_grants(self, registry):
+        assert registry.names(registry.grants["ADMIN"]) == {
+            "ADMIN",
+            "EDITOR",
+            "USER",
+            "read",
+            "write",
+        }
+        assert registry.names(registry.grants["USER"]) == {"USER", "read"}
+
+    def test_cyclic_inheritance(self):
+        registry = RoleRegistry({"A": ["B"], "B": ["A"]})
+
+        assert registry.grants["A"] == registry.grants["B"] == 0b11
+
+    def test_encode(self, registry):
+        assert registry.encode("USER") == registry.grants["USER"]
+        assert registry.encode(["USER", "AUDITOR"]) == registry.mask_of(
+            ["USER", "AUDITOR", "read", "audit"]
+        )
+        assert registry.encode(5) == 5
+
+        with pytest.raises(ConfigurationConflictError):
+            registry.encode("GUEST")
+
+    def test_dump_load(self, registry):
+        mask = registry.encode("ADMIN")
+
+        assert registry.dump(mask) == mask
+        assert registry.load(registry.dump(mask)) == mask
+        assert registry.load(None) == 0
+
+        with pytest.raises(JWTDecodeError):
+            registry.load("ADMIN")
+        with pytest.raises(JWTDecodeError):
+            registry.load(format(mask, "x"))
+
+    def test_dump_load_wide(self):
+        registry = RoleRegistry({f"ROLE{i}": [] for i in range(70)})
+        mask = registry.encode(["ROLE0", "ROLE69"])
+
+        assert registry.wide
+        assert registry.dump(mask) == format(1 << 69 | 1, "x")
+        assert registry.load(registry.dump(mask)) == mask
+        # stdlib json encodes wide integers, so they are accepted too
+        assert registry.load(mask) == mask
+
+        for claim in ("0x1", "-1", " 1", "f" * 19, "ROLE0"):
+            with pytest.raises(JWTDecodeError):
+                registry.load(claim)
+
+    def test_mask_of(self, registry):
+        assert registry.mask_of(["read", "USER"]) == 0b10100
+
+        with pytest.raises(ConfigurationConflictError):
+            registry.mask_of(["delete"])
+
+    @pytest.mark.parametrize(
+        "roles,permissions",
+        [
+            ({"A": ["B"]}, None),
+            ({"A": []}, {"B": ["read"]}),
+            ({"A": [], "B": []}, {"A": ["B"]}),
+        ],
+    )
+    def test_conflicts(self, roles, permissions):
+        with pytest.raises(ConfigurationConflictError):
+            RoleRegistry(roles, permissions)
+
+
+class TestPolicy:
+    @pytest.mark.parametrize(
+        "allow,deny,role,expected",
+        [
+            (["ADMIN"], None, "ADMIN", True),
+            (["ADMIN"], None, "USER", False),
+            (["ADMIN"], None, None, False),
+            (None, ["USER"], "ADMIN", True),
+            (None, ["USER"], "USER", False),
+            (None, ["USER"], None, True),
+        ],
+    )
+    def test_plain_roles(self, allow, deny, role, expected):
+        assert Policy(allow, deny).permits(role, None) is expected
+
+    @pytest.mark.parametrize(
+        "allow,deny,role,expected",
+        [
+            (["EDITOR"], None, "ADMIN", True),
+            (["EDITOR"], None, "USER", False),
+            (["read"], None, ["AUDITOR"], True),
+            (["write"], None, ["USER", "AUDITOR"], False),
+            (None, ["audit"], "ADMIN", True),
+            (None, ["audit"], ["USER", "AUDITOR"], False),
+            (["USER"], None, [], False),
+        ],
+    )
+    def test_bitmask(self, registry, allow, deny, role, expected):
+        assert Policy(allow, deny).permits(registry.encode(role), registry) is expected
+
+    def test_rebind(self, registry):
+        policy = Policy(["EDITOR"])
+
+        assert policy.permits("EDITOR", None)
+        assert policy.permits(registry.encode("ADMIN"), registry)
+
+        other = RoleRegistry({"EDITOR": [], "ADMIN": []})
+        assert not policy.permits(other.encode("ADMIN"), other)
+
+    def test_unknown_name(self, registry):
+        with pytest.raises(ConfigurationConflictError):
+            Policy(["GUEST"]).bind(registry)
@@ -0,0 +1,63 @@
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from jwt import InvalidSignatureError
+from sanic import Sanic
+
+from sanic_jwt_extended.exceptions import ConfigurationConflictError
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+from tests.utils import (
+    generate_ec_key_pair,
+    generate_ed25519_key_pair,
+    generate_rsa_key_pair,
+)
+
+RSA_KEY_PAIR = generate_rsa_key_pair()
+
+
+class TestAlgorithms:
+    @pytest.mark.parametrize(
+        "algorithm, key_pair",
+        [
+            ("ES256", generate_ec_key_pair()),
+            ("ES384", generate_ec_key_pair(ec.SECP384R1)),
+            ("EdDSA", generate_ed25519_key_pair()),
+            ("PS256", RSA_KEY_PAIR),
+        ],
+    )
+    def test_asymmetric_algorithm(self, algorithm, key_pair):
+        with JWT.initialize(Sanic()) as manager:
+            manager.config.algorithm = algorithm
+            manager.config.private_key, manager.config.public_key = key_pair
+
+        token = Token(JWT.create_access_token("user", fresh=True))
+
+        assert token.header["alg"] == algorithm
+        assert (token.identity, token.fresh) == ("user", True)
+
+        header, payload, signature = token.raw_jwt.split(".")
+        forged = f"{header}.{payload}.{signature[::-1]}"
+
+        with pytest.raises(InvalidSignatureError):
+            Token(forged)
+
+    @pytest.mark.parametrize(
+        "algorithm, key_pair",
+        [
+            # key of other family
+            ("ES256", RSA_KEY_PAIR),
+            ("EdDSA", generate_ec_key_pair()),
+            ("RS256", generate_ed25519_key_pair()),
+            # key of other curve
+            ("ES256", generate_ec_key_pair(ec.SECP384R1)),
+            # public key does not match
+            ("EdDSA", (generate_ed25519_key_pair()[0], generate_ed25519_key_pair()[1])),
+            # public key given as private key
+            ("EdDSA", (generate_ed25519_key_pair()[1],) * 2),
+        ],
+    )
+    def test_invalid_keys(self, algorithm, key_pair):
+        with pytest.raises(ConfigurationConflictError):
+            with JWT.initialize(Sanic()) as manager:
+                manager.config.algorithm = algorithm
+                manager.config.private_key, manager.config.public_key = key_pair
@@ -0,0 +1,495 @@
+import asyncio
+import datetime
+import time
+import uuid
+from types import SimpleNamespace
+
+import aioredis
+import pytest
+
+from sanic_jwt_extended.blacklist import (
+    BloomFilterBlacklist,
+    CachedRedisBlacklist,
+    InMemoryBlacklist,
+    RedisBlacklist,
+    SharedMemoryBlacklist,
+    _expires_at,
+)
+from sanic_jwt_extended.exceptions import BlacklistFullError, ConfigurationConflictError
+from tests.utils import FakeRedis, MinimalBlacklist, fake_redis_pool
+
+ADDRESS = "redis://localhost"
+
+
+def make_token(expires_in=60, family=None, sub=None, issued_ago=0):
+    now = datetime.datetime.utcnow()
+    exp = (
+        now + datetime.timedelta(seconds=expires_in) if expires_in is not None else None
+    )
+    return SimpleNamespace(
+        jti=uuid.uuid4(),
+        exp=exp,
+        iat=now - datetime.timedelta(seconds=issued_ago),
+        raw_jwt="xxx.yyy.zzz",
+        family=family,
+        sub=sub,
+    )
+
+
+class TestBlacklistABC:
+    @pytest.mark.asyncio
+    async def test_register_many(self):
+        blacklist = MinimalBlacklist()
+        tokens = [make_token(), make_token(expires_in=None)]
+
+        await blacklist.register_many((t.jti, _expires_at(t)) for t in tokens)
+
+        assert blacklist.blacklist == {t.jti: _expires_at(t) for t in tokens}
+
+    def test_supports(self, recwarn):
+        assert not MinimalBlacklist().supports("redeem")
+        assert InMemoryBlacklist().supports("revoke_family", "redeem")
+        assert not BloomFilterBlacklist(backend_class=MinimalBlacklist).supports(
+            "revoke_subject"
+        )
+        assert BloomFilterBlacklist().supports("revoke_subject")
+
+
+class TestInMemoryBlacklist:
+    @pytest.fixture
+    def blacklist(self, recwarn):
+        return InMemoryBlacklist(max_size=2)
+
+    @pytest.mark.asyncio
+    async def test_register(self, blacklist):
+        token = make_token()
+        never_expires = make_token(None)
+
+        await blacklist.register(token)
+        await blacklist.register(never_expires)
+
+        assert await blacklist.is_blacklisted(token) is True
+        assert await blacklist.is_blacklisted(never_expires) is True
+        assert await blacklist.is_blacklisted(make_token()) is False
+        assert blacklist.size == 2
+
+    @pytest.mark.asyncio
+    async def test_register_many(self, blacklist):
+        tokens = [make_token(60), make_token(120), make_token(180)]
+
+        await blacklist.register_many((t.jti, _expires_at(t)) for t in tokens)
+
+        # max_size still applies
+        assert blacklist.size == 2
+        assert await blacklist.is_blacklisted(tokens[0]) is False
+        assert await blacklist.is_blacklisted(tokens[2]) is True
+
+    @pytest.mark.asyncio
+    async def test_expired_tokens_are_purged(self, blacklist):
+        expired = make_token(-1)
+
+        await blacklist.register(expired)
+
+        assert await blacklist.is_blacklisted(expired) is False
+        assert blacklist.size == 0
+
+    @pytest.mark.asyncio
+    async def test_max_size(self, blacklist):
+        tokens = [make_token(60), make_token(120), make_token(180)]
+
+        for token in tokens:
+            await blacklist.register(token)
+
+        assert blacklist.size == 2
+        assert await blacklist.is_blacklisted(tokens[0]) is False
+        assert await blacklist.is_blacklisted(tokens[1]) is True
+        assert await blacklist.is_blacklisted(tokens[2]) is True
+
+    @pytest.mark.asyncio
+    async def test_revoke_family(self, blacklist):
+        token, sibling = make_token(family="family"), make_token(family="family")
+
+        await blacklist.revoke_family("family", time.time() + 60)
+
+        assert await blacklist.is_blacklisted(token) is True
+        assert await blacklist.is_blacklisted(sibling) is True
+        assert await blacklist.is_blacklisted(make_token(family="other")) is False
+
+    @pytest.mark.asyncio
+    async def test_redeem(self, blacklist):
+        token = make_token(family="family")
+
+        assert await blacklist.redeem(token) is True
+        assert await blacklist.redeem(token) is False
+        assert await blacklist.redeem(make_token(family="family")) is True
+
+    @pytest.mark.asyncio
+    async def test_revoke_subject(self, blacklist):
+        old, new = make_token(sub="user", issued_ago=10), make_token(sub="user")
+
+        await blacklist.revoke_subject("user", time.time() - 5, time.time() + 60)
+
+        assert await blacklist.is_blacklisted(old) is True
+        assert await blacklist.is_blacklisted(new) is False
+        assert (
+            await blacklist.is_blacklisted(make_token(sub="other", issued_ago=10))
+            is False
+        )
+
+        # watermark never goes backwards
+        await blacklist.revoke_subject("user", time.time() - 60, time.time() + 60)
+        assert await blacklist.is_blacklisted(old) is True
+
+
+class TestSharedMemoryBlacklist:
+    @pytest.fixture
+    def blacklist(self):
+        return SharedMemoryBlacklist(capacity=64)
+
+    @pytest.mark.asyncio
+    async def test_register(self, blacklist):
+        token, expired, never_expires = make_token(), make_token(-1), make_token(None)
+
+        for t in (token, expired, never_expires):
+            await blacklist.register(t)
+
+        assert await blacklist.is_blacklisted(token) is True
+        assert await blacklist.is_blacklisted(never_expires) is True
+        assert await blacklist.is_blacklisted(expired) is False
+        assert await blacklist.is_blacklisted(make_token()) is False
+        assert blacklist.size == 2
+
+    @pytest.mark.asyncio
+    async def test_register_many(self, blacklist):
+        tokens = [make_token() for _ in range(10)]
+
+        await blacklist.register_many((t.jti, _expires_at(t)) for t in tokens)
+
+        assert all([await blacklist.is_blacklisted(t) for t in tokens])
+        assert blacklist.size == 10
+
+    @pytest.mark.asyncio
+    async def test_full(self):
+        blacklist = SharedMemoryBlacklist(capacity=4, max_probes=4)
+        tokens = [make_token() for _ in range(5)]
+
+        for token in tokens[:4]:
+            await blacklist.register(token)
+        with pytest.raises(BlacklistFullError):
+            await blacklist.register(tokens[4])
+
+        # every revoked token is still rejected
+        assert all([await blacklist.is_blacklisted(t) for t in tokens[:4]])
+
+    @pytest.mark.asyncio
+    async def test_revoke_family(self, blacklist):
+        token = make_token(family="family")
+
+        await blacklist.revoke_family("family", time.time() + 60)
+
+        assert await blacklist.is_blacklisted(token) is True
+        assert await blacklist.is_blacklisted(make_token(family="other")) is False
+
+    @pytest.mark.asyncio
+    async def test_redeem(self, blacklist):
+        token = make_token()
+
+        assert await blacklist.redeem(token) is True
+        assert await blacklist.redeem(token) is False
+        # redeeming does not revoke
+        assert await blacklist.is_blacklisted(token) is False
+
+    @pytest.mark.asyncio
+    async def test_revoke_subject(self, blacklist):
+        old, new = make_token(sub="user", issued_ago=10), make_token(sub="user")
+
+        await blacklist.revoke_subject("user", time.time() - 5, time.time() + 60)
+
+        assert await blacklist.is_blacklisted(old) is True
+        assert await blacklist.is_blacklisted(new) is False
+
+        await blacklist.revoke_subject("user", time.time() - 60, time.time() + 60)
+        assert await blacklist.is_blacklisted(old) is True
+
+
+class TestRedisBlacklist:
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(aioredis, "create_redis_pool", fake_redis_pool(redis))
+        return redis
+
+    @pytest.mark.asyncio
+    async def test_register(self, redis):
+        blacklist = RedisBlacklist(ADDRESS)
+        token = make_token()
+
+        await blacklist.register(token)
+
+        assert await blacklist.is_blacklisted(token) is True
+        assert await blacklist.is_blacklisted(make_token()) is False
+        # minimal value, ttl of remaining lifetime in seconds
+        assert redis.commands[1] == ("SET", token.jti.hex, "1", 60, None)
+
+    @pytest.mark.asyncio
+    async def test_register_many(self, redis):
+        blacklist = RedisBlacklist(ADDRESS, chunk_size=2)
+        tokens = [make_token(), make_token(None), make_token(30)]
+        expired = make_token(-1)
+
+        await blacklist.register_many(
+            (t.jti, _expires_at(t)) for t in (*tokens, expired)
+        )
+
+        assert redis.commands == [
+            ("EXEC", 2),
+            ("SET", tokens[0].jti.hex, "1", 60, None),
+            ("SET", tokens[1].jti.hex, "1", 0, None),
+            ("EXEC", 1),
+            ("SET", tokens[2].jti.hex, "1", 30, None),
+        ]
+        assert all([await blacklist.is_blacklisted(t) for t in tokens])
+        assert await blacklist.is_blacklisted(expired) is False
+
+    @pytest.mark.asyncio
+    async def test_coalesced_lookups(self, redis):
+        blacklist = RedisBlacklist(ADDRESS, lookup_window=0.01)
+        revoked, other = make_token(), make_token()
+        await blacklist.register(revoked)
+        redis.commands.clear()
+
+        results = await asyncio.gather(
+            blacklist.is_blacklisted(revoked),
+            blacklist.is_blacklisted(other),
+            blacklist.is_blacklisted(revoked),
+            blacklist.is_blacklisted(other),
+        )
+
+        assert results == [True, False, True, False]
+        assert redis.commands == [("MGET", revoked.jti.hex, other.jti.hex)]
+
+    @pytest.mark.asyncio
+    async def test_revoke_family(self, redis):
+        blacklist = RedisBlacklist(ADDRESS)
+        token = make_token(family="family")
+
+        assert await blacklist.is_blacklisted(token) is False
+        await blacklist.revoke_family("family", time.time() + 60)
+        redis.commands.clear()
+
+        assert await blacklist.is_blacklisted(token) is True
+        # family is looked up within the same round trip
+        assert redis.commands == [
+            ("MGET", token.jti.hex, RedisBlacklist.family_key_prefix + "family")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_redeem(self, redis):
+        blacklist = RedisBlacklist(ADDRESS)
+        token = make_token(family="family")
+
+        assert await blacklist.redeem(token) is True
+        assert await blacklist.redeem(token) is False
+        assert await blacklist.redeem(make_token(family="family")) is True
+        # marker outlives token by rounding expiry up to whole seconds
+        assert redis.commands[0][3] == 60
+
+    @pytest.mark.asyncio
+    async def test_revoke_subject(self, redis):
+        writer, reader = RedisBlacklist(ADDRESS), RedisBlacklist(ADDRESS)
+        old, new = make_token(sub="user", issued_ago=10), make_token(sub="user")
+        subject_key = RedisBlacklist.subject_key_prefix + "user"
+
+        await writer.revoke_subject("user", time.time() - 5, time.time() + 60)
+        redis.commands.clear()
+
+        assert await reader.is_blacklisted(old) is True
+        # watermark is looked up within the same round trip and cached
+        assert redis.commands == [("MGET", old.jti.hex, subject_key)]
+        assert await reader.is_blacklisted(new) is False
+        assert redis.commands[-1] == ("MGET", new.jti.hex)
+
+    @pytest.mark.asyncio
+    async def test_watermark_cache_ttl(self, redis):
+        writer = RedisBlacklist(ADDRESS)
+        reader = RedisBlacklist(ADDRESS, watermark_ttl=0.01)
+        token = make_token(sub="user", issued_ago=10)
+
+        assert await reader.is_blacklisted(token) is False
+        await writer.revoke_subject("user", time.time(), time.time() + 60)
+        await asyncio.sleep(0.02)
+
+        assert await reader.is_blacklisted(token) is True
+
+
+class TestCachedRedisBlacklist:
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(aioredis, "create_redis_pool", fake_redis_pool(redis))
+        return redis
+
+    @pytest.mark.asyncio
+    async def test_cached_lookups(self, redis):
+        blacklist = CachedRedisBlacklist(ADDRESS, cache_ttl=60)
+        token = make_token()
+
+        for _ in range(3):
+            assert await blacklist.is_blacklisted(token) is False
+
+        assert [c[0] for c in redis.commands].count("MGET") == 1
+        await blacklist.close()
+
+    @pytest.mark.asyncio
+    async def test_invalidation(self, redis):
+        worker1 = CachedRedisBlacklist(ADDRESS, cache_ttl=60)
+        worker2 = CachedRedisBlacklist(ADDRESS, cache_ttl=60)
+        token = make_token()
+
+        assert await worker2.is_blacklisted(token) is False
+        await asyncio.sleep(0)  # let listener subscribe
+
+        await worker1.register(token)
+        await asyncio.sleep(0)  # let listener receive message
+
+        assert await worker1.is_blacklisted(token) is True
+        assert await worker2.is_blacklisted(token) is True
+
+        await worker1.close()
+        await worker2.close()
+
+    @pytest.mark.asyncio
+    async def test_register_many_invalidation(self, redis):
+        worker1 = CachedRedisBlacklist(ADDRESS, cache_ttl=60)
+        worker2 = CachedRedisBlacklist(ADDRESS, cache_ttl=60)
+        tokens = [make_token() for _ in range(3)]
+
+        for token in tokens:
+            assert await worker2.is_blacklisted(token) is False
+        await asyncio.sleep(0)  # let listener subscribe
+
+        await worker1.register_many((t.jti, _expires_at(t)) for t in tokens)
+        await asyncio.sleep(0)  # let listener receive messages
+
+        for token in tokens:
+            assert await worker1.is_blacklisted(token) is True
+            assert await worker2.is_blacklisted(token) is True
+
+        await worker1.close()
+        await worker2.close()
+
+    @pytest.mark.asyncio
+    async def test_subject_invalidation(self, redis):
+        worker1 = CachedRedisBlacklist(ADDRESS, cache_ttl=60)
+        worker2 = CachedRedisBlacklist(ADDRESS, cache_ttl=60)
+        token = make_token(sub="user", issued_ago=10)
+
+        assert await worker2.is_blacklisted(token) is False
+        await asyncio.sleep(0)  # let listener subscribe
+
+        await worker1.revoke_subject("user", time.time(), time.time() + 60)
+        await asyncio.sleep(0)  # let listener receive message
+
+        assert await worker2.is_blacklisted(token) is True
+
+        await worker1.close()
+        await worker2.close()
+
+
+class TestBloomFilterBlacklist:
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(aioredis, "create_redis_pool", fake_redis_pool(redis))
+        return redis
+
+    @pytest.mark.asyncio
+    async def test_prefilter(self, recwarn):
+        blacklist = BloomFilterBlacklist(capacity=100)
+        revoked = make_token()
+        lookups = []
+        backend_lookup = blacklist.backend.is_blacklisted
+
+        async def is_blacklisted(token):
+            lookups.append(token)
+            return await backend_lookup(token)
+
+        blacklist.backend.is_blacklisted = is_blacklisted
+
+        await blacklist.register(revoked)
+
+        assert await blacklist.is_blacklisted(revoked) is True
+        assert await blacklist.is_blacklisted(make_token()) is False
+        assert lookups == [revoked]
+        assert blacklist.fill_ratio > 0
+
+    @pytest.mark.asyncio
+    async def test_sync(self, redis):
+        kwargs = {
+            "backend_class": RedisBlacklist,
+            "backend_init_kwargs": {"connection_info": ADDRESS},
+            "sync_interval": 60,
+        }
+        worker1 = BloomFilterBlacklist(**kwargs)
+        worker2 = BloomFilterBlacklist(**kwargs)
+        token = make_token()
+
+        await worker1.register(token)
+
+        assert await worker2.is_blacklisted(token) is True
+        assert await worker2.is_blacklisted(make_token()) is False
+
+    @pytest.mark.asyncio
+    async def test_fresh_instance(self, redis):
+        kwargs = {
+            "backend_class": RedisBlacklist,
+            "backend_init_kwargs": {"connection_info": ADDRESS},
+            "sync_interval": 60,
+        }
+        token = make_token()
+
+        await BloomFilterBlacklist(**kwargs).register(token)
+
+        # e.g. after restart, or in a worker started later
+        assert await BloomFilterBlacklist(**kwargs).is_blacklisted(token) is True
+
+    @pytest.mark.parametrize(
+        "backend_class", [RedisBlacklist, CachedRedisBlacklist, SharedMemoryBlacklist]
+    )
+    def test_shared_backend_requires_sync(self, backend_class):
+        with pytest.raises(ConfigurationConflictError, match="sync_interval"):
+            BloomFilterBlacklist(backend_class=backend_class)
+
+    def test_sync_requires_redis_backend(self, recwarn):
+        with pytest.raises(ConfigurationConflictError, match="synced"):
+            BloomFilterBlacklist(sync_interval=60)
+
+    def test_namespace(self):
+        blacklist = BloomFilterBlacklist(
+            backend_class=RedisBlacklist,
+            backend_init_kwargs={"connection_info": ADDRESS},
+            sync_interval=60,
+        )
+        blacklist.set_namespace("tenant:")
+
+        assert blacklist._key(1) == "tenant:sanic_jwt_extended:bloom:1"
+        assert blacklist.backend.jti_key_prefix == "tenant:"
+        assert blacklist.connection is blacklist.backend.connection
+
+    @pytest.mark.asyncio
+    async def test_register_many(self, redis):
+        blacklist = BloomFilterBlacklist(
+            backend_class=RedisBlacklist,
+            backend_init_kwargs={"connection_info": ADDRESS},
+            sync_interval=60,
+        )
+        tokens = [make_token() for _ in range(10)]
+
+        await blacklist.register_many((t.jti, _expires_at(t)) for t in tokens)
+
+        # bits of a generation are synced by one transaction
+        assert [c for c in redis.commands if c[0] == "EXEC"] == [
+            ("EXEC", 10),
+            ("EXEC", 10 * blacklist.filter.hash_count + 1),
+        ]
+        assert all([await blacklist.is_blacklisted(t) for t in tokens])
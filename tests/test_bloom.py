@@ -0,0 +1,56 @@
+import time
+import uuid
+
+from sanic_jwt_extended.bloom import BloomFilter, GenerationalBloomFilter
+
+
+class TestBloomFilter:
+    def test_for_capacity(self):
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        assert 9000 < bloom.size < 10000
+        assert bloom.hash_count == 7
+
+        bloom = BloomFilter.for_capacity(1000, 0.01, max_bytes=512)
+        assert bloom.size == 4096
+
+    def test_membership(self):
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        items = [uuid.uuid4().bytes for _ in range(1000)]
+
+        for item in items:
+            bloom.add(bloom.positions(item))
+
+        assert all(bloom.has(bloom.positions(item)) for item in items)
+
+        false_positives = sum(
+            bloom.has(bloom.positions(uuid.uuid4().bytes)) for _ in range(1000)
+        )
+        assert false_positives < 50
+        assert 0.4 < bloom.fill_ratio < 0.6
+
+    def test_merge(self):
+        bloom, other = BloomFilter(64, 2), BloomFilter(64, 2)
+        other.add(other.positions(b"item"))
+
+        bloom.merge(bytes(other.bits))
+
+        assert bloom.has(bloom.positions(b"item"))
+        assert bloom.set_bits == other.set_bits
+
+
+class TestGenerationalBloomFilter:
+    def test_generations(self):
+        bloom = GenerationalBloomFilter(100, 0.01, period=60, generations=2)
+        now = time.time()
+
+        expired = bloom.positions(b"expired")
+        bloom.add(expired, bloom.generation_of(now - 120))
+        current = bloom.positions(b"current")
+        bloom.add(current, bloom.generation_of(now + 1))
+        permanent = bloom.positions(b"permanent")
+        bloom.add(permanent, bloom.generation_of(float("inf")))
+
+        assert not bloom.might_contain(expired)
+        assert bloom.might_contain(current)
+        assert bloom.might_contain(permanent)
+        assert bloom.generation_of(now + 600) == bloom.PERMANENT
@@ -0,0 +1,83 @@
+import time
+from datetime import timedelta
+
+import pytest
+from jwt import ExpiredSignatureError
+from sanic import Sanic
+
+from sanic_jwt_extended.cache import TokenCache
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+
+
+class TestTokenCache:
+    def test_lru(self):
+        cache = TokenCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+
+        cache.set("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_expiry(self):
+        cache = TokenCache(ttl=60)
+        cache.set("expired", 1, exp=time.time() - 1)
+        cache.set("fresh", 2, exp=time.time() + 60)
+
+        assert cache.get("expired") is None
+        assert cache.get("fresh") == 2
+        assert len(cache) == 1
+
+    def test_evict(self):
+        cache = TokenCache()
+        cache.set("a", 1)
+        cache.evict("a")
+        cache.evict("unknown")
+
+        assert cache.get("a") is None
+
+
+class TestTokenWithCache:
+    @pytest.fixture
+    def jwt_manager(self):
+        app = Sanic()
+        with JWT.initialize(app) as initialize:
+            initialize.config.secret_key = "secret"
+            initialize.config.use_blacklist = True
+            initialize.config.use_token_cache = True
+            initialize.config.token_cache_ttl = timedelta(minutes=1)
+
+        return
+
+    def test_cache_hit(self, jwt_manager):
+        raw_token = JWT.create_access_token("user")
+
+        first = Token(raw_token)
+        second = Token(raw_token)
+
+        assert first == second
+        assert (JWT.token_cache.hits, JWT.token_cache.misses) == (1, 1)
+
+    def test_expired_token(self, jwt_manager):
+        raw_token = JWT.create_access_token("user", expires_delta=timedelta(seconds=-1))
+
+        with pytest.raises(ExpiredSignatureError):
+            Token(raw_token)
+
+        assert len(JWT.token_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_revoke_evicts(self, jwt_manager):
+        raw_token = JWT.create_access_token("user")
+        token = Token(raw_token)
+        assert len(JWT.token_cache) == 1
+
+        await token.revoke()
+
+        assert len(JWT.token_cache) == 0
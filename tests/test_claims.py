@@ -0,0 +1,61 @@
+import pytest
+from sanic import Sanic
+
+from sanic_jwt_extended.claims import ClaimLayout
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+
+
+class TestClaimLayout:
+    def test_encode(self):
+        layout = ClaimLayout("https://example.com/", "app")
+
+        payload = layout.encode(
+            {"sub": "user"},
+            public_claims={"user_id": 0, "misc": {"foo": "bar", "baz": {"q": [1]}}},
+            private_claims={"secret_info": "secret"},
+        )
+
+        assert payload == {
+            "sub": "user",
+            "https://example.com/user_id": 0,
+            "https://example.com/misc/foo": "bar",
+            "https://example.com/misc/baz/q": [1],
+            "app_secret_info": "secret",
+        }
+
+    @pytest.mark.parametrize("namespace", ["", "https://example.com/"])
+    @pytest.mark.parametrize("prefix", ["", "app"])
+    def test_split(self, namespace, prefix):
+        layout = ClaimLayout(namespace, prefix, ["role"])
+        public_claims = {"user_id": 0, "misc": {"foo": "bar"}} if namespace else {}
+        private_claims = {"secret_info": "secret", "level": 3}
+
+        payload = layout.encode(
+            {"sub": "user", "jti": "jti", "role": "ADMIN"},
+            public_claims,
+            private_claims,
+        )
+
+        for _ in range(2):  # second split hits cached keys
+            assert layout.split(payload) == (public_claims, private_claims)
+
+    def test_max_cached_keys(self):
+        layout = ClaimLayout(max_cached_keys=2)
+
+        payload = layout.encode({}, private_claims={f"k{i}": i for i in range(5)})
+
+        assert layout.split(payload) == ({}, {f"k{i}": i for i in range(5)})
+        assert len(layout._payload_keys) == 2
+
+
+def test_refresh_token_private_claims():
+    with JWT.initialize(Sanic()) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.private_claim_prefix = "app"
+
+    access_token = Token(JWT.create_access_token("user", private_claims={"k": "v"}))
+    refresh_token = Token(JWT.create_refresh_token("user", private_claims={"k": "v"}))
+
+    assert access_token.raw_data["app_k"] == refresh_token.raw_data["app_k"] == "v"
+    assert access_token.private_claims == refresh_token.private_claims == {"k": "v"}
@@ -0,0 +1,89 @@
+import datetime
+import json
+
+import jwt
+import pytest
+from jwt import (
+    ExpiredSignatureError,
+    ImmatureSignatureError,
+    InvalidAlgorithmError,
+    InvalidSignatureError,
+)
+
+from sanic_jwt_extended import jws
+from sanic_jwt_extended.codec import (
+    _AVAILABLE,
+    CODECS,
+    StdlibCodec,
+    UJSONCodec,
+    resolve_codec,
+)
+from sanic_jwt_extended.exceptions import ConfigurationConflictError
+
+AVAILABLE_CODECS = [name for name, available in _AVAILABLE.items() if available]
+
+
+class CustomEncoder(json.JSONEncoder):
+    ...
+
+
+class TestCodec:
+    def test_resolve(self):
+        assert isinstance(resolve_codec("json"), StdlibCodec)
+        assert resolve_codec("auto").name == next(
+            name for name in ("orjson", "ujson", "json") if _AVAILABLE[name]
+        )
+
+        codec = resolve_codec("auto", CustomEncoder)
+        assert isinstance(codec, StdlibCodec)
+        assert codec.json_encoder is CustomEncoder
+
+        codec = UJSONCodec()
+        assert resolve_codec(codec) is codec
+
+    @pytest.mark.parametrize("args", [("yaml",), ("ujson", CustomEncoder)])
+    def test_resolve_fail(self, args):
+        with pytest.raises(ConfigurationConflictError):
+            resolve_codec(*args)
+
+    @pytest.mark.parametrize("name", AVAILABLE_CODECS)
+    def test_round_trip(self, name):
+        codec = CODECS[name]() if name != "json" else StdlibCodec()
+        obj = {"sub": "user", "https://example.com/claims": {"k": ["v", 1, None]}}
+
+        assert codec.loads(codec.dumps(obj)) == obj
+
+
+class TestJWS:
+    @pytest.mark.parametrize("codec", AVAILABLE_CODECS)
+    def test_pyjwt_interop(self, codec):
+        codec = resolve_codec(codec)
+        now = datetime.datetime.utcnow()
+        payload = {"sub": "user", "iat": now, "exp": now + datetime.timedelta(1)}
+
+        token = jws.encode(payload, "secret", "HS256", {"class": "access"}, codec)
+
+        assert jwt.get_unverified_header(token) == {
+            "typ": "JWT",
+            "alg": "HS256",
+            "class": "access",
+        }
+        assert jwt.decode(token, "secret", algorithms=["HS256"])["sub"] == "user"
+
+        token = jwt.encode(payload, "secret", "HS256").decode("utf-8")
+
+        assert jws.decode(token, "secret", "HS256", codec)["sub"] == "user"
+
+    # fmt: off
+    @pytest.mark.parametrize("payload, key, algorithm, error", [
+        ({"exp": datetime.datetime(2000, 1, 1)}, "secret", "HS256", ExpiredSignatureError),
+        ({"nbf": datetime.datetime(3000, 1, 1)}, "secret", "HS256", ImmatureSignatureError),
+        ({}, "wrong-secret", "HS256", InvalidSignatureError),
+        ({}, "secret", "HS512", InvalidAlgorithmError),
+    ])  # fmt: on
+    def test_decode_fail(self, payload, key, algorithm, error):
+        codec = resolve_codec("auto")
+        token = jws.encode(payload, "secret", "HS256", {}, codec)
+
+        with pytest.raises(error):
+            jws.decode(token, key, algorithm, codec)
@@ -0,0 +1,153 @@
+import jwt
+import pytest
+from sanic import Sanic
+from sanic.response import json
+from sanic.websocket import WebSocketProtocol
+
+from sanic_jwt_extended.codec import _AVAILABLE
+from sanic_jwt_extended.decorators import jwt_required, refresh_jwt_required
+from sanic_jwt_extended.exceptions import ConfigurationConflictError
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+from tests.utils import DunnoValue
+
+
+@pytest.yield_fixture
+def app():
+    app = Sanic()
+
+    @app.route("/edit", methods=["GET"])
+    @jwt_required(allow=["write"])
+    async def edit(request, token: Token):
+        return json({"roles": sorted(token.roles)})
+
+    @app.route("/users", methods=["GET"])
+    @jwt_required(deny=["AUDITOR"])
+    async def users(request, token: Token):
+        return json({}, 204)
+
+    @app.route("/refresh", methods=["POST"])
+    @refresh_jwt_required(allow=["USER"])
+    async def refresh(request, token: Token):
+        return json({}, 204)
+
+    # views are decorated before initialize, like in most applications
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.use_acl = True
+        manager.config.acl_roles = {
+            "ADMIN": ["EDITOR"],
+            "EDITOR": [],
+            "USER": [],
+            "AUDITOR": [],
+        }
+        manager.config.acl_permissions = {
+            "EDITOR": ["read", "write"],
+            "USER": ["read"],
+            "AUDITOR": ["read"],
+        }
+
+    yield app
+
+
+@pytest.fixture
+def test_cli(loop, app, sanic_client):
+    return loop.run_until_complete(sanic_client(app, protocol=WebSocketProtocol))
+
+
+def header(token, refresh=False):
+    if refresh:
+        return {
+            JWT.config.refresh_jwt_header_key: f"{JWT.config.refresh_jwt_header_prefix} {token}"
+        }
+
+    return {JWT.config.jwt_header_key: f"{JWT.config.jwt_header_prefix} {token}"}
+
+
+async def test_hierarchy(test_cli):
+    token = JWT.create_access_token("user", role="ADMIN")
+
+    resp = await test_cli.get("/edit", headers=header(token))
+    assert resp.status == 200
+    assert await resp.json() == {"roles": ["ADMIN", "EDITOR", "read", "write"]}
+
+    token = JWT.create_access_token("user", role="USER")
+
+    resp = await test_cli.get("/edit", headers=header(token))
+    assert resp.status == 403
+    assert await resp.json() == {"msg": DunnoValue(str)}
+
+
+async def test_multiple_roles(test_cli):
+    token = JWT.create_access_token("user", role=["USER", "EDITOR"])
+    assert Token(token).roles == {"USER", "EDITOR", "read", "write"}
+
+    resp = await test_cli.get("/edit", headers=header(token))
+    assert resp.status == 200
+
+    token = JWT.create_access_token("user", role=["USER", "AUDITOR"])
+
+    resp = await test_cli.get("/users", headers=header(token))
+    assert resp.status == 403
+
+
+async def test_no_role(test_cli):
+    token = JWT.create_access_token("user")
+    assert Token(token).role == 0
+    assert Token(token).roles == frozenset()
+
+    resp = await test_cli.get("/edit", headers=header(token))
+    assert resp.status == 403
+
+    resp = await test_cli.get("/users", headers=header(token))
+    assert resp.status == 204
+
+
+async def test_refresh(test_cli):
+    token = JWT.create_refresh_token("user", role="USER")
+
+    resp = await test_cli.post("/refresh", headers=header(token, refresh=True))
+    assert resp.status == 204
+
+    token = JWT.create_refresh_token("user", role="ADMIN")
+
+    resp = await test_cli.post("/refresh", headers=header(token, refresh=True))
+    assert resp.status == 403
+
+
+async def test_string_role_claim(test_cli):
+    token = Token(JWT.create_access_token("user", role="USER"))
+    # role claim not encoded by registry, e.g. issued before roles were configured
+    raw_jwt = jwt.encode(
+        dict(token.raw_data, role="ADMIN"), "secret", algorithm="HS256"
+    ).decode()
+
+    resp = await test_cli.get("/edit", headers=header(raw_jwt))
+    assert resp.status == 422
+    assert await resp.json() == {"msg": DunnoValue(str)}
+
+
+def test_unknown_role_in_policy(app):
+    with pytest.raises(ConfigurationConflictError):
+        jwt_required(allow=["GUEST"])(lambda request, token: None)
+
+
+@pytest.mark.parametrize("codec", ["json", "ujson", "orjson"])
+def test_more_than_64_roles(codec):
+    if not _AVAILABLE[codec]:
+        pytest.skip(f"{codec} is not installed")
+
+    app = Sanic()
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.json_codec = codec
+        manager.config.use_acl = True
+        manager.config.acl_roles = {f"ROLE{i}": [] for i in range(70)}
+        manager.config.acl_permissions = {"ROLE69": ["write"]}
+
+    token = Token(JWT.create_access_token("user", role=["ROLE0", "ROLE69"]))
+
+    assert isinstance(token.raw_data["role"], str)
+    assert token.role == JWT.acl.encode(["ROLE0", "ROLE69"])
+    assert token.roles == {"ROLE0", "ROLE69", "write"}
+    assert Token(JWT.create_refresh_token("user")).role == 0
@@ -0,0 +1,108 @@
+import datetime
+
+import pytest
+from sanic import Sanic
+from sanic.response import json
+from sanic.websocket import WebSocketProtocol
+
+from sanic_jwt_extended.decorators import jwt_middleware, jwt_required
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+from tests.utils import RecordingSink
+
+
+@pytest.yield_fixture
+def app(recwarn):
+    app = Sanic()
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.use_blacklist = True
+        manager.config.metrics_sink = RecordingSink()
+
+    @app.route("/protected", methods=["GET"])
+    @jwt_required
+    async def protected(*args, **kwargs):
+        return json({}, 204)
+
+    @app.route("/stacked", methods=["GET"])
+    @jwt_required
+    @jwt_required(fresh_required=True)
+    async def stacked(*args, **kwargs):
+        return json({}, 204)
+
+    @app.route("/broken", methods=["GET"])
+    @jwt_required
+    async def broken(*args, **kwargs):
+        raise ValueError
+
+    yield app
+
+
+@pytest.fixture
+def test_cli(loop, app, sanic_client):
+    return loop.run_until_complete(sanic_client(app, protocol=WebSocketProtocol))
+
+
+def auth_header(token):
+    return {JWT.config.jwt_header_key: f"{JWT.config.jwt_header_prefix} {token}"}
+
+
+async def test_stages(test_cli):
+    resp = await test_cli.get(
+        "/protected", headers=auth_header(JWT.create_access_token("user"))
+    )
+    assert resp.status == 204
+
+    sink = JWT.metrics_sink
+    assert sink.stages == ["extract", "verify", "claims", "blacklist"]
+    assert all(seconds >= 0 for _, seconds in sink.durations)
+    assert sink.outcomes == ["success"]
+
+
+async def test_outcomes(test_cli):
+    revoked_token = JWT.create_access_token("user")
+    await Token(revoked_token).revoke()
+    tokens = [
+        JWT.create_access_token("user", expires_delta=datetime.timedelta(seconds=-1)),
+        revoked_token,
+        JWT.create_refresh_token("user"),
+        "not.a.token",
+    ]
+
+    await test_cli.get("/protected")
+    for token in tokens:
+        await test_cli.get("/protected", headers=auth_header(token))
+
+    assert JWT.metrics_sink.outcomes == [
+        "missing",
+        "expired",
+        "revoked",
+        "wrong_type",
+        "invalid",
+    ]
+
+
+async def test_handler_errors_are_not_counted(test_cli):
+    resp = await test_cli.get(
+        "/broken", headers=auth_header(JWT.create_access_token("user"))
+    )
+    assert resp.status == 500
+
+    assert JWT.metrics_sink.outcomes == ["success"]
+
+
+@pytest.mark.parametrize("middleware", [False, True])
+async def test_stacked_decorators_count_once(app, test_cli, middleware):
+    if middleware:
+        app.register_middleware(jwt_middleware, "request")
+
+    token = JWT.create_access_token("user", fresh=True)
+    resp = await test_cli.get("/stacked", headers=auth_header(token))
+    assert resp.status == 204
+
+    await test_cli.get("/stacked")
+
+    sink = JWT.metrics_sink
+    assert sink.outcomes == ["success", "missing"]
+    assert sink.stages.count("verify") == 1
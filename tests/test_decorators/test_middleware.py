@@ -0,0 +1,176 @@
+import pytest
+from sanic import Blueprint, Sanic
+from sanic.response import json
+from sanic.websocket import WebSocketProtocol
+
+from sanic_jwt_extended.decorators import (
+    jwt_middleware,
+    jwt_optional,
+    jwt_required,
+    refresh_jwt_required,
+)
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+from tests.utils import DunnoValue
+
+
+@pytest.fixture
+def verify_calls(monkeypatch):
+    calls = []
+    verify = Token.verify.__func__
+
+    async def counting_verify(cls, raw_jwt, manager=None):
+        calls.append(raw_jwt)
+        return await verify(cls, raw_jwt, manager)
+
+    monkeypatch.setattr(Token, "verify", classmethod(counting_verify))
+
+    return calls
+
+
+@pytest.yield_fixture
+def app():
+    app = Sanic()
+    bp = Blueprint("bp", url_prefix="/bp")
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.use_acl = True
+        manager.config.use_blacklist = True
+        manager.config.refresh_token_rotation = True
+
+    app.register_middleware(jwt_middleware, "request")
+
+    @app.route("/public", methods=["GET"])
+    async def public(request):
+        return json(
+            {"memo": sorted(request.ctx.jwt_auth) if request.ctx.__dict__ else None}
+        )
+
+    @app.route("/stacked", methods=["GET"])
+    @jwt_required(allow=["ADMIN", "USER"])
+    @jwt_required(deny=["GUEST"])
+    async def stacked(request, token: Token):
+        return json({"identity": token.identity, "memo": sorted(request.ctx.jwt_auth)})
+
+    @app.route("/optional", methods=["GET"])
+    @jwt_optional
+    async def optional(request, token: Token):
+        return json({"identity": token.identity if token else None})
+
+    @app.route("/refresh", methods=["POST"])
+    @refresh_jwt_required
+    @refresh_jwt_required
+    async def refresh(request, token: Token):
+        return json({"refresh_token": token.successor})
+
+    @bp.route("/protected", methods=["GET"])
+    @jwt_required
+    async def protected(request, token: Token):
+        return json({"identity": token.identity})
+
+    app.blueprint(bp)
+
+    yield app
+
+
+@pytest.fixture
+def test_cli(loop, app, sanic_client):
+    return loop.run_until_complete(sanic_client(app, protocol=WebSocketProtocol))
+
+
+def header(token):
+    return {JWT.config.jwt_header_key: f"{JWT.config.jwt_header_prefix} {token}"}
+
+
+def refresh_header(token):
+    return {
+        JWT.config.refresh_jwt_header_key: f"{JWT.config.refresh_jwt_header_prefix} {token}"
+    }
+
+
+def test_requirements():
+    @jwt_required
+    @jwt_optional
+    async def view(request, token):
+        pass
+
+    @jwt_optional
+    async def optional(request, token):
+        pass
+
+    assert view.__jwt_requirements__ == {"access": True}
+    assert optional.__jwt_requirements__ == {"access": False}
+
+
+async def test_public(test_cli, verify_calls):
+    token = JWT.create_access_token("user")
+
+    resp = await test_cli.get("/public", headers=header(token))
+    assert resp.status == 200
+    assert await resp.json() == {"memo": None}
+    assert verify_calls == []
+
+
+async def test_stacked(test_cli, verify_calls):
+    token = JWT.create_access_token("user", role="USER")
+
+    resp = await test_cli.get("/stacked", headers=header(token))
+    assert resp.status == 200
+    assert await resp.json() == {
+        "identity": "user",
+        "memo": [["access", "blacklist"], ["access", "token"]],
+    }
+    assert verify_calls == [token]
+
+    token = JWT.create_access_token("user", role="GUEST")
+
+    resp = await test_cli.get("/stacked", headers=header(token))
+    assert resp.status == 403
+
+
+async def test_failure(test_cli, verify_calls):
+    token = JWT.create_access_token("user", role="USER")
+    await Token(token).revoke()
+
+    resp = await test_cli.get("/stacked", headers=header(token))
+    assert resp.status == 401
+    assert await resp.json() == {"msg": DunnoValue(str)}
+    assert verify_calls == [token]
+
+    resp = await test_cli.get("/stacked")
+    assert resp.status == 401
+
+
+async def test_optional(test_cli):
+    resp = await test_cli.get("/optional")
+    assert resp.status == 200
+    assert await resp.json() == {"identity": None}
+
+    token = JWT.create_access_token("user")
+
+    resp = await test_cli.get("/optional", headers=header(token))
+    assert await resp.json() == {"identity": "user"}
+
+
+async def test_rotation_once(test_cli):
+    token = JWT.create_refresh_token("user")
+
+    resp = await test_cli.post("/refresh", headers=refresh_header(token))
+    assert resp.status == 200
+
+    successor = (await resp.json())["refresh_token"]
+    resp = await test_cli.post("/refresh", headers=refresh_header(successor))
+    assert resp.status == 200
+
+
+async def test_blueprint(test_cli, verify_calls):
+    token = JWT.create_access_token("user")
+
+    resp = await test_cli.get("/bp/protected", headers=header(token))
+    assert resp.status == 200
+    assert await resp.json() == {"identity": "user"}
+    assert verify_calls == [token]
+
+    resp = await test_cli.get("/bp/unknown", headers=header(token))
+    assert resp.status == 404
@@ -0,0 +1,137 @@
+import pytest
+from sanic import Sanic
+from sanic.response import json
+from sanic.websocket import WebSocketProtocol
+
+from sanic_jwt_extended import reference
+from sanic_jwt_extended.decorators import jwt_required
+from sanic_jwt_extended.exceptions import ConfigurationConflictError, JWTDecodeError
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+from tests.utils import DunnoValue
+
+
+@pytest.yield_fixture
+def app(recwarn):
+    app = Sanic()
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.use_reference_tokens = True
+        manager.config.use_acl = True
+        manager.config.private_claim_prefix = "pri"
+
+    @app.route("/protected", methods=["GET"])
+    @jwt_required
+    async def protected(request, token: Token):
+        return json(
+            {
+                "identity": token.identity,
+                "role": token.role,
+                "private_claims": token.private_claims,
+            }
+        )
+
+    @app.route("/logout", methods=["POST"])
+    @jwt_required
+    async def logout(request, token: Token):
+        await token.revoke()
+        return json({}, 204)
+
+    yield app
+
+
+@pytest.fixture
+def test_cli(loop, app, sanic_client):
+    return loop.run_until_complete(sanic_client(app, protocol=WebSocketProtocol))
+
+
+def auth_header(token):
+    return {JWT.config.jwt_header_key: f"{JWT.config.jwt_header_prefix} {token}"}
+
+
+async def test_reference_token(test_cli):
+    handle = await JWT.create_access_token_async(
+        "user", "ADMIN", private_claims={"foo": "bar"}
+    )
+    assert "." not in handle
+
+    resp = await test_cli.get("/protected", headers=auth_header(handle))
+    assert resp.status == 200
+    assert await resp.json() == {
+        "identity": "user",
+        "role": "ADMIN",
+        "private_claims": {"foo": "bar"},
+    }
+
+    # self-contained tokens are still accepted
+    jwt = await JWT.create_refresh_token_async("user")
+    assert (await Token.verify(jwt)).identity == "user"
+
+
+async def test_cached_introspection(test_cli):
+    handle = await JWT.create_access_token_async("user")
+    lookups = []
+    store_get = JWT.reference_store.get
+
+    async def get(key):
+        lookups.append(key)
+        return await store_get(key)
+
+    JWT.reference_store.get = get
+
+    for _ in range(3):
+        resp = await test_cli.get("/protected", headers=auth_header(handle))
+        assert resp.status == 200
+
+    assert len(lookups) == 1
+
+
+async def test_revoke(test_cli):
+    handle = await JWT.create_access_token_async("user")
+
+    resp = await test_cli.post("/logout", headers=auth_header(handle))
+    assert resp.status == 204
+    assert JWT.reference_store.entries == {}
+
+    resp = await test_cli.get("/protected", headers=auth_header(handle))
+    assert resp.status == 401
+    assert await resp.json() == {"msg": DunnoValue(str)}
+
+    resp = await test_cli.get("/protected", headers=auth_header(reference.new_handle()))
+    assert resp.status == 401
+
+    resp = await test_cli.get("/protected", headers=auth_header("unknown"))
+    assert resp.status == 422
+
+
+async def test_garbage_never_reaches_store(test_cli):
+    token = await Token.verify(await JWT.create_access_token_async("user"))
+    lookups = []
+
+    async def lookup(key):
+        lookups.append(key)
+
+    JWT.reference_store.get = JWT.reference_store.delete = lookup
+    handle = reference.new_handle()
+
+    for garbage in ("x" * 5000, handle[:-1], handle + "x", handle[:-1] + "+"):
+        with pytest.raises(JWTDecodeError):
+            await Token.verify(garbage)
+
+        resp = await test_cli.get("/protected", headers=auth_header(garbage))
+        assert resp.status != 200
+
+    token.raw_jwt = "x" * 5000
+    with pytest.raises(JWTDecodeError):
+        await token.revoke()
+
+    assert lookups == []
+
+
+async def test_sync_creation_fails(test_cli):
+    with pytest.raises(ConfigurationConflictError):
+        JWT.create_access_token("user")
+
+    with pytest.raises(ConfigurationConflictError):
+        JWT.create_tokens_batch([{"identity": "user"}])
@@ -0,0 +1,100 @@
+import pytest
+from sanic import Sanic
+from sanic.response import json
+from sanic.websocket import WebSocketProtocol
+
+from sanic_jwt_extended.blacklist import BloomFilterBlacklist
+from sanic_jwt_extended.decorators import refresh_jwt_required
+from sanic_jwt_extended.exceptions import ConfigurationConflictError
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+from tests.utils import DunnoValue, MinimalBlacklist
+
+
+@pytest.yield_fixture
+def app(recwarn):
+    app = Sanic()
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.use_blacklist = True
+        manager.config.refresh_token_rotation = True
+
+    @app.route("/refresh", methods=["POST"])
+    @refresh_jwt_required
+    async def refresh(request, token: Token):
+        return json({"refresh_token": token.successor, "family": token.family})
+
+    yield app
+
+
+@pytest.fixture
+def test_cli(loop, app, sanic_client):
+    return loop.run_until_complete(sanic_client(app, protocol=WebSocketProtocol))
+
+
+def refresh_header(token):
+    return {
+        JWT.config.refresh_jwt_header_key: f"{JWT.config.refresh_jwt_header_prefix} {token}"
+    }
+
+
+async def test_rotation(test_cli):
+    token = JWT.create_refresh_token("user", private_claims={"foo": "bar"})
+
+    resp = await test_cli.post("/refresh", headers=refresh_header(token))
+    assert resp.status == 200
+    body = await resp.json()
+    assert body == {"refresh_token": DunnoValue(str), "family": DunnoValue(str)}
+
+    successor = await Token.verify(body["refresh_token"])
+    assert successor.identity == "user"
+    assert successor.family == body["family"]
+    assert successor.private_claims == {"foo": "bar"}
+
+    resp = await test_cli.post("/refresh", headers=refresh_header(successor.raw_jwt))
+    assert resp.status == 200
+
+
+async def test_reuse_revokes_family(test_cli):
+    token = JWT.create_refresh_token("user")
+
+    resp = await test_cli.post("/refresh", headers=refresh_header(token))
+    successor = (await resp.json())["refresh_token"]
+
+    # replaying a redeemed token revokes every token of the family
+    resp = await test_cli.post("/refresh", headers=refresh_header(token))
+    assert resp.status == 401
+    assert await resp.json() == {"msg": DunnoValue(str)}
+
+    resp = await test_cli.post("/refresh", headers=refresh_header(successor))
+    assert resp.status == 401
+
+    # other sessions are not affected
+    other = JWT.create_refresh_token("user")
+    resp = await test_cli.post("/refresh", headers=refresh_header(other))
+    assert resp.status == 200
+
+
+def test_rotation_requires_blacklist():
+    with pytest.raises(ConfigurationConflictError):
+        with JWT.initialize(Sanic()) as manager:
+            manager.config.secret_key = "secret"
+            manager.config.refresh_token_rotation = True
+
+
+@pytest.mark.parametrize(
+    "blacklist_class, blacklist_init_kwargs",
+    [
+        (MinimalBlacklist, None),
+        (BloomFilterBlacklist, {"backend_class": MinimalBlacklist}),
+    ],
+)
+def test_rotation_requires_capable_blacklist(blacklist_class, blacklist_init_kwargs):
+    with pytest.raises(ConfigurationConflictError, match="revoke_family, redeem"):
+        with JWT.initialize(Sanic()) as manager:
+            manager.config.secret_key = "secret"
+            manager.config.use_blacklist = True
+            manager.config.blacklist_class = blacklist_class
+            manager.config.blacklist_init_kwargs = blacklist_init_kwargs
+            manager.config.refresh_token_rotation = True
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+
+from sanic_jwt_extended.config import Config
+from sanic_jwt_extended.exceptions import (
+    CSRFError,
+    InvalidHeaderError,
+    NoAuthorizationError,
+)
+from sanic_jwt_extended.extractors import compile_extractor
+
+
+def make_request(method="GET", headers=None, cookies=None, args=None):
+    return SimpleNamespace(
+        method=method, headers=headers or {}, cookies=cookies or {}, args=args or {},
+    )
+
+
+class TestExtractors:
+    def test_header(self):
+        extract = compile_extractor(Config())
+
+        assert extract(make_request(headers={"Authorization": "Bearer t0k3n"})) == (
+            "t0k3n",
+            None,
+        )
+
+        with pytest.raises(InvalidHeaderError):
+            extract(make_request(headers={"Authorization": "Token t0k3n"}))
+
+        with pytest.raises(InvalidHeaderError):
+            extract(make_request(headers={"Authorization": " "}))
+
+    def test_refresh_header(self):
+        config = Config(refresh_jwt_header_prefix="Refresh")
+        extract = compile_extractor(config, is_access=False)
+
+        request = make_request(headers={"X-Refresh-Token": "Refresh t0k3n"})
+        assert extract(request) == ("t0k3n", None)
+
+    def test_cookies(self):
+        config = Config(token_location=("cookies",))
+        extract = compile_extractor(config)
+
+        request = make_request(cookies={"access_token_cookie": "t0k3n"})
+        assert extract(request) == ("t0k3n", None)
+
+        request = make_request(
+            "POST",
+            headers={"X-CSRF-Token": "csrf"},
+            cookies={"access_token_cookie": "t0k3n"},
+        )
+        assert extract(request) == ("t0k3n", "csrf")
+
+        with pytest.raises(CSRFError):
+            extract(make_request("POST", cookies={"access_token_cookie": "t0k3n"}))
+
+    def test_multiple_locations(self):
+        config = Config(token_location=("header", "query", "cookies"))
+        extract = compile_extractor(config)
+
+        assert extract(make_request(args={"jwt": "t0k3n"})) == ("t0k3n", None)
+
+        with pytest.raises(NoAuthorizationError) as e:
+            extract(make_request())
+
+        assert str(e.value) == (
+            'Missing header "Authorization", Missing query parameter "jwt", '
+            'Missing cookie "access_token_cookie"'
+        )
@@ -0,0 +1,135 @@
+import pytest
+from jwt.exceptions import InvalidAlgorithmError
+from sanic import Sanic
+
+from sanic_jwt_extended import jws
+from sanic_jwt_extended.codec import resolve_codec
+from sanic_jwt_extended.exceptions import ConfigurationConflictError, JWTDecodeError
+from sanic_jwt_extended.gate import TokenGate
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.tokens import Token
+
+
+def make_raw_jwt(header):
+    return jws.encode({"sub": "user"}, "secret", "HS256", header, resolve_codec("auto"))
+
+
+@pytest.fixture
+def gate():
+    return TokenGate(
+        "HS256", resolve_codec("auto"), max_length=512, header_cache_size=2
+    )
+
+
+def test_accepts_well_formed(gate):
+    raw_jwt = make_raw_jwt({"class": "access", "kid": "1"})
+
+    header = gate.check(raw_jwt)
+
+    assert header["class"] == "access"
+    assert gate.check(raw_jwt) is header
+    assert gate.headers.hits == 1
+
+
+@pytest.mark.parametrize(
+    "raw_jwt",
+    [
+        "a" * 513,
+        "",
+        "aaa.bbb",
+        "aaa.bbb.ccc.ddd",
+        "aaa..ccc",
+        "aaa.bbb.",
+        "aaa.bb+b.ccc",
+        "aaa.bbb=.ccc",
+        "aaa.bbb.ccc ",
+        "ááá.bbb.ccc",
+    ],
+)
+def test_rejects_malformed(gate, raw_jwt):
+    with pytest.raises(JWTDecodeError):
+        gate.check(raw_jwt)
+
+    assert len(gate.headers) == 0
+
+
+def test_rejects_headers_not_allowed(gate):
+    with pytest.raises(JWTDecodeError, match="Invalid header"):
+        gate.check("bm90IGpzb24.bbb.ccc")
+
+    with pytest.raises(JWTDecodeError, match="missing 'class'"):
+        gate.check(make_raw_jwt({}))
+
+    with pytest.raises(InvalidAlgorithmError):
+        gate.check(make_raw_jwt({"class": "access", "alg": "none"}))
+
+    for kid in ([], {}, 1):
+        with pytest.raises(JWTDecodeError, match="Invalid header"):
+            gate.check(make_raw_jwt({"class": "access", "kid": kid}))
+
+    assert len(gate.headers) == 0
+
+
+def test_rejected_before_verifying(monkeypatch):
+    app = Sanic()
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.max_token_length = 1024
+
+    def decode(*args, **kwargs):
+        raise AssertionError("should not be reached")
+
+    monkeypatch.setattr(jws, "decode", decode)
+
+    for raw_jwt in ("x" * 2048, "garbage", "a.b.c", make_raw_jwt({"class": "x"})):
+        with pytest.raises(JWTDecodeError):
+            Token(raw_jwt)
+
+
+def test_no_length_limit_by_default():
+    app = Sanic()
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+
+    claims = {f"claim{i}": f"value{i}" for i in range(1000)}
+    raw_jwt = JWT.create_access_token("user", private_claims=claims)
+
+    assert len(raw_jwt) > 8192
+    assert Token(raw_jwt).private_claims == claims
+
+
+@pytest.mark.asyncio
+async def test_minting_too_long_token():
+    app = Sanic()
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.max_token_length = 1024
+
+    claims = {f"claim{i}": f"value{i}" for i in range(100)}
+
+    assert Token(JWT.create_access_token("user"))
+
+    with pytest.raises(ConfigurationConflictError, match="max_token_length"):
+        JWT.create_access_token("user", private_claims=claims)
+    with pytest.raises(ConfigurationConflictError, match="max_token_length"):
+        JWT.create_refresh_token("user", private_claims=claims)
+    with pytest.raises(ConfigurationConflictError, match="max_token_length"):
+        await JWT.create_access_token_async("user", private_claims=claims)
+    with pytest.raises(ConfigurationConflictError, match="max_token_length"):
+        JWT.create_tokens_batch([{"identity": "user", "private_claims": claims}])
+
+
+def test_unhashable_kid():
+    app = Sanic()
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+
+    for kid in ([], {}):
+        raw_jwt = make_raw_jwt({"class": "access", "alg": "HS256", "kid": kid})
+
+        with pytest.raises(JWTDecodeError):
+            Token(raw_jwt)
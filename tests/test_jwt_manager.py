@@ -1,9 +1,22 @@
+import asyncio
+import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pytest
+from jwt import ExpiredSignatureError
 from sanic import Sanic
 
 from sanic_jwt_extended.exceptions import ConfigurationConflictError
 from sanic_jwt_extended.jwt_manager import JWT
 from sanic_jwt_extended.tokens import Token
+from tests.utils import generate_rsa_key_pair
+
+RSA_PRIVATE_KEY, RSA_PUBLIC_KEY = generate_rsa_key_pair()
+RSA_CONFIG = {
+    "algorithm": "RS256",
+    "private_key": RSA_PRIVATE_KEY,
+    "public_key": RSA_PUBLIC_KEY,
+}
 
 
 class TestJWT:
@@ -15,7 +28,7 @@ class TestJWT:
     # fmt: off
     @pytest.mark.parametrize("config", [
         {"secret_key": "super-secret"},
-        {"algorithm": "RS256", "public_key": "pub1ic", "private_key": "pr1vate"},
+        RSA_CONFIG,
         {"secret_key": "super-secret", "use_blacklist": True}
     ])
     @pytest.mark.parametrize("handler", [
@@ -46,6 +59,9 @@ class TestJWT:
         {},
         {"algorithm": "RS256", "public_key": "pub1ic", "secret_key": "s3cr3t"},
         {"algorithm": "RS256", "private_key": "s3cr3t"},
+        {"algorithm": "RS256", "public_key": "pub1ic", "private_key": "pr1vate"},
+        {"algorithm": "XX256", "secret_key": "s3cr3t"},
+        {"algorithm": "none", "secret_key": "s3cr3t"},
     ])  # fmt: on
     def test_initialize_fail(self, app, config):
         with pytest.raises(ConfigurationConflictError):
@@ -90,3 +106,94 @@ class TestJWT:
 
         with pytest.raises(ConfigurationConflictError):
             JWT.create_access_token(**args)
+
+    # fmt: off
+    @pytest.mark.parametrize("algorithm", ["HS256", "RS256"])
+    # fmt: on
+    def test_create_tokens_batch(self, app, algorithm):
+        private_key, public_key = generate_rsa_key_pair()
+
+        with JWT.initialize(app) as manager:
+            manager.config.algorithm = algorithm
+            manager.config.secret_key = "secret"
+            manager.config.private_key = private_key
+            manager.config.public_key = public_key
+
+        specs = [{"identity": f"user{i}", "fresh": i % 2 == 0} for i in range(5)]
+
+        tokens = JWT.create_tokens_batch(specs)
+
+        assert [Token(t).identity for t in tokens] == [s["identity"] for s in specs]
+        assert [Token(t).fresh for t in tokens] == [s["fresh"] for s in specs]
+
+        pairs = JWT.create_tokens_batch(specs, refresh=True)
+
+        for spec, (access_token, refresh_token) in zip(specs, pairs):
+            access_token, refresh_token = Token(access_token), Token(refresh_token)
+            assert (access_token.type, refresh_token.type) == ("access", "refresh")
+            assert access_token.identity == refresh_token.identity == spec["identity"]
+            assert access_token.jti != refresh_token.jti
+
+    # fmt: off
+    @pytest.mark.parametrize("algorithm, executor_class", [
+        ("HS256", ThreadPoolExecutor),
+        ("RS256", ThreadPoolExecutor),
+        ("RS256", ProcessPoolExecutor),
+    ])
+    # fmt: on
+    @pytest.mark.asyncio
+    async def test_offload_crypto(self, app, algorithm, executor_class):
+        private_key, public_key = generate_rsa_key_pair()
+        executor = executor_class(1)
+
+        with JWT.initialize(app) as manager:
+            manager.config.algorithm = algorithm
+            manager.config.secret_key = "secret"
+            manager.config.private_key = private_key
+            manager.config.public_key = public_key
+            manager.config.offload_crypto = True
+            manager.config.crypto_executor = executor
+
+        if algorithm.startswith("HS"):
+            assert JWT.crypto_executor is None
+        else:
+            assert JWT.crypto_executor is executor
+
+        access_token = await JWT.create_access_token_async("user", fresh=True)
+        refresh_token = await JWT.create_refresh_token_async("user")
+
+        token = await Token.verify(access_token)
+        assert (token.identity, token.type, token.fresh) == ("user", "access", True)
+        assert token == Token(access_token)
+        assert (await Token.verify(refresh_token)).type == "refresh"
+
+        expired_token = await JWT.create_access_token_async(
+            "user", expires_delta=datetime.timedelta(seconds=-1)
+        )
+        with pytest.raises(ExpiredSignatureError):
+            await Token.verify(expired_token)
+
+        # executor given in config is left running for its owner
+        for listener in app.listeners["after_server_stop"]:
+            await listener(app, asyncio.get_event_loop())
+        assert (await Token.verify(refresh_token)).type == "refresh"
+
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_default_executor_shutdown(self, app):
+        with JWT.initialize(app) as manager:
+            for attr, value in RSA_CONFIG.items():
+                setattr(manager.config, attr, value)
+            manager.config.offload_crypto = True
+
+        executor = JWT.crypto_executor
+        access_token = await JWT.create_access_token_async("user")
+
+        for listener in app.listeners["after_server_stop"]:
+            await listener(app, asyncio.get_event_loop())
+
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+        assert JWT.crypto_executor is not executor
+        assert (await Token.verify(access_token)).identity == "user"
@@ -0,0 +1,73 @@
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from sanic import Sanic
+
+from sanic_jwt_extended.exceptions import ConfigurationConflictError, JWTDecodeError
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.keys import KeyRing
+from sanic_jwt_extended.tokens import Token
+from tests.utils import generate_rsa_key_pair
+
+
+class TestKeyRing:
+    def test_preloaded_keys(self):
+        private_key, public_key = generate_rsa_key_pair()
+        key_ring = KeyRing("RS256")
+        key_ring.add("k1", private_key=private_key, public_key=public_key)
+
+        assert key_ring.kids == ["k1"]
+        assert isinstance(key_ring.verifying_key("k1"), rsa.RSAPublicKey)
+
+        with pytest.raises(ConfigurationConflictError):
+            key_ring.signing_key  # pylint: disable=pointless-statement
+
+        key_ring.activate("k1")
+        kid, key = key_ring.signing_key
+
+        assert kid == "k1"
+        assert isinstance(key, rsa.RSAPrivateKey)
+
+        with pytest.raises(JWTDecodeError):
+            key_ring.verifying_key("unknown")
+
+    def test_retire(self):
+        key_ring = KeyRing("HS256")
+        key_ring.add("k1", secret="s3cr3t", activate=True)
+
+        with pytest.raises(ConfigurationConflictError):
+            key_ring.retire("k1")
+
+        key_ring.add("k2", secret="s3cr3t2", activate=True)
+        key_ring.retire("k1")
+
+        assert key_ring.kids == ["k2"]
+
+
+class TestKeyRotation:
+    @pytest.fixture
+    def jwt_manager(self):
+        private_key, public_key = generate_rsa_key_pair()
+
+        with JWT.initialize(Sanic()) as manager:
+            manager.config.algorithm = "RS256"
+            manager.config.private_key = private_key
+            manager.config.public_key = public_key
+            manager.config.key_id = "k1"
+
+    def test_rotation(self, jwt_manager):
+        old_token = JWT.create_access_token("user")
+        assert Token(old_token).header["kid"] == "k1"
+
+        private_key, public_key = generate_rsa_key_pair()
+        JWT.key_ring.add(
+            "k2", private_key=private_key, public_key=public_key, activate=True
+        )
+        new_token = JWT.create_access_token("user")
+
+        assert Token(new_token).header["kid"] == "k2"
+        assert Token(old_token).header["kid"] == "k1"
+
+        JWT.key_ring.retire("k1")
+
+        with pytest.raises(JWTDecodeError):
+            Token(old_token)
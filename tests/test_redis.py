@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import aioredis
+import pytest
+from sanic import Sanic
+from sanic.response import json
+
+from sanic_jwt_extended.blacklist import RedisBlacklist
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.redis import RedisConnection, expire_in
+from tests.utils import FakeRedis
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    created = []
+
+    async def create_redis_pool(address, **kwargs):
+        await asyncio.sleep(0.01)
+        redis = FakeRedis()
+        redis.connection = SimpleNamespace(
+            size=kwargs.get("minsize", 1),
+            freesize=kwargs.get("minsize", 1),
+            minsize=kwargs.get("minsize", 1),
+            maxsize=kwargs.get("maxsize", 10),
+        )
+        created.append((address, kwargs))
+
+        return redis
+
+    monkeypatch.setattr(aioredis, "create_redis_pool", create_redis_pool)
+    return created
+
+
+def test_expire_in():
+    assert expire_in(100.2, 40.0) == 61
+    assert expire_in(100.0, 40.0) == 60
+    assert expire_in(40.5, 40.0) == 1
+    assert expire_in(30.0, 40.0) == 1
+    assert expire_in(float("inf"), 40.0) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_initialize_creates_one_pool(pools):
+    connection = RedisConnection("redis://localhost")
+
+    connections = await asyncio.gather(
+        *(connection._get_redis_connection() for _ in range(10))
+    )
+
+    assert len(pools) == 1
+    assert all(c is connections[0] for c in connections)
+    assert connection._connecting is None
+
+
+@pytest.mark.asyncio
+async def test_connection_info(pools):
+    await RedisConnection(
+        {"address": "redis://localhost", "minsize": 2, "maxsize": 4, "db": 1}
+    ).initialize()
+
+    assert pools == [("redis://localhost", {"minsize": 2, "maxsize": 4, "db": 1})]
+
+    await RedisConnection(("localhost", 6379)).initialize()
+
+    assert pools[-1] == (("localhost", 6379), {})
+
+
+@pytest.mark.asyncio
+async def test_stats(pools):
+    connection = RedisConnection({"address": "redis://localhost", "minsize": 2})
+    assert connection.stats() is None
+
+    await connection.initialize()
+    connection.redis.connection.freesize = 1
+    stats = connection.stats()
+
+    assert (stats.size, stats.free, stats.in_use) == (2, 1, 1)
+    assert (stats.minsize, stats.maxsize, stats.pools_created) == (2, 10, 1)
+
+    await connection.release()
+    await connection.release()
+
+    assert connection.stats() is None
+
+
+def test_pool_lifecycle_follows_server(pools):
+    app = Sanic()
+    seen = []
+
+    @app.route("/", methods=["GET"])
+    async def index(request):
+        seen.append(JWT.blacklist.connection.stats())
+        return json({})
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+        manager.config.use_blacklist = True
+        manager.config.blacklist_class = RedisBlacklist
+        manager.config.blacklist_init_kwargs = {
+            "connection_info": {"address": "redis://localhost", "minsize": 3}
+        }
+
+    request, response = app.test_client.get("/")
+
+    assert response.status == 200
+    assert seen[0].size == 3
+    assert len(pools) == 1
+    assert JWT.blacklist.connection.redis is None
@@ -0,0 +1,75 @@
+import time
+
+import aioredis
+import pytest
+
+from sanic_jwt_extended import reference
+from sanic_jwt_extended.exceptions import JWTDecodeError
+from sanic_jwt_extended.reference import InMemoryReferenceStore, RedisReferenceStore
+from tests.utils import DunnoValue, FakeRedis, fake_redis_pool
+
+ADDRESS = "redis://localhost"
+
+
+def test_handle():
+    handle = reference.new_handle()
+
+    assert reference.is_handle(handle)
+    assert not reference.is_handle("xxx.yyy.zzz")
+    assert len(handle) < 64
+    assert reference.digest(handle) != handle
+    assert reference.check_handle(handle) == handle
+
+    for garbage in ("", handle[1:], handle + "a", handle[:-1] + "=", "x" * 5000):
+        with pytest.raises(JWTDecodeError):
+            reference.check_handle(garbage)
+
+
+class TestInMemoryReferenceStore:
+    @pytest.mark.asyncio
+    async def test_put_get_delete(self):
+        store = InMemoryReferenceStore()
+
+        await store.put("key", {"sub": "user"}, time.time() + 60)
+        await store.put("forever", {"sub": "user"}, float("inf"))
+
+        assert await store.get("key") == {"sub": "user"}
+        assert await store.get("forever") == {"sub": "user"}
+        assert await store.get("unknown") is None
+
+        await store.delete("key")
+        assert await store.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_purged(self):
+        store = InMemoryReferenceStore()
+
+        await store.put("expired", {"sub": "user"}, time.time() - 1)
+        assert await store.get("expired") is None
+
+        await store.put("key", {"sub": "user"}, time.time() + 60)
+        assert list(store.entries) == ["key"]
+
+
+class TestRedisReferenceStore:
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(aioredis, "create_redis_pool", fake_redis_pool(redis))
+        return redis
+
+    @pytest.mark.asyncio
+    async def test_put_get_delete(self, redis):
+        store = RedisReferenceStore(ADDRESS)
+        key = store.key_prefix + "key"
+
+        await store.put(
+            "key", [{"class": "access"}, {"sub": "user"}], time.time() + 59.5
+        )
+
+        # rounded up, so entry never expires before token
+        assert redis.commands[-1][:4] == ("SET", key, DunnoValue(str), 60)
+        assert await store.get("key") == [{"class": "access"}, {"sub": "user"}]
+
+        await store.delete("key")
+        assert await store.get("key") is None
@@ -0,0 +1,112 @@
+import multiprocessing
+import time
+import uuid
+
+import pytest
+
+from sanic_jwt_extended.exceptions import BlacklistFullError
+from sanic_jwt_extended.shm import SharedHashTable, digest
+
+
+def keys_of_slot(table, slot, count):
+    # keys whose probe sequence starts at ``slot``
+    keys = []
+    while len(keys) < count:
+        key = uuid.uuid4().bytes
+        if int.from_bytes(key[:8], "little") % table.capacity == slot:
+            keys.append(key)
+    return keys
+
+
+class TestSharedHashTable:
+    def test_put_get(self):
+        table = SharedHashTable(64)
+        now = time.time()
+        keys = [uuid.uuid4().bytes for _ in range(32)]
+
+        for i, key in enumerate(keys):
+            table.put(key, now + 60, i, now)
+
+        assert all(table.get(key, now) == (now + 60, i) for i, key in enumerate(keys))
+        assert table.get(uuid.uuid4().bytes, now) is None
+        assert table.count(now) == 32
+
+    def test_put_keeps_larger(self):
+        table = SharedHashTable(8)
+        now = time.time()
+        key = digest(b"sub:user")
+
+        table.put(key, now + 60, 10, now)
+        table.put(key, now + 30, 5, now)
+        assert table.get(key, now) == (now + 60, 10)
+
+        table.put(key, now + 90, 20, now)
+        assert table.get(key, now) == (now + 90, 20)
+        assert table.count(now) == 1
+
+    def test_collisions_and_expiry(self):
+        table = SharedHashTable(8, max_probes=4)
+        now = time.time()
+        expired, live, new = keys_of_slot(table, 3, 3)
+
+        table.put(expired, now - 1, 0, now)
+        table.put(live, now + 60, 0, now)
+
+        assert table.get(expired, now) is None
+        assert table.get(live, now) is not None
+
+        # expired slot is reused, chain to ``live`` is kept
+        table.put(new, now + 60, 0, now)
+        assert table.get(new, now) is not None
+        assert table.get(live, now) is not None
+        assert table.count(now) == 2
+
+    def test_full_probe_window(self):
+        table = SharedHashTable(8, max_probes=2)
+        now = time.time()
+        first, second, third, fourth = keys_of_slot(table, 0, 4)
+
+        table.put(first, now + 120, 0, now)
+        table.put(second, now + 60, 0, now)
+
+        # live entries are never dropped to make room
+        with pytest.raises(BlacklistFullError):
+            table.put(third, now + 180, 0, now)
+        with pytest.raises(BlacklistFullError):
+            table.add(third, now + 180, now)
+        with pytest.raises(BlacklistFullError, match="2 key"):
+            table.put_many([(third, now + 180, 0), (fourth, now + 180, 0)], now)
+
+        assert table.get(first, now) is not None
+        assert table.get(second, now) is not None
+        assert table.get(third, now) is None
+
+        # refreshing an existing entry still fits
+        table.put(second, now + 240, 0, now)
+        assert table.get(second, now)[0] == now + 240
+
+        # and room is made once an entry expires
+        table.put(third, now + 180, 0, now + 130)
+        assert table.get(third, now + 130) is not None
+
+    def test_add(self):
+        table = SharedHashTable(8)
+        now = time.time()
+        key = uuid.uuid4().bytes
+
+        assert table.add(key, now + 60, now) is True
+        assert table.add(key, now + 60, now) is False
+        assert table.add(key, now + 60, now + 61) is True
+
+    def test_shared_with_forked_process(self):
+        table = SharedHashTable(64)
+        now = time.time()
+        key = uuid.uuid4().bytes
+
+        context = multiprocessing.get_context("fork")
+        process = context.Process(target=table.put, args=(key, now + 60, 1, now))
+        process.start()
+        process.join()
+
+        assert process.exitcode == 0
+        assert table.get(key, now) == (now + 60, 1)
@@ -0,0 +1,255 @@
+import aioredis
+import pytest
+from sanic import Blueprint, Sanic
+from sanic.response import json
+from sanic.websocket import WebSocketProtocol
+
+from sanic_jwt_extended.blacklist import CachedRedisBlacklist
+from sanic_jwt_extended.decorators import jwt_middleware, jwt_required
+from sanic_jwt_extended.exceptions import ConfigurationConflictError, RevokedTokenError
+from sanic_jwt_extended.jwt_manager import JWT
+from sanic_jwt_extended.reference import RedisReferenceStore
+from sanic_jwt_extended.tokens import Token
+from tests.utils import DunnoValue, FakeRedis
+
+HOST = "tenant.example.com"
+
+
+@pytest.fixture
+def host_tenant():
+    return JWT()
+
+
+@pytest.fixture
+def blueprint_tenant():
+    return JWT()
+
+
+@pytest.yield_fixture
+def app(recwarn, host_tenant, blueprint_tenant):
+    app = Sanic()
+    bp = Blueprint("tenant", url_prefix="/bp")
+
+    @app.route("/protected", methods=["GET"])
+    @jwt_required(allow=["ADMIN"])
+    async def protected(request, token: Token):
+        return json({"iss": token.iss, "roles": sorted(token.roles)})
+
+    @bp.route("/protected", methods=["GET"])
+    @jwt_required
+    async def bp_protected(request, token: Token):
+        return json({"iss": token.iss})
+
+    app.blueprint(bp)
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "default"
+        manager.config.default_iss = "default"
+        manager.config.use_acl = True
+        manager.config.use_blacklist = True
+
+    with host_tenant.initialize(app, host=HOST) as manager:
+        manager.config.secret_key = "host"
+        manager.config.default_iss = "host"
+        manager.config.use_acl = True
+        manager.config.acl_roles = {"ADMIN": ["USER"], "USER": []}
+        manager.config.use_blacklist = True
+        manager.handler.no_authorization = lambda r, e: json({"error": str(e)}, 400)
+
+    with blueprint_tenant.initialize(app, blueprint=bp) as manager:
+        manager.config.secret_key = "blueprint"
+        manager.config.default_iss = "blueprint"
+
+    yield app
+
+
+@pytest.fixture
+def test_cli(loop, app, sanic_client):
+    return loop.run_until_complete(sanic_client(app, protocol=WebSocketProtocol))
+
+
+def headers(token, host=None):
+    headers = {JWT.config.jwt_header_key: f"{JWT.config.jwt_header_prefix} {token}"}
+
+    if host is not None:
+        headers["Host"] = host
+
+    return headers
+
+
+def test_isolated_state(app, host_tenant, blueprint_tenant):
+    assert host_tenant.config is not JWT.config
+    assert host_tenant.key_ring is not JWT.key_ring
+    assert host_tenant.blacklist is not JWT.blacklist
+    assert blueprint_tenant.blacklist is None
+    assert JWT.acl is None and host_tenant.acl is not None
+
+    token = Token(host_tenant.create_access_token("user"), host_tenant)
+    assert token.manager is host_tenant
+    assert token.iss == "host"
+
+
+def test_default_manager_with_tenant_option(app):
+    with pytest.raises(ConfigurationConflictError):
+        with JWT.initialize(app, host=HOST):
+            pass
+
+
+async def test_select_by_host(test_cli, host_tenant):
+    token = host_tenant.create_access_token("user", role="ADMIN")
+
+    resp = await test_cli.get("/protected", headers=headers(token, f"{HOST}:8000"))
+    assert resp.status == 200
+    assert await resp.json() == {"iss": "host", "roles": ["ADMIN", "USER"]}
+
+    # signed by another tenant
+    resp = await test_cli.get("/protected", headers=headers(token))
+    assert resp.status == 422
+
+    token = JWT.create_access_token("user", role="ADMIN")
+
+    resp = await test_cli.get("/protected", headers=headers(token))
+    assert resp.status == 200
+    assert await resp.json() == {"iss": "default", "roles": ["ADMIN"]}
+
+    resp = await test_cli.get("/protected", headers=headers(token, HOST))
+    assert resp.status == 422
+
+
+async def test_select_by_blueprint(test_cli, blueprint_tenant):
+    token = blueprint_tenant.create_access_token("user")
+
+    for host in (None, HOST):
+        resp = await test_cli.get("/bp/protected", headers=headers(token, host))
+        assert resp.status == 200
+        assert await resp.json() == {"iss": "blueprint"}
+
+    resp = await test_cli.get(
+        "/bp/protected", headers=headers(JWT.create_access_token("user"))
+    )
+    assert resp.status == 422
+
+
+async def test_error_handler(test_cli):
+    resp = await test_cli.get("/protected", headers={"Host": HOST})
+    assert resp.status == 400
+    assert await resp.json() == {"error": DunnoValue(str)}
+
+    resp = await test_cli.get("/protected")
+    assert resp.status == 401
+    assert await resp.json() == {"msg": DunnoValue(str)}
+
+
+async def test_blacklist(test_cli, host_tenant):
+    token = host_tenant.create_access_token("user", role="ADMIN")
+    await Token(token, host_tenant).revoke()
+
+    resp = await test_cli.get("/protected", headers=headers(token, HOST))
+    assert resp.status == 401
+    assert not JWT.blacklist.blacklist
+
+
+async def test_middleware(app, test_cli, host_tenant):
+    app.register_middleware(jwt_middleware, "request")
+    token = host_tenant.create_access_token("user", role="ADMIN")
+
+    resp = await test_cli.get("/protected", headers=headers(token, HOST))
+    assert resp.status == 200
+
+
+async def test_redis_backends_are_isolated(monkeypatch):
+    server = FakeRedis()
+
+    async def create_redis_pool(address, **kwargs):
+        # a pool of its own for every backend, to the same server
+        redis = FakeRedis()
+        redis.data = server.data
+        return redis
+
+    monkeypatch.setattr(aioredis, "create_redis_pool", create_redis_pool)
+
+    app = Sanic()
+    tenants = {"a.example.com": JWT(), "b.example.com": JWT()}
+
+    for host, tenant in tenants.items():
+        with tenant.initialize(app, host=host) as manager:
+            manager.config.secret_key = host
+            manager.config.use_blacklist = True
+            manager.config.blacklist_class = CachedRedisBlacklist
+            manager.config.blacklist_init_kwargs = {"connection_info": "redis://redis"}
+            manager.config.use_reference_tokens = True
+            manager.config.reference_store_class = RedisReferenceStore
+            manager.config.reference_store_init_kwargs = {
+                "connection_info": "redis://redis"
+            }
+
+    a, b = tenants.values()
+    token_a = Token(a.create_refresh_token("alice"), a)
+    token_b = Token(b.create_refresh_token("alice"), b)
+
+    await a.revoke_subject("alice")
+    await a.revoke_many([token_b.jti])
+
+    assert await a.blacklist.is_blacklisted(token_a) is True
+    assert await b.blacklist.is_blacklisted(token_b) is False
+    assert a.blacklist.channel != b.blacklist.channel
+    assert all(key.startswith("a.example.com:") for key in server.data)
+
+    handle = await b.create_access_token_async("alice")
+    assert (await Token.verify(handle, b)).identity == "alice"
+    with pytest.raises(RevokedTokenError):
+        await Token.verify(handle, a)
+
+    # closing one tenant leaves pools of others open
+    assert a.blacklist.connection is not b.blacklist.connection
+    await a.blacklist.close()
+    await a.reference_store.close()
+
+    assert a.blacklist.connection.stats() is None
+    assert not b.blacklist.connection.redis.closed
+    assert not b.reference_store.connection.redis.closed
+
+
+def test_key_namespace():
+    app = Sanic()
+    bp = Blueprint("tenant")
+    tenants = [JWT(), JWT(), JWT()]
+
+    with JWT.initialize(app) as manager:
+        manager.config.secret_key = "secret"
+    with tenants[0].initialize(app, host=HOST) as manager:
+        manager.config.secret_key = "secret"
+    with tenants[1].initialize(app, blueprint=bp) as manager:
+        manager.config.secret_key = "secret"
+    with tenants[2].initialize(app, host="other.example.com") as manager:
+        manager.config.secret_key = "secret"
+        manager.config.key_namespace = "other"
+
+    assert JWT.key_namespace == ""
+    assert [t.key_namespace for t in tenants] == [f"{HOST}:", "tenant:", "other:"]
+
+
+async def test_unmatched_host_without_default(sanic_client, host_tenant):
+    app = Sanic()
+
+    @app.route("/protected", methods=["GET"])
+    @jwt_required
+    async def protected(request, token: Token):
+        return json({"iss": token.iss})
+
+    with host_tenant.initialize(app, host=HOST) as manager:
+        manager.config.secret_key = "host"
+        manager.config.default_iss = "host"
+
+    test_cli = await sanic_client(app)
+    token = host_tenant.create_access_token("user")
+    auth = {"Authorization": f"Bearer {token}"}
+
+    resp = await test_cli.get("/protected", headers={**auth, "Host": HOST})
+    assert resp.status == 200
+
+    resp = await test_cli.get(
+        "/protected", headers={**auth, "Host": "unknown.example.com"}
+    )
+    assert resp.status == 401
+    assert await resp.json() == {"msg": "No JWT manager serves this request"}
@@ -1,9 +1,15 @@
+import calendar
+import datetime
+import time
+import uuid
+
 import pytest
 from sanic import Sanic
 
 from sanic_jwt_extended.exceptions import ConfigurationConflictError
 from sanic_jwt_extended.jwt_manager import JWT
 from sanic_jwt_extended.tokens import Token
+from tests.utils import MinimalBlacklist
 
 
 class TestToken:
@@ -24,6 +30,89 @@ class TestToken:
         await token.revoke()
         assert (await JWT.blacklist.is_blacklisted(token)) is True
 
+    @pytest.mark.asyncio
+    async def test_revoke_subject(self, jwt_manager):
+        access = Token(JWT.create_access_token("user"))
+        refresh = Token(JWT.create_refresh_token("user"))
+        other = Token(JWT.create_access_token("other"))
+
+        await JWT.revoke_subject("user")
+
+        assert (await JWT.blacklist.is_blacklisted(access)) is True
+        assert (await JWT.blacklist.is_blacklisted(refresh)) is True
+        assert (await JWT.blacklist.is_blacklisted(other)) is False
+
+    @pytest.mark.asyncio
+    async def test_revoke_without_optional_methods(self):
+        with JWT.initialize(Sanic()) as manager:
+            manager.config.secret_key = "secret"
+            manager.config.use_blacklist = True
+            manager.config.blacklist_class = MinimalBlacklist
+
+        token = Token(JWT.create_access_token("user"))
+        await JWT.revoke_many([token])
+        assert (await JWT.blacklist.is_blacklisted(token)) is True
+
+        with pytest.raises(ConfigurationConflictError, match="revoke_subject"):
+            await JWT.revoke_subject("user")
+        with pytest.raises(ConfigurationConflictError, match="revoke_family"):
+            await JWT.revoke_family("family")
+
+    @pytest.mark.asyncio
+    async def test_revoke_many(self, jwt_manager):
+        tokens = [Token(JWT.create_access_token(f"user{i}")) for i in range(3)]
+        by_jti = Token(JWT.create_access_token("user"))
+        by_uuid = Token(JWT.create_refresh_token("user"))
+        other = Token(JWT.create_access_token("other"))
+
+        await JWT.revoke_many([*tokens, by_jti.jti.hex, by_uuid.jti])
+
+        for token in (*tokens, by_jti, by_uuid):
+            assert (await JWT.blacklist.is_blacklisted(token)) is True
+        assert (await JWT.blacklist.is_blacklisted(other)) is False
+
+    @pytest.mark.asyncio
+    async def test_revoke_many_by_jti_expiry(self):
+        app = Sanic()
+        with JWT.initialize(app) as manager:
+            manager.config.secret_key = "secret"
+            manager.config.use_blacklist = True
+            manager.config.access_token_expires = datetime.timedelta(hours=1)
+            manager.config.refresh_token_expires = datetime.timedelta(days=2)
+
+        token = Token(JWT.create_access_token("user"))
+        jti = uuid.uuid4()
+
+        before = time.time()
+        await JWT.revoke_many([token, jti])
+        after = time.time()
+
+        # token keeps its own expiry
+        assert JWT.blacklist.blacklist[token.jti.hex] == calendar.timegm(
+            token.exp.utctimetuple()
+        )
+        # bare jti is kept until any token issued now has expired
+        expires_at = JWT.blacklist.blacklist[jti.hex]
+        assert before + 2 * 86400 <= expires_at <= after + 2 * 86400
+
+    @pytest.mark.asyncio
+    async def test_revoke_many_without_blacklist(self, jwt_manager):
+        app = Sanic()
+        tenant = JWT()
+        with tenant.initialize(app, host="tenant.example.com") as manager:
+            manager.config.secret_key = "tenant"
+
+        token = Token(tenant.create_access_token("user"), tenant)
+
+        with pytest.raises(ConfigurationConflictError):
+            await tenant.revoke_many([token])
+        with pytest.raises(ConfigurationConflictError):
+            await tenant.revoke_many([token.jti])
+
+        # default manager is left untouched
+        await JWT.revoke_many([token.jti])
+        assert JWT.blacklist.blacklist[token.jti.hex] > time.time()
+
     @pytest.mark.asyncio
     async def test_revoke_fail(self, jwt_manager):
         raw_token = JWT.create_access_token("user")
@@ -32,3 +121,17 @@ class TestToken:
 
         with pytest.raises(ConfigurationConflictError):
             await token.revoke()
+
+    def test_lazy_claims(self, jwt_manager):
+        raw_token = JWT.create_access_token("user")
+        token = Token(raw_token)
+
+        assert not hasattr(token, "__dict__")
+        assert token.header["class"] == "access"
+
+        jti = token.jti
+        assert jti is token.jti
+        assert jti.hex == token.raw_data["jti"]
+        assert token.exp > token.iat
+        assert token.public_claims == {}
+        assert token.private_claims == {}
@@ -1,3 +1,13 @@
+import asyncio
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from sanic_jwt_extended.blacklist import BlacklistABC, _expires_at
+from sanic_jwt_extended.metrics import MetricsSinkABC
+
+
 class DunnoValue:
     def __init__(self, expected_type):
         self.expected_type = expected_type
@@ -7,3 +17,183 @@ class DunnoValue:
 
     def __repr__(self):
         return f"DunnoValue with {self.expected_type}"
+
+
+class FakeChannel:
+    def __init__(self, name):
+        self.name = name
+        self.queue = asyncio.Queue()
+
+    async def iter(self, encoding=None):
+        while True:
+            message = await self.queue.get()
+            if message is None:
+                return
+            yield message
+
+
+class FakeTransaction:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    def __getattr__(self, command):
+        def queue(*args, **kwargs):
+            self.queued.append(getattr(self.redis, command)(*args, **kwargs))
+
+        return queue
+
+    async def execute(self):
+        self.redis.commands.append(("EXEC", len(self.queued)))
+        return [await coroutine for coroutine in self.queued]
+
+
+class FakeRedis:
+    """
+    In-process stand-in of ``aioredis.Redis`` which records executed commands
+    """
+
+    SET_IF_NOT_EXIST = "SET_IF_NOT_EXIST"
+
+    def __init__(self):
+        self.closed = False
+        self.data = {}
+        self.commands = []
+        self.channels = []
+
+    async def get(self, key):
+        self.commands.append(("GET", key))
+        return self.data.get(key)
+
+    async def mget(self, key, *keys):
+        self.commands.append(("MGET", key, *keys))
+        return [
+            bytes(v) if isinstance(v, bytearray) else v
+            for v in (self.data.get(k) for k in (key, *keys))
+        ]
+
+    async def setbit(self, key, offset, value):
+        self.commands.append(("SETBIT", key, offset, value))
+        bits = self.data.setdefault(key, bytearray())
+        if len(bits) <= offset >> 3:
+            bits.extend(bytes((offset >> 3) + 1 - len(bits)))
+        if value:
+            bits[offset >> 3] |= 0x80 >> (offset & 7)
+        else:
+            bits[offset >> 3] &= ~(0x80 >> (offset & 7))
+
+    async def expireat(self, key, timestamp):
+        self.commands.append(("EXPIREAT", key, timestamp))
+
+    def multi_exec(self):
+        return FakeTransaction(self)
+
+    def pipeline(self):
+        return FakeTransaction(self)
+
+    async def set(self, key, value, *, expire=0, exist=None):
+        self.commands.append(("SET", key, value, expire, exist))
+        if exist == self.SET_IF_NOT_EXIST and key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    async def delete(self, key, *keys):
+        self.commands.append(("DEL", key, *keys))
+        for k in (key, *keys):
+            self.data.pop(k, None)
+
+    async def publish(self, channel, message):
+        self.commands.append(("PUBLISH", channel, message))
+        for subscribed in self.channels:
+            if subscribed.name == channel:
+                subscribed.queue.put_nowait(message)
+
+    async def subscribe(self, channel):
+        subscribed = FakeChannel(channel)
+        self.channels.append(subscribed)
+        return [subscribed]
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+    async def unsubscribe(self, channel):
+        for subscribed in self.channels:
+            if subscribed.name == channel:
+                subscribed.queue.put_nowait(None)
+        self.channels = [c for c in self.channels if c.name != channel]
+
+
+def fake_redis_pool(redis):
+    """
+    Stand-in of ``aioredis.create_redis_pool``, every pool connects to ``redis``
+    """
+
+    async def create_redis_pool(address, **kwargs):
+        return redis
+
+    return create_redis_pool
+
+
+class RecordingSink(MetricsSinkABC):
+    def __init__(self):
+        self.durations = []
+        self.outcomes = []
+
+    def observe(self, stage, seconds):
+        self.durations.append((stage, seconds))
+
+    def count(self, outcome):
+        self.outcomes.append(outcome)
+
+    @property
+    def stages(self):
+        return [stage for stage, _ in self.durations]
+
+
+class MinimalBlacklist(BlacklistABC):
+    """
+    Implements only abstract methods of ``BlacklistABC``
+    """
+
+    in_process = True
+
+    def __init__(self):
+        self.blacklist = {}
+
+    async def register(self, token):
+        self.blacklist[token.jti] = _expires_at(token)
+
+    async def is_blacklisted(self, token):
+        return token.jti in self.blacklist
+
+
+def generate_rsa_key_pair():
+    return serialize_key_pair(rsa.generate_private_key(65537, 2048, default_backend()))
+
+
+def generate_ec_key_pair(curve=ec.SECP256R1):
+    return serialize_key_pair(ec.generate_private_key(curve(), default_backend()))
+
+
+def generate_ed25519_key_pair():
+    return serialize_key_pair(ed25519.Ed25519PrivateKey.generate())
+
+
+def serialize_key_pair(key):
+    private_key = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_key = (
+        key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    return private_key, public_key